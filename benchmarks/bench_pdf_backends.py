@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import difflib
+from collections import Counter
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from pdf_backends import BACKENDS, available_backends, select_backend
+from resume_corpus import resume, write_pdf
+
+# Layouts of the generated documents: (columns, resumes per document)
+LAYOUTS = {"single": (1, 1), "two-column": (2, 1), "long": (1, 12)}
+
+
+def build_documents(directory: str, per_layout: int, seed: int = 11):
+    """
+    Writes per_layout PDFs of each layout and returns {layout: [(path, truth, pages)]}.
+    """
+    rng = random.Random(seed)
+    documents = {}
+    for layout, (columns, resumes) in LAYOUTS.items():
+        documents[layout] = []
+        for i in range(per_layout):
+            path = os.path.join(directory, f"{layout}-{i}.pdf")
+            truth = write_pdf(path, "".join(resume(rng) for _ in range(resumes)), columns)
+            documents[layout].append((path, truth, _page_count(path)))
+    return documents
+
+
+def _page_count(path: str) -> int:
+    from pypdf import PdfReader
+    return len(PdfReader(path).pages)
+
+
+def quality(truth: str, text: str):
+    """
+    (recall, order): the share of the true words extracted, and how well the word
+    sequence matches the reading order (difflib ratio; scrambled columns score low).
+    """
+    expected, got = truth.split(), text.split()
+    if not expected:
+        return 1.0, 1.0
+    recall = sum((Counter(expected) & Counter(got)).values()) / len(expected)
+    order = difflib.SequenceMatcher(None, expected, got, autojunk=False).ratio()
+    return recall, order
+
+
+def run(name: str, documents):
+    """
+    Extracts every document with one backend ("auto": per-document selection) and
+    returns (pages per second, mean recall, mean order).
+    """
+    pages = elapsed = 0.0
+    scores = []
+    for path, truth, page_count in documents:
+        started = time.perf_counter()
+        backend = select_backend(path, name)
+        text = "\n".join(backend.iter_pages(path))
+        elapsed += time.perf_counter() - started
+        pages += page_count
+        scores.append(quality(truth, text))
+    return pages / elapsed, sum(s[0] for s in scores) / len(scores), sum(s[1] for s in scores) / len(scores)
+
+
+def main(per_layout: int):
+    names = available_backends() + ["auto"]
+    missing = [name for name in BACKENDS if name not in names]
+    if missing:
+        print(f"Not installed (skipped): {', '.join(missing)}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        documents = build_documents(directory, per_layout)
+        print(f"{'layout':<11} {'backend':<10} {'pages/s':>8} {'recall':>7} {'order':>6}")
+        for layout, docs in documents.items():
+            for name in names:
+                rate, recall, order = run(name, docs)
+                print(f"{layout:<11} {name:<10} {rate:>8.1f} {recall:>7.3f} {order:>6.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Speed and text quality of each PDF extraction backend.")
+    parser.add_argument("--documents", type=int, default=10, help="Generated PDFs per layout")
+    args = parser.parse_args()
+    main(args.documents)
@@ -0,0 +1,76 @@
+import os
+import re
+import sys
+import time
+import argparse
+import statistics
+import ftfy
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from text_normalizer import clean_text, embedding_text
+from resume_corpus import build_corpus
+
+
+def legacy_clean_text(text: str) -> str:
+    # PDFReader.clean_text before the fast path, kept as the baseline
+    if not text:
+        return ""
+    text = ftfy.fix_text(text)
+    text = re.sub(r'[ \t]+', ' ', text)
+    text = re.sub(r'\n\s*\n', '\n\n', text)
+    return text.strip()
+
+
+def legacy_embedding_text(text: str) -> str:
+    return legacy_clean_text(text).replace("\n", " ").strip()
+
+
+def fast_embedding_text(text: str) -> str:
+    return embedding_text(clean_text(text))
+
+
+def time_per_doc(fn, docs, repeat: int) -> float:
+    """
+    Best-of-`repeat` time of one pass over docs, in microseconds per document.
+    """
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for doc in docs:
+            fn(doc)
+        runs.append(time.perf_counter() - started)
+    return min(runs) / len(docs) * 1e6
+
+
+def main(size: int, repeat: int):
+    corpus = build_corpus(size)
+    corpus["all"] = [doc for docs in corpus.values() for doc in docs]
+    cases = [
+        ("clean_text", legacy_clean_text, clean_text),
+        ("clean+embed", legacy_embedding_text, fast_embedding_text),
+    ]
+
+    mismatches = 0
+    print(f"{'stage':<12} {'corpus':<9} {'docs':>5} {'avg KB':>7} {'legacy us':>10} {'fast us':>9} {'speedup':>8}")
+    for stage, legacy, fast in cases:
+        for kind, docs in corpus.items():
+            mismatches += sum(legacy(doc) != fast(doc) for doc in docs)
+            before = time_per_doc(legacy, docs, repeat)
+            after = time_per_doc(fast, docs, repeat)
+            size_kb = statistics.mean(len(doc) for doc in docs) / 1024
+            print(f"{stage:<12} {kind:<9} {len(docs):>5} {size_kb:>7.1f} {before:>10.0f} {after:>9.0f} {before / after:>7.1f}x")
+
+    if mismatches:
+        print(f"❌ {mismatches} documents normalized differently from the baseline")
+        return False
+    print("✅ Output identical to the baseline on every document")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmark of ingest text normalization.")
+    parser.add_argument("--size", type=int, default=500, help="Resumes in the generated corpus")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed passes per case (best is reported)")
+    args = parser.parse_args()
+    sys.exit(0 if main(args.size, args.repeat) else 1)
@@ -0,0 +1,101 @@
+import random
+from typing import Dict, List
+import ftfy.bad_codecs  # registers sloppy-windows-1252
+
+# Share of each kind of extracted text in the generated corpus, roughly what PDF
+# uploads look like: mostly plain ASCII, a good part with typographic Unicode
+# (bullets, curly quotes, dashes, accents, ligatures), a few garbled or HTML-escaped
+MIX = {"ascii": 0.55, "unicode": 0.30, "mojibake": 0.10, "entities": 0.05}
+
+NAMES = ["Jordan Lee", "Priya Raman", "Alex Chen", "Sam Okafor", "Maria Garcia", "Taylor Brooks"]
+ACCENTED_NAMES = ["José Martínez", "Zoë Müller", "François Dubois", "Søren Nørgaard", "Ana Conceição"]
+TITLES = ["Software Engineer", "Data Scientist", "Backend Developer", "ML Engineer", "DevOps Engineer"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Hooli", "Stark Industries"]
+SKILLS = ["Python", "Java", "Go", "SQL", "PostgreSQL", "AWS", "Docker", "Kubernetes", "React",
+          "TypeScript", "Spark", "Airflow", "TensorFlow", "PyTorch", "FastAPI", "Redis", "Terraform"]
+VERBS = ["Built", "Designed", "Led", "Migrated", "Optimized", "Shipped", "Automated", "Scaled"]
+OBJECTS = ["a billing pipeline", "the search service", "CI/CD for 40 services", "a feature store",
+           "real-time dashboards", "the data warehouse", "an internal ML platform", "API rate limiting"]
+RESULTS = ["cutting latency by 35%", "saving $120k per year", "serving 2M requests a day",
+           "reducing on-call pages by half", "with 99.95% uptime", "across 3 regions"]
+
+
+def _bullet(rng: random.Random, unicode: bool) -> str:
+    line = f"{rng.choice(VERBS)} {rng.choice(OBJECTS)}, {rng.choice(RESULTS)}"
+    if unicode:
+        # What pypdf typically yields from typeset resumes
+        return rng.choice(["• ", "▪ ", "– "]) + line.replace("fi", "ﬁ", 1).replace(", ", " — ", 1)
+    return rng.choice(["- ", "* ", "  - "]) + line
+
+
+def resume(rng: random.Random, unicode: bool = False) -> str:
+    """
+    One resume as PDF extraction leaves it: ragged spaces and tabs, blank-line runs
+    between sections, and (with unicode) typographic characters.
+    """
+    name = rng.choice(ACCENTED_NAMES if unicode else NAMES)
+    quote = "“{}”" if unicode else '"{}"'
+    lines = [name, f"{rng.choice(TITLES)}  |  {name.split()[0].lower()}@example.com  |  (555) 010-{rng.randint(1000, 9999)}", ""]
+    lines += ["SUMMARY", f"Engineer with {rng.randint(2, 15)} years of experience; known as "
+              + quote.format(rng.choice(["the fixer", "a fast learner", "pragmatic"])) + ".", "", ""]
+    lines.append("EXPERIENCE")
+    for _ in range(rng.randint(2, 4)):
+        lines.append(f"{rng.choice(TITLES)}\t\t{rng.choice(COMPANIES)}\t{rng.randint(2012, 2020)} - {rng.randint(2021, 2025)}")
+        lines += [_bullet(rng, unicode) for _ in range(rng.randint(3, 6))]
+        lines += [""] * rng.randint(1, 3)
+    lines += ["SKILLS", ",  ".join(rng.sample(SKILLS, 8)), "", "EDUCATION",
+              f"B.S. Computer Science    State University    {rng.randint(2005, 2016)}"]
+    if unicode:
+        lines[-1] = lines[-1].replace("    ", "  ")
+    return "\n".join(lines) + "\n\n"
+
+
+def build_corpus(size: int = 500, seed: int = 7) -> Dict[str, List[str]]:
+    """
+    Deterministic corpus of `size` resumes, grouped by kind (see MIX).
+    """
+    rng = random.Random(seed)
+    corpus = {kind: [] for kind in MIX}
+    for kind, share in MIX.items():
+        for _ in range(max(1, round(size * share))):
+            if kind == "ascii":
+                text = resume(rng)
+            elif kind == "unicode":
+                text = resume(rng, unicode=True)
+            elif kind == "mojibake":
+                # UTF-8 bytes read as Windows-1252 somewhere before the PDF was made
+                text = resume(rng, unicode=True).encode("utf-8").decode("sloppy-windows-1252")
+            else:
+                text = resume(rng).replace(" & ", " &amp; ").replace("R&D", "R&amp;D") + "Interests: R&amp;D, chess &amp; climbing\n"
+            corpus[kind].append(text)
+    return corpus
+
+
+def write_pdf(path: str, text: str, columns: int = 1, lines_per_page: int = 60) -> str:
+    """
+    Typesets text into a PDF with reportlab, in one or two columns, and returns the
+    text in reading order (left column first): the ground truth an extractor should
+    recover. Like table-based resume templates, columns are drawn row by row, so
+    content-stream order interleaves them.
+    """
+    import textwrap
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    width, height = letter
+    wrap = 90 if columns == 1 else 42
+    lines = [wrapped for line in text.splitlines() if line.strip()
+             for wrapped in textwrap.wrap(line.replace("\t", " "), wrap)]
+    pdf = canvas.Canvas(path, pagesize=letter)
+    pdf.setFont("Helvetica", 9)
+    per_page = lines_per_page * columns
+    for first in range(0, len(lines), per_page):
+        page = lines[first:first + per_page]
+        # Columns are balanced on a page that isn't full
+        rows = -(-len(page) // columns)
+        cells = [divmod(i, rows) + (line,) for i, line in enumerate(page)]
+        for column, row, line in sorted(cells, key=lambda cell: (cell[1], cell[0])):
+            pdf.drawString(40 + column * (width - 80) / columns, height - 50 - row * 11.5, line)
+        pdf.showPage()
+    pdf.save()
+    return "\n".join(lines)
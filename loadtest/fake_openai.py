@@ -0,0 +1,205 @@
+import re
+import sys
+import json
+import base64
+import time
+import zlib
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import numpy as np
+
+# Output size of each model when no dimensions are requested (as in embedder.py)
+NATIVE_DIMENSIONS = {"text-embedding-3-small": 1536, "text-embedding-3-large": 3072, "text-embedding-ada-002": 1536}
+SKILLS = ["Python", "Java", "Go", "SQL", "PostgreSQL", "AWS", "Docker", "Kubernetes", "React", "TypeScript",
+          "Spark", "Airflow", "TensorFlow", "PyTorch", "FastAPI", "Redis", "Terraform"]
+SKILL_PATTERNS = [(skill, re.compile(r"\b" + re.escape(skill) + r"\b", re.IGNORECASE)) for skill in SKILLS]
+WORD = re.compile(r"[a-z0-9]+")
+CANDIDATE = re.compile(r"=== CANDIDATE \d+: (.*?) ===\s*Resume ID: (\S+)")
+RESUME_SECTION = re.compile(r"=== RESUME (\d+) ===\n(.*?)(?==== RESUME |\Z)", re.S)
+
+
+class FakeOpenAI:
+    """
+    A local stand-in for the OpenAI API, for load tests: answers the embeddings and
+    chat completion calls Resudoc makes, after a configurable latency, and fails a
+    configurable share of requests. Point the app at it with OPENAI_BASE_URL.
+
+    Embeddings are hashed bags of words (similar texts get similar vectors), skills
+    are the known technologies found in the text, and rankings are deterministic.
+    """
+
+    def __init__(self, latency_ms: float = 50, jitter_ms: float = 0, error_rate: float = 0.0,
+                 host: str = "127.0.0.1", port: int = 0, seed: int = None):
+        """
+        Initialize the Fake OpenAI server.
+
+        Args:
+            latency_ms (float): Delay before every response.
+            jitter_ms (float): Extra uniformly random delay, 0 to jitter_ms.
+            error_rate (float): Share of requests answered with a 429 or 500 error.
+            host (str): Interface to listen on.
+            port (int): Port to listen on (0 picks a free one).
+            seed (int): Seed of the latency and error draws.
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"embeddings": 0, "chat": 0, "errors": 0}
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _draw(self):
+        # One draw per request under the lock (random.Random isn't thread-safe)
+        with self._lock:
+            delay = (self.latency_ms + self._random.uniform(0, self.jitter_ms)) / 1000
+            failure = self._random.random() < self.error_rate and self._random.choice([429, 500])
+        return delay, failure
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                delay, failure = fake._draw()
+                time.sleep(delay)
+                if failure:
+                    fake._count("errors")
+                    message = "Rate limit reached" if failure == 429 else "The server had an error"
+                    return self._send(failure, {"error": {"message": message, "type": "fake_error", "code": None}})
+                if self.path.endswith("/embeddings"):
+                    fake._count("embeddings")
+                    return self._send(200, fake.embeddings(body))
+                if self.path.endswith("/chat/completions"):
+                    fake._count("chat")
+                    return self._send(200, fake.chat_completion(body))
+                self._send(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+
+            def _send(self, status: int, payload: dict):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def embeddings(self, body: dict) -> dict:
+        inputs = body.get("input")
+        inputs = [inputs] if isinstance(inputs, str) else inputs or []
+        model = body.get("model", "text-embedding-3-small")
+        dimensions = body.get("dimensions") or NATIVE_DIMENSIONS.get(model, 1536)
+        tokens = sum(len(text) // 4 + 1 for text in inputs)
+        # The openai client asks for base64 (packed float32) by default
+        base64_format = body.get("encoding_format") == "base64"
+        data = []
+        for i, text in enumerate(inputs):
+            vector = embed(text, dimensions)
+            data.append({
+                "object": "embedding", "index": i,
+                "embedding": base64.b64encode(vector.astype(np.float32).tobytes()).decode("ascii")
+                if base64_format else vector.round(6).tolist(),
+            })
+        return {
+            "object": "list",
+            "data": data,
+            "model": model,
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    def chat_completion(self, body: dict) -> dict:
+        prompt = " ".join(m.get("content") or "" for m in body.get("messages", []) if m.get("role") == "user")
+        if "=== CANDIDATE" in prompt:
+            content = json.dumps({"rankings": rankings(prompt)})
+        elif "=== RESUME" in prompt:
+            content = json.dumps({"results": [
+                {"index": int(index), "skills": skills(text)} for index, text in RESUME_SECTION.findall(prompt)
+            ]})
+        else:
+            content = json.dumps(skills(prompt))
+        prompt_tokens, completion_tokens = len(prompt) // 4 + 1, len(content) // 4 + 1
+        return {
+            "id": f"chatcmpl-fake{zlib.crc32(prompt.encode('utf-8')):08x}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+
+def embed(text: str, dimensions: int) -> np.ndarray:
+    """
+    Unit-length hashed bag of words, so texts sharing words are close in cosine distance.
+    """
+    vector = np.zeros(dimensions)
+    for word in WORD.findall(text.lower()):
+        vector[zlib.crc32(word.encode("utf-8")) % dimensions] += 1.0
+    norm = np.linalg.norm(vector)
+    if not norm:
+        vector[0], norm = 1.0, 1.0
+    return vector / norm
+
+
+def skills(text: str) -> list:
+    return [skill for skill, pattern in SKILL_PATTERNS if pattern.search(text)]
+
+
+def rankings(prompt: str) -> list:
+    return [
+        {
+            "resume_id": resume_id,
+            "filename": filename,
+            "score": 40 + zlib.crc32(resume_id.encode("utf-8")) % 60,
+            "reasoning": "Synthetic ranking from the load-test OpenAI stand-in.",
+            "key_matches": skills(prompt)[:3],
+            "gaps": [],
+        }
+        for filename, resume_id in CANDIDATE.findall(prompt)
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the local OpenAI stand-in used by the load tests.")
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    fake = FakeOpenAI(args.latency_ms, args.jitter_ms, args.error_rate, port=args.port)
+    print(f"Fake OpenAI listening on {fake.base_url} (set OPENAI_BASE_URL to this)")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        fake.stop()
+        sys.exit(0)
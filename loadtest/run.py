@@ -0,0 +1,227 @@
+"""
+End-to-end load test: generates synthetic resume PDFs, starts the API against a local
+OpenAI stand-in (fake_openai.py) and a disposable Postgres (postgres.py), drives
+/resumes/upload-batch and /match concurrently, and reports throughput and latency
+percentiles per endpoint.
+
+    python loadtest/run.py --resumes 200 --matches 100 --concurrency 8 --latency-ms 80 --error-rate 0.02
+"""
+import os
+import sys
+import json
+import math
+import time
+import uuid
+import random
+import argparse
+import tempfile
+import subprocess
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../benchmarks')))
+
+from fake_openai import FakeOpenAI, SKILLS
+from postgres import DisposablePostgres, free_port
+from resume_corpus import resume, write_pdf
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def percentile(values, p: float) -> float:
+    # Nearest-rank percentile
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+class LoadTest:
+    """
+    Drives one load-test run against a running API and records every request.
+
+    Args:
+        api_url (str): Base URL of the API.
+        users (int): Users the resumes and matches are spread over.
+        seed (int): Seed of the generated resumes, job descriptions and request order.
+    """
+
+    def __init__(self, api_url: str, users: int = 2, seed: int = 1):
+        self.api_url = api_url.rstrip("/")
+        self.users = [str(uuid.uuid4()) for _ in range(users)]
+        self.rng = random.Random(seed)
+        # endpoint -> [(status, seconds)]
+        self.results = defaultdict(list)
+
+    def generate_resumes(self, directory: str, count: int):
+        print(f"Generating {count} resume PDFs...")
+        paths = []
+        for i in range(count):
+            path = os.path.join(directory, f"resume-{i:05d}.pdf")
+            write_pdf(path, resume(self.rng))
+            paths.append(path)
+        return paths
+
+    def job_description(self) -> str:
+        skills = ", ".join(self.rng.sample(SKILLS, 5))
+        return (f"We are hiring a {self.rng.choice(['senior', 'staff', 'mid-level'])} engineer to build and run "
+                f"production services. Required: {skills}. Experience with distributed systems is a plus.")
+
+    def upload_batch(self, user_id: str, paths):
+        fields = {"user_id": user_id, "tags": "loadtest"}
+        files = [("files", os.path.basename(path), open(path, "rb").read()) for path in paths]
+        body, content_type = _multipart(fields, files)
+        self._request("/resumes/upload-batch", body, content_type)
+
+    def match(self, user_id: str):
+        body = json.dumps({"user_id": user_id, "jd_text": self.job_description(), "k": 5}).encode("utf-8")
+        self._request("/match", body, "application/json")
+
+    def _request(self, endpoint: str, body: bytes, content_type: str):
+        request = urllib.request.Request(self.api_url + endpoint, data=body, headers={"Content-Type": content_type})
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=300) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except Exception:
+            status = 0
+        self.results[endpoint].append((status, time.perf_counter() - started))
+
+    def run(self, paths, batch_size: int, matches: int, concurrency: int) -> float:
+        """
+        Uploads every resume in batches while sending `matches` match requests, all from
+        `concurrency` threads. Each user's first batch goes first so matches have data.
+        Returns the wall time in seconds.
+        """
+        batches = [paths[i:i + batch_size] for i in range(0, len(paths), batch_size)]
+        tasks = [(self.upload_batch, self.users[i % len(self.users)], batch) for i, batch in enumerate(batches)]
+        first, rest = tasks[:len(self.users)], tasks[len(self.users):]
+        rest += [(self.match, self.rng.choice(self.users)) for _ in range(matches)]
+        self.rng.shuffle(rest)
+
+        print(f"Sending {len(batches)} upload batches and {matches} matches ({concurrency} concurrent)...")
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            for future in [pool.submit(*task) for task in first + rest]:
+                future.result()
+        return time.perf_counter() - started
+
+    def report(self, elapsed: float, batch_size: int) -> dict:
+        summary = {"elapsed_s": round(elapsed, 2), "endpoints": {}}
+        print(f"\n{'endpoint':<22} {'requests':>8} {'errors':>6} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for endpoint, results in sorted(self.results.items()):
+            seconds = [s for _, s in results]
+            errors = sum(1 for status, _ in results if not 200 <= status < 300)
+            stats = {
+                "requests": len(results), "errors": errors, "throughput_rps": len(results) / elapsed,
+                **{f"p{p}_ms": percentile(seconds, p) * 1000 for p in (50, 95, 99)},
+            }
+            summary["endpoints"][endpoint] = stats
+            print(f"{endpoint:<22} {stats['requests']:>8} {errors:>6} {stats['throughput_rps']:>7.2f} "
+                  f"{stats['p50_ms']:>8.0f} {stats['p95_ms']:>8.0f} {stats['p99_ms']:>8.0f}")
+        uploads = summary["endpoints"].get("/resumes/upload-batch")
+        if uploads:
+            print(f"\nIngest: about {uploads['throughput_rps'] * batch_size:.1f} resumes/s over {elapsed:.1f}s")
+        return summary
+
+
+def _multipart(fields: dict, files) -> tuple:
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode("utf-8"))
+    for name, filename, data in files:
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f'Content-Type: application/pdf\r\n\r\n'.encode("utf-8") + data + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode("utf-8"))
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def start_api(port: int, database_url: str, openai_url: str, workers: int, log_path: str = None, timeout: float = 60):
+    """
+    Starts the API with uvicorn in a child process and waits until /ready answers.
+    Several workers share caches through a fresh SQLite file unless SHARED_CACHE_PATH
+    is set. Its output goes to log_path (discarded if None).
+    """
+    env = {**os.environ, "DATABASE_URL": database_url, "OPENAI_API_KEY": "loadtest", "OPENAI_BASE_URL": openai_url}
+    if workers > 1 and not env.get("SHARED_CACHE_PATH"):
+        env["SHARED_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="resudoc-loadtest-cache-"), "cache.sqlite3")
+    log = open(log_path, "w") if log_path else subprocess.DEVNULL
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/ready", timeout=2):
+                return process
+        except Exception:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError("The API did not start")
+            time.sleep(0.5)
+
+
+def main(args) -> dict:
+    fake = FakeOpenAI(args.latency_ms, args.jitter_ms, args.error_rate, seed=args.seed).start()
+    print(f"Fake OpenAI on {fake.base_url} ({args.latency_ms:g} ms + up to {args.jitter_ms:g} ms, "
+          f"{args.error_rate:.0%} errors)")
+
+    database = None
+    if args.mock_db:
+        database_url = ""
+    elif args.database_url:
+        database_url = args.database_url
+    else:
+        database = DisposablePostgres(image=args.postgres_image).__enter__()
+        database_url = database.database_url
+
+    api = None
+    try:
+        port = free_port()
+        api = start_api(port, database_url, fake.base_url, args.api_workers, args.api_log)
+        test = LoadTest(f"http://127.0.0.1:{port}", users=args.users, seed=args.seed)
+        with tempfile.TemporaryDirectory() as directory:
+            paths = test.generate_resumes(directory, args.resumes)
+            elapsed = test.run(paths, args.batch_size, args.matches, args.concurrency)
+        summary = test.report(elapsed, args.batch_size)
+        summary["openai"] = dict(fake.stats)
+        print(f"OpenAI stand-in: {fake.stats['embeddings']} embedding and {fake.stats['chat']} chat requests, "
+              f"{fake.stats['errors']} injected errors")
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(summary, f, indent=2)
+        return summary
+    finally:
+        if api:
+            api.terminate()
+            api.wait()
+        if database:
+            database.__exit__(None, None, None)
+        fake.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test /resumes/upload-batch and /match end to end.")
+    parser.add_argument("--resumes", type=int, default=100, help="Synthetic resumes to upload")
+    parser.add_argument("--batch-size", type=int, default=10, help="Resumes per upload-batch request")
+    parser.add_argument("--matches", type=int, default=50, help="Match requests to send")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent client threads")
+    parser.add_argument("--users", type=int, default=2, help="Users the resumes and matches are spread over")
+    parser.add_argument("--latency-ms", type=float, default=50, help="OpenAI stand-in latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=25, help="Extra random OpenAI latency, up to this")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of OpenAI requests failing with 429/500")
+    parser.add_argument("--api-workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--database-url", help="Use this (migrated) database instead of a disposable one")
+    parser.add_argument("--postgres-image", default="pgvector/pgvector:pg16", help="Docker image of the disposable database")
+    parser.add_argument("--mock-db", action="store_true", help="Run the API in MOCK mode (no database; smoke test)")
+    parser.add_argument("--api-log", help="Write the API's output (request logs) to this file")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Also write the summary as JSON to this file")
+    main(parser.parse_args())
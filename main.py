@@ -1,10 +1,16 @@
 import os
 import sys
 import uuid
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Query
+import asyncio
+import hashlib
+from contextlib import asynccontextmanager
+from dotenv import load_dotenv
+load_dotenv()
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, PlainTextResponse, JSONResponse
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
 import tempfile
 from datetime import datetime
@@ -12,22 +18,71 @@ from datetime import datetime
 # Add scripts to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'scripts'))
 
-from scripts.db_manager import DbManager
-from scripts.embedder import Embedder
-from scripts.pdf_reader import PDFReader
-from scripts.matching_engine import MatchingEngine
+# Imported by the same names the scripts use for each other, so each module (and its
+# state: metrics registry, request trace, client factory) is loaded once
+from db_manager import DbManager
+from embedder import Embedder
+from pdf_reader import PDFReader, PDFExtractionError
+from matching_engine import MatchingEngine
+from resume_digest import ResumeDigester
+from near_duplicates import NearDuplicateDetector
+from deadline import Deadline
+from metrics import REGISTRY, RequestTrace, current_trace, timed_stage, record_bytes
+import openai_client
 from models import (
-    MatchRequest, MatchResponse, CandidateResult,
+    MatchRequest, MatchResponse, MatchExplain, CandidateResult,
     ResumeUploadResponse, BatchUploadResponse,
-    ResumeListResponse, ResumeInfo,
-    DeleteResponse, HealthResponse
+    ResumeListResponse, ResumeCountResponse, ResumeInfo,
+    ResumeTagsRequest, ResumeTagsResponse,
+    DeleteResponse, HealthResponse, ReadinessResponse
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Connects the database and builds the shared OpenAI client before serving, in parallel,
+    then preloads hot users in the background; /ready answers 503 until that finishes
+    """
+    async def connect_database():
+        if await run_in_threadpool(db_manager.connect):
+            await run_in_threadpool(db_manager.warm_up)
+
+    await asyncio.gather(connect_database(), run_in_threadpool(openai_client.warm_up))
+    preload = asyncio.create_task(preload_hot_users())
+    yield
+    preload.cancel()
+    db_manager.close()
+
+async def preload_hot_users():
+    """
+    Pulls the most active users' resumes and embeddings into the database cache.
+    Retries (reconnecting first if the database was unreachable at startup) until it
+    succeeds; /ready reports the last error meanwhile.
+    """
+    while True:
+        try:
+            if db_manager.connection_string and not db_manager.pool:
+                if not await run_in_threadpool(db_manager.connect):
+                    raise RuntimeError("database unreachable")
+                await run_in_threadpool(db_manager.warm_up)
+            users = await run_in_threadpool(db_manager.hot_users, WARM_HOT_USERS)
+            table = db_manager.active_embedding_space()["table"]
+            warm_state["resumes"] = await run_in_threadpool(db_manager.preload_users, users, table)
+            warm_state["users"] = len(users)
+            warm_state["error"] = None
+            warm_state["warmed"] = True
+            return
+        except Exception as e:
+            print(f"Warning: Warm-up failed, retrying in {WARM_RETRY_SECONDS}s: {e}")
+            warm_state["error"] = str(e)
+            await asyncio.sleep(WARM_RETRY_SECONDS)
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Resudoc API",
     description="AI-powered resume matching system with LLM-based ranking",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -42,12 +97,105 @@ app.add_middleware(
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-# Initialize components
-db_manager = DbManager()
+# Largest PDF accepted, and largest upload request (checked while the body streams in)
+MAX_UPLOAD_BYTES = int(os.getenv("PDF_MAX_UPLOAD_MB", "10")) * 1024 * 1024
+MAX_UPLOAD_REQUEST_BYTES = int(os.getenv("PDF_MAX_REQUEST_MB", "100")) * 1024 * 1024
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+class RequestSizeLimit:
+    """
+    Rejects upload requests larger than max_bytes with 413 as the body streams in,
+    before the multipart parser has spooled it to disk.
+    """
+
+    def __init__(self, app, max_bytes: int, path_prefix: str = "/resumes/upload"):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Upload exceeds the {self.max_bytes // (1024 * 1024)} MB request limit"
+        declared = dict(scope["headers"]).get(b"content-length", b"")
+        if declared.isdigit() and int(declared) > self.max_bytes:
+            await JSONResponse(status_code=413, content={"detail": detail})(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Raised inside body parsing, so FastAPI turns it into the response
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+app.add_middleware(RequestSizeLimit, max_bytes=MAX_UPLOAD_REQUEST_BYTES)
+
+
+class UploadTooLarge(PDFExtractionError):
+    """Raised when an uploaded PDF is over MAX_UPLOAD_BYTES."""
+
+
+async def save_upload(file: UploadFile, destination) -> int:
+    """
+    Copies an uploaded file to destination in chunks, stopping as soon as it
+    exceeds MAX_UPLOAD_BYTES. Returns the number of bytes written.
+
+    Raises:
+        UploadTooLarge: If the file is over the limit.
+    """
+    size = 0
+    while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+        size += len(chunk)
+        if size > MAX_UPLOAD_BYTES:
+            raise UploadTooLarge(f"File exceeds the {MAX_UPLOAD_BYTES // (1024 * 1024)} MB upload limit")
+        destination.write(chunk)
+    return size
+
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Times every API request and writes its stage breakdown as a structured log line"""
+    if request.url.path.startswith("/static") or request.url.path == "/metrics":
+        return await call_next(request)
+    
+    with RequestTrace(request.url.path, method=request.method) as trace:
+        response = await call_next(request)
+        # Label by route template (/resumes/{resume_id}) to keep metric cardinality bounded
+        route = request.scope.get("route")
+        trace.endpoint = getattr(route, "path", request.url.path)
+        trace.fields["status"] = response.status_code
+        return response
+
+# Initialize components (connections are opened by lifespan, at startup)
+db_manager = DbManager(connect=False)
 embedder = Embedder()
 pdf_reader = PDFReader()
+resume_digester = ResumeDigester()
+near_duplicate_detector = NearDuplicateDetector()
 matching_engine = MatchingEngine(db_manager, embedder)
 
+# Users whose data each worker preloads at startup, most recently active first
+WARM_HOT_USERS = int(os.getenv("WARM_HOT_USERS", "20"))
+# Seconds between warm-up attempts after a failure
+WARM_RETRY_SECONDS = float(os.getenv("WARM_RETRY_SECONDS", "5"))
+# Set by preload_hot_users: whether this worker has warmed up, or why not yet
+warm_state = {"warmed": False, "users": 0, "resumes": 0, "error": None}
+
+# Default /match latency budget when the request doesn't set one (unset = no deadline)
+DEFAULT_MATCH_BUDGET_MS = int(os.getenv("MATCH_TIME_BUDGET_MS", "0")) or None
+
 
 @app.get("/")
 async def root():
@@ -61,10 +209,72 @@ async def health_check():
     return {
         "status": "healthy",
         "version": "1.0.0",
-        "database_connected": db_manager.conn is not None
+        "database_connected": db_manager.pool is not None
     }
 
 
+@app.get("/ready", response_model=ReadinessResponse)
+async def readiness_check(response: Response):
+    """
+    Readiness check: 503 until this worker has warmed up, and whenever a database is
+    configured but not connected (MOCK mode would accept uploads and store nothing),
+    so load balancers hold traffic
+    """
+    database_connected = db_manager.pool is not None
+    if db_manager.connection_string and not database_connected:
+        status = "database_unavailable"
+    elif warm_state["error"]:
+        status = "warm_up_failed"
+    elif not warm_state["warmed"]:
+        status = "warming"
+    else:
+        status = "ready"
+    if status != "ready":
+        response.status_code = 503
+    return {
+        "status": status,
+        "database_connected": database_connected,
+        "warmed_users": warm_state["users"],
+        "warmed_resumes": warm_state["resumes"],
+        "error": warm_state["error"]
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus-style metrics: stage latency histograms, token/byte counters, cache hit ratios"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+def corpus_etag(user_id: str, *parts) -> Optional[str]:
+    """
+    ETag for a per-user read: the user's corpus version (bumped by every upload,
+    retag and delete) plus whatever else shapes the response (endpoint, paging, filters).
+    None when versions are not tracked, in which case responses are sent as before.
+    """
+    version = db_manager.get_corpus_version(user_id)
+    if version is None:
+        return None
+    digest = hashlib.sha256(repr((user_id, version) + parts).encode("utf-8")).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def not_modified(request: Request, response: Response, etag: Optional[str]) -> Optional[Response]:
+    """
+    Sets the ETag on the response, and returns a 304 if the client already has it.
+    """
+    if etag is None:
+        return None
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if "*" in candidates or etag.removeprefix("W/") in candidates:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
 @app.post("/resumes/upload", response_model=ResumeUploadResponse)
 async def upload_resume(
     file: UploadFile = File(...),
@@ -83,36 +293,66 @@ async def upload_resume(
     try:
         # Save uploaded file temporarily
         with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
             tmp_path = tmp_file.name
         
         try:
-            # Extract text
-            text = pdf_reader.read_pdf(tmp_path)
-            cleaned_text = pdf_reader.clean_text(text)
+            with open(tmp_path, 'wb') as tmp_file:
+                size = await save_upload(file, tmp_file)
+            record_bytes("upload", size)
+            
+            # Extract and clean text page by page, up to the text budget
+            # (in a sandboxed child process, off the event loop)
+            with timed_stage("pdf_parse"):
+                cleaned_text = await run_in_threadpool(pdf_reader.read_clean_pdf, tmp_path)
+            
+            # Generate embedding (for each embedding space, while a re-embed is building one)
+            with timed_stage("embed"):
+                embeddings = embedder.embed_for_spaces(cleaned_text, db_manager.embedding_spaces())
+            
+            # Precompute the compact digest used in ranking prompts
+            with timed_stage("digest"):
+                digest = resume_digester.build_digest(cleaned_text)
             
-            # Generate embedding
-            embedding = embedder.get_embedding(cleaned_text)
+            # Extract canonical skills for must-have filtering
+            with timed_stage("skills"):
+                skills = pdf_reader.extract_skills_batch([cleaned_text])[0]
+            
+            # LSH band keys for near-duplicate detection
+            with timed_stage("near_duplicates"):
+                lsh_bands = near_duplicate_detector.band_keys(cleaned_text)
             
             # Generate deterministic ID
             resume_id = str(uuid.uuid5(uuid.NAMESPACE_DNS, file.filename))
             
-            # Store in database with tags
-            db_manager.upsert_resume(resume_id, user_id, cleaned_text, filename=file.filename, tags=tag_list)
-            db_manager.upsert_embedding(resume_id, user_id, embedding)
+            # Store in database with tags and skills
+            with timed_stage("db_upsert"):
+                db_manager.upsert_resume(resume_id, user_id, cleaned_text, skills=skills, filename=file.filename, tags=tag_list, digest=digest,
+                                         lsh_bands=lsh_bands)
+                db_manager.upsert_embeddings(resume_id, user_id, embeddings)
+            
+            # Earlier versions of this resume drop out of search results
+            with timed_stage("near_duplicates"):
+                supersedes = db_manager.supersede_near_duplicates(
+                    resume_id, user_id, lsh_bands, NearDuplicateDetector.EMBEDDING_THRESHOLD
+                )
             
             return {
                 "resume_id": resume_id,
                 "filename": file.filename,
                 "status": "success",
-                "message": f"Resume uploaded and processed successfully"
+                "message": f"Resume uploaded and processed successfully",
+                "supersedes": supersedes
             }
             
         finally:
             # Clean up temp file
             os.unlink(tmp_path)
             
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except PDFExtractionError as e:
+        # Unreadable PDFs and PDFs that break an extraction limit
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing resume: {str(e)}")
 
@@ -130,7 +370,9 @@ async def upload_resumes_batch(
     
     uploaded = []
     failed = []
+    parsed = []
     
+    # 1. Extract text from every file first so skills can be extracted in batches
     for file in files:
         try:
             # Validate file type
@@ -143,30 +385,17 @@ async def upload_resumes_batch(
             
             # Save uploaded file temporarily
             with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-                content = await file.read()
-                tmp_file.write(content)
                 tmp_path = tmp_file.name
             
             try:
-                # Extract text
-                text = pdf_reader.read_pdf(tmp_path)
-                cleaned_text = pdf_reader.clean_text(text)
-                
-                # Generate embedding
-                embedding = embedder.get_embedding(cleaned_text)
-                
-                # Generate deterministic ID
-                resume_id = str(uuid.uuid5(uuid.NAMESPACE_DNS, file.filename))
-                
-                # Store in database with tags
-                db_manager.upsert_resume(resume_id, user_id, cleaned_text, filename=file.filename, tags=tag_list)
-                db_manager.upsert_embedding(resume_id, user_id, embedding)
+                with open(tmp_path, 'wb') as tmp_file:
+                    size = await save_upload(file, tmp_file)
+                record_bytes("upload", size)
                 
-                uploaded.append({
-                    "resume_id": resume_id,
-                    "filename": file.filename,
-                    "status": "success"
-                })
+                # Extract and clean text page by page, up to the text budget
+                # (in a sandboxed child process, off the event loop)
+                with timed_stage("pdf_parse"):
+                    parsed.append((file.filename, await run_in_threadpool(pdf_reader.read_clean_pdf, tmp_path)))
                 
             finally:
                 # Clean up temp file
@@ -178,6 +407,53 @@ async def upload_resumes_batch(
                 "error": str(e)
             })
     
+    # 2. Extract canonical skills for all parsed resumes (batched LLM calls, cached)
+    with timed_stage("skills"):
+        skills_per_file = pdf_reader.extract_skills_batch([cleaned_text for _, cleaned_text in parsed])
+    
+    # 3. Embed and store each resume
+    for (filename, cleaned_text), skills in zip(parsed, skills_per_file):
+        try:
+            # Generate embedding (for each embedding space, while a re-embed is building one)
+            with timed_stage("embed"):
+                embeddings = embedder.embed_for_spaces(cleaned_text, db_manager.embedding_spaces())
+            
+            # Precompute the compact digest used in ranking prompts
+            with timed_stage("digest"):
+                digest = resume_digester.build_digest(cleaned_text)
+            
+            # LSH band keys for near-duplicate detection
+            with timed_stage("near_duplicates"):
+                lsh_bands = near_duplicate_detector.band_keys(cleaned_text)
+            
+            # Generate deterministic ID
+            resume_id = str(uuid.uuid5(uuid.NAMESPACE_DNS, filename))
+            
+            # Store in database with tags and skills
+            with timed_stage("db_upsert"):
+                db_manager.upsert_resume(resume_id, user_id, cleaned_text, skills=skills, filename=filename, tags=tag_list, digest=digest,
+                                         lsh_bands=lsh_bands)
+                db_manager.upsert_embeddings(resume_id, user_id, embeddings)
+            
+            # Earlier versions (including ones earlier in this batch) drop out of search results
+            with timed_stage("near_duplicates"):
+                supersedes = db_manager.supersede_near_duplicates(
+                    resume_id, user_id, lsh_bands, NearDuplicateDetector.EMBEDDING_THRESHOLD
+                )
+            
+            uploaded.append({
+                "resume_id": resume_id,
+                "filename": filename,
+                "status": "success",
+                "supersedes": supersedes
+            })
+            
+        except Exception as e:
+            failed.append({
+                "filename": filename,
+                "error": str(e)
+            })
+    
     return {
         "uploaded": uploaded,
         "failed": failed,
@@ -188,11 +464,22 @@ async def upload_resumes_batch(
 
 
 @app.get("/resumes", response_model=ResumeListResponse)
-async def list_resumes(user_id: str = Query(..., description="User ID")):
-    """List all resumes for a user with their tags"""
+async def list_resumes(
+    http_request: Request,
+    response: Response,
+    user_id: str = Query(..., description="User ID"),
+    limit: int = Query(default=50, ge=1, le=500, description="Resumes per page"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor from the previous page"),
+    tag: Optional[str] = Query(default=None, description="Only resumes with this tag")
+):
+    """List a page of a user's resumes with their tags, newest first"""
     
     try:
-        resumes = db_manager.list_resumes(user_id)
+        cached = not_modified(http_request, response, corpus_etag(user_id, "resumes", limit, cursor, tag))
+        if cached is not None:
+            return cached
+        
+        resumes, next_cursor = db_manager.list_resumes_page(user_id, limit=limit, cursor=cursor, tag=tag)
         
         return {
             "resumes": [
@@ -200,16 +487,56 @@ async def list_resumes(user_id: str = Query(..., description="User ID")):
                     "resume_id": r["id"],
                     "filename": r["filename"],
                     "created_at": r.get("created_at"),
-                    "tags": r.get("tags", [])
+                    "tags": r.get("tags", []),
+                    "superseded_by": r.get("superseded_by")
                 }
                 for r in resumes
             ],
-            "total": len(resumes)
+            "total": len(resumes),
+            "next_cursor": next_cursor
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching resumes: {str(e)}")
 
 
+@app.get("/resumes/count", response_model=ResumeCountResponse)
+async def count_resumes(
+    http_request: Request,
+    response: Response,
+    user_id: str = Query(..., description="User ID"),
+    tag: Optional[str] = Query(default=None, description="Only count resumes with this tag")
+):
+    """Count a user's resumes without listing them"""
+    
+    try:
+        cached = not_modified(http_request, response, corpus_etag(user_id, "count", tag))
+        if cached is not None:
+            return cached
+        
+        return {"total": db_manager.count_resumes(user_id, tag=tag), "tag": tag}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error counting resumes: {str(e)}")
+
+
+@app.put("/resumes/{resume_id}/tags", response_model=ResumeTagsResponse)
+async def set_resume_tags(resume_id: str, request: ResumeTagsRequest):
+    """Replace a resume's tags (moves it between folders)"""
+    
+    # Same cleanup as uploads: trimmed, no empties, no duplicates
+    tag_list = list(dict.fromkeys(t.strip() for t in request.tags if t.strip()))
+    
+    try:
+        if not db_manager.set_resume_tags(resume_id, tag_list):
+            raise HTTPException(status_code=404, detail="Resume not found")
+        return {"resume_id": resume_id, "tags": tag_list}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error updating tags: {str(e)}")
+
+
 @app.delete("/resumes/{resume_id}", response_model=DeleteResponse)
 async def delete_resume(resume_id: str):
     """Delete a resume and its embedding"""
@@ -232,10 +559,14 @@ async def delete_resume(resume_id: str):
 
 
 @app.get("/folders")
-async def list_folders(user_id: str = Query(..., description="User ID")):
+async def list_folders(http_request: Request, response: Response, user_id: str = Query(..., description="User ID")):
     """List all folders/tags for a user"""
     
     try:
+        cached = not_modified(http_request, response, corpus_etag(user_id, "folders"))
+        if cached is not None:
+            return cached
+        
         from models import FoldersListResponse, FolderInfo
         folders = db_manager.list_folders(user_id)
         
@@ -251,13 +582,27 @@ async def list_folders(user_id: str = Query(..., description="User ID")):
 async def match_job_description(request: MatchRequest):
     """Match job description against user's resumes using LLM-based ranking"""
     
+    trace = current_trace()
+    if trace is not None:
+        trace.fields.update(user_id=request.user_id, k=request.k, candidate_pool=request.candidate_pool)
+    
+    budget_ms = request.time_budget_ms or DEFAULT_MATCH_BUDGET_MS
+    deadline = Deadline(budget_ms) if budget_ms else None
+    
     try:
-        # Run matching engine with optional tag filtering
-        results = matching_engine.match_best_resume(
+        # Run matching engine with optional tag filtering, off the event loop
+        results = await run_in_threadpool(
+            matching_engine.match_best_resume,
             user_id=request.user_id,
             jd_text=request.jd_text,
             k=request.k,
-            tags=request.tags
+            tags=request.tags,
+            must_have_skills=request.must_have_skills,
+            candidate_pool=request.candidate_pool,
+            prescore_model=request.prescore_model,
+            rank_model=request.rank_model,
+            deadline=deadline,
+            explain=request.explain
         )
         
         # Convert to response model
@@ -273,9 +618,24 @@ async def match_job_description(request: MatchRequest):
             for r in results
         ]
         
+        if trace is not None and deadline is not None:
+            trace.fields["degraded_stages"] = deadline.degraded_stages
+        
+        explain = None
+        if request.explain and trace is not None:
+            explain = MatchExplain(
+                total_ms=trace.elapsed_ms(),
+                stages_ms={name: round(seconds * 1000, 2) for name, seconds in trace.timings.items()},
+                counters=trace.counters,
+                query_plan=trace.details.get("query_plan")
+            )
+        
         return {
             "results": candidates,
-            "total_candidates": len(candidates)
+            "total_candidates": len(candidates),
+            "degraded": deadline.degraded if deadline else False,
+            "degraded_stages": deadline.degraded_stages if deadline else [],
+            "explain": explain
         }
         
     except Exception as e:
@@ -284,4 +644,16 @@ async def match_job_description(request: MatchRequest):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Worker processes (env WEB_CONCURRENCY, as gunicorn reads it). Workers share the
+    # match, ranking and embedding caches through a SQLite file unless Redis
+    # (CACHE_REDIS_URL) or another file (SHARED_CACHE_PATH) is configured; every worker
+    # has its own connections and warms up on its own, so route traffic by /ready.
+    # Under gunicorn, configure a shared tier yourself and run
+    # gunicorn -k uvicorn.workers.UvicornWorker -w N main:app
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    if workers > 1:
+        os.environ.setdefault("SHARED_CACHE_PATH", os.path.join(tempfile.gettempdir(), "resudoc-cache.sqlite3"))
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=workers,
+                    app_dir=os.path.dirname(os.path.abspath(__file__)))
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8000)
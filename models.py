@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 class MatchRequest(BaseModel):
     """Request model for job description matching"""
@@ -7,6 +7,12 @@ class MatchRequest(BaseModel):
     jd_text: str = Field(..., description="Job description text")
     k: int = Field(default=5, ge=1, le=20, description="Number of top candidates to return")
     tags: Optional[List[str]] = Field(default=None, description="Optional tags to filter by (e.g., ['SWE', 'Python'])")
+    must_have_skills: Optional[List[str]] = Field(default=None, description="Skills every returned resume must list (e.g., ['Python', 'Kubernetes'])")
+    candidate_pool: Optional[int] = Field(default=None, ge=1, le=200, description="Candidates retrieved by vector search before pre-scoring prunes them to k (defaults to k, i.e. no pre-scoring)")
+    prescore_model: Optional[str] = Field(default=None, description="Small LLM for the pre-scoring stage (e.g. 'gpt-4o-mini'); lexical overlap is used if omitted")
+    rank_model: Optional[str] = Field(default=None, description="LLM for the final ranking stage (defaults to the ranker's model)")
+    time_budget_ms: Optional[int] = Field(default=None, ge=100, le=120000, description="Latency budget; stages that overrun degrade to a local ordering instead of stalling")
+    explain: bool = Field(default=False, description="Also return per-stage timings, token and cache counters, and the vector search query plan")
 
 class CandidateResult(BaseModel):
     """Single candidate result"""
@@ -17,10 +23,20 @@ class CandidateResult(BaseModel):
     key_matches: List[str]
     gaps: List[str]
 
+class MatchExplain(BaseModel):
+    """Profile of a single /match request, returned when explain is set"""
+    total_ms: float
+    stages_ms: Dict[str, float] = Field(default_factory=dict, description="Wall time per pipeline stage")
+    counters: Dict[str, float] = Field(default_factory=dict, description="LLM/embedding tokens, bytes fetched and cache hits/misses")
+    query_plan: Optional[Dict[str, Any]] = Field(default=None, description="EXPLAIN (ANALYZE, BUFFERS) of the vector search query, in Postgres' JSON format")
+
 class MatchResponse(BaseModel):
     """Response model for job description matching"""
     results: List[CandidateResult]
     total_candidates: int
+    degraded: bool = Field(default=False, description="True if a stage overran the latency budget and a fallback was used")
+    degraded_stages: List[str] = []
+    explain: Optional[MatchExplain] = None
 
 class ResumeUploadResponse(BaseModel):
     """Response model for resume upload"""
@@ -28,6 +44,7 @@ class ResumeUploadResponse(BaseModel):
     filename: str
     status: str
     message: Optional[str] = None
+    supersedes: List[str] = Field(default_factory=list, description="Earlier near-duplicate versions this resume replaces in search")
 
 class BatchUploadResponse(BaseModel):
     """Response model for batch resume upload"""
@@ -43,11 +60,27 @@ class ResumeInfo(BaseModel):
     filename: str
     created_at: Optional[str] = None
     tags: List[str] = []
+    superseded_by: Optional[str] = Field(None, description="Newer near-duplicate version that replaces this one in search")
 
 class ResumeListResponse(BaseModel):
-    """Response model for listing resumes"""
+    """Response model for listing resumes (one page)"""
     resumes: List[ResumeInfo]
+    total: int = Field(..., description="Number of resumes in this page; use /resumes/count for the user's total")
+    next_cursor: Optional[str] = Field(default=None, description="Pass as `cursor` to fetch the next page; null on the last page")
+
+class ResumeCountResponse(BaseModel):
+    """Response model for counting resumes"""
     total: int
+    tag: Optional[str] = None
+
+class ResumeTagsRequest(BaseModel):
+    """Request model for replacing a resume's tags"""
+    tags: List[str] = Field(default_factory=list, description="The resume's complete new tag list (e.g., ['SWE', 'Python'])")
+
+class ResumeTagsResponse(BaseModel):
+    """Response model for replacing a resume's tags"""
+    resume_id: str
+    tags: List[str]
 
 class DeleteResponse(BaseModel):
     """Response model for delete operations"""
@@ -60,6 +93,14 @@ class HealthResponse(BaseModel):
     version: str
     database_connected: bool
 
+class ReadinessResponse(BaseModel):
+    """Readiness check response"""
+    status: str
+    database_connected: bool
+    warmed_users: int
+    warmed_resumes: int
+    error: Optional[str] = None
+
 class FolderInfo(BaseModel):
     """Folder/tag information"""
     name: str
@@ -8,17 +8,22 @@ create table if not exists resumes (
   user_id uuid not null,
   filename text, -- Original PDF filename for easy identification
   content text,
-  skills jsonb, -- This stores your list of skills as a JSON array
+  digest text, -- Compact structured summary (roles, tenure, skills, highlights) used in ranking prompts
+  skills jsonb default '[]', -- Canonical (lowercase) skills as a JSON array, extracted at ingest
   tags text[] default '{}', -- Tags/folders for organizing resumes (e.g., ['SWE', 'Python'])
+  lsh_bands bigint[], -- MinHash/LSH band keys for near-duplicate detection (scripts/near_duplicates.py)
+  superseded_by uuid references resumes(id) on delete set null, -- Newer near-duplicate version; hidden from search
   created_at timestamptz default now()
 );
 
 -- 3. Create a table to store resume embeddings
 -- References the resumes table so if you delete a resume, the embedding goes too.
+-- For many tenants, scripts/partition_embeddings.py moves it to a layout hash-partitioned
+-- by user_id with one ANN index per partition.
 create table if not exists resume_embeddings (
   resume_id uuid primary key references resumes(id) on delete cascade,
   user_id uuid not null,
-  embedding vector(1536), -- OpenAI text-embedding-3-small dimension
+  embedding vector(1536), -- OpenAI text-embedding-3-small dimension (the default space, see section 11)
   created_at timestamptz default now()
 );
 
@@ -29,4 +34,109 @@ create index on resume_embeddings using ivfflat (embedding vector_cosine_ops)
 with (lists = 100);
 
 -- 5. Create a GIN index on tags for fast tag-based filtering
-create index if not exists idx_resumes_tags on resumes using gin(tags);
\ No newline at end of file
+create index if not exists idx_resumes_tags on resumes using gin(tags);
+
+-- 6. Create a GIN index on skills for fast must-have skill filtering (skills @> '["python"]')
+create index if not exists idx_resumes_skills on resumes using gin(skills jsonb_path_ops);
+
+-- 7. Per-user corpus version, bumped in the same transaction as every resume/embedding
+-- write or delete. Match results are cached per version, so invalidation is exact.
+create table if not exists user_corpus (
+  user_id uuid primary key,
+  version bigint not null default 0,
+  resume_count bigint not null default 0, -- Maintained by the trigger in section 9
+  updated_at timestamptz default now()
+);
+
+-- 8. Composite index for the paginated resume listing (keyset on created_at, id)
+create index if not exists idx_resumes_user_created on resumes (user_id, created_at desc, id desc);
+
+-- 9. Per-user folder (tag) counts, kept current by triggers in the same transaction as
+-- every resume insert, retag, reassignment and delete, so /folders is a single indexed read
+create table if not exists user_tag_counts (
+  user_id uuid not null,
+  tag text not null,
+  count bigint not null default 0,
+  primary key (user_id, tag)
+);
+
+create or replace function maintain_user_tag_counts() returns trigger as $$
+begin
+  if tg_op in ('UPDATE', 'DELETE') then
+    update user_tag_counts c set count = c.count - 1
+    from (select distinct unnest(coalesce(old.tags, '{}')) as tag) t
+    where c.user_id = old.user_id and c.tag = t.tag;
+    delete from user_tag_counts where user_id = old.user_id and count <= 0;
+    update user_corpus set resume_count = resume_count - 1 where user_id = old.user_id;
+  end if;
+  if tg_op in ('INSERT', 'UPDATE') then
+    insert into user_tag_counts (user_id, tag, count)
+    select new.user_id, t.tag, 1
+    from (select distinct unnest(coalesce(new.tags, '{}')) as tag) t
+    order by t.tag
+    on conflict (user_id, tag) do update set count = user_tag_counts.count + 1;
+    insert into user_corpus (user_id, resume_count) values (new.user_id, 1)
+    on conflict (user_id) do update set resume_count = user_corpus.resume_count + 1;
+  end if;
+  return null;
+end;
+$$ language plpgsql;
+
+drop trigger if exists resumes_tag_counts_insert_delete on resumes;
+create trigger resumes_tag_counts_insert_delete
+after insert or delete on resumes
+for each row execute function maintain_user_tag_counts();
+
+drop trigger if exists resumes_tag_counts_update on resumes;
+create trigger resumes_tag_counts_update
+after update of tags, user_id on resumes
+for each row when (old.tags is distinct from new.tags or old.user_id is distinct from new.user_id)
+execute function maintain_user_tag_counts();
+
+-- 10. Record the schema version this file is equivalent to (see scripts/migrate.py).
+-- Keep in step with MIGRATIONS there; existing databases upgrade with: python scripts/migrate.py
+create table if not exists schema_migrations (
+  version integer primary key,
+  name text not null,
+  applied_at timestamptz default now()
+);
+
+insert into schema_migrations (version, name) values
+  (1, 'base schema'),
+  (2, 'resume tags'),
+  (3, 'canonical skills index and backfill'),
+  (4, 'resume digests'),
+  (5, 'per-user corpus version'),
+  (6, 'resume listing index'),
+  (7, 'incremental folder counts'),
+  (8, 'embedding spaces'),
+  (9, 'near-duplicate detection'),
+  (10, 'embedding owner key')
+on conflict (version) do nothing;
+
+-- 11. Embedding spaces: which model/dimension each embeddings table holds.
+-- Searches read the active space; scripts/reembed.py builds a new space in its own
+-- table (uploads write both meanwhile) and switches to it, so changing the model or
+-- dimension never needs the original PDFs or downtime.
+create table if not exists embedding_spaces (
+  name text primary key,
+  model text not null,
+  dimensions integer not null,
+  table_name text not null unique,
+  status text not null check (status in ('building', 'active', 'retired')),
+  created_at timestamptz default now(),
+  activated_at timestamptz
+);
+
+create unique index if not exists idx_embedding_spaces_active on embedding_spaces ((true)) where status = 'active';
+
+insert into embedding_spaces (name, model, dimensions, table_name, status, activated_at)
+values ('default', 'text-embedding-3-small', 1536, 'resume_embeddings', 'active', now())
+on conflict (name) do nothing;
+
+-- 12. GIN index on LSH band keys, so near-duplicates of an upload are found by key overlap
+create index if not exists idx_resumes_lsh_bands on resumes using gin(lsh_bands);
+
+-- 13. Unique (resume_id, user_id) key on embeddings: uploads upsert on it, and it is the
+-- primary key once scripts/partition_embeddings.py partitions the table by user_id
+create unique index if not exists resume_embeddings_resume_user_key on resume_embeddings (resume_id, user_id);
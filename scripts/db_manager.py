@@ -1,9 +1,70 @@
 import os
-from dotenv import load_dotenv
-load_dotenv()
+import re
+import json
+import uuid
+import base64
+import hashlib
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime
 import psycopg2
+import psycopg2.errors
+import psycopg2.extensions
+from psycopg2.pool import ThreadedConnectionPool
 from pgvector.psycopg2 import register_vector
-from typing import List, Any, Optional, Tuple, Dict
+from typing import List, Any, Optional, Tuple, Dict, Set, Iterator
+from metrics import record_bytes
+from migrate import LATEST_VERSION
+
+# Optional schema features, detected once at connect (see _detect_schema)
+ALL_CAPABILITIES = {"tags", "digest", "user_corpus", "tag_counts", "embedding_spaces", "near_duplicates",
+                    "embedding_owner_key", "partitioned_embeddings"}
+# Rows per round trip when streaming large scans (see stream_batches)
+DEFAULT_ITERSIZE = int(os.getenv("DB_ITERSIZE", "2000"))
+
+
+def stream_batches(connection_string: str, query: str, params: Tuple = None,
+                   batch_size: int = None) -> Iterator[List[Tuple]]:
+    """
+    Streams a query's results in lists of up to batch_size rows (default: DB_ITERSIZE)
+    through a server-side cursor on its own read-only connection, so scans over the
+    whole corpus (re-embedding, backfills, exports) run in constant memory while the
+    caller keeps writing and committing on another connection. For scripts that don't
+    need a DbManager (and its pool); see DbManager.iter_batches.
+    """
+    batch_size = batch_size or DEFAULT_ITERSIZE
+    conn = psycopg2.connect(connection_string)
+    try:
+        register_vector(conn)
+        conn.set_session(readonly=True)
+        with conn.cursor(name=f"resudoc_scan_{uuid.uuid4().hex[:12]}") as cur:
+            cur.itersize = batch_size
+            cur.execute(query, params)
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield rows
+    except Exception as e:
+        # A scan that ends early must not look complete to the caller
+        print(f"Error streaming data: {e}")
+        raise
+    finally:
+        conn.close()
+
+
+class PooledConnection(psycopg2.extensions.connection):
+    """
+    A connection from DbManager's pool, with pgvector types registered and the
+    prepared statements of its session (see DbManager._fetch_prepared).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared: Set[str] = set()
+        register_vector(self)
+        self.commit()
 
 class DbManager:
     """
@@ -11,234 +72,566 @@ class DbManager:
     Handles connection, raw execution, and embedding storage plumbing.
     """
 
-    def __init__(self, connection_string: Optional[str] = None):
+    # The embedding space every database starts with (and the only one before migration 8)
+    DEFAULT_EMBEDDING_SPACE = {"name": "default", "model": "text-embedding-3-small", "dimensions": 1536,
+                               "table": "resume_embeddings", "status": "active"}
+    # How long embedding_spaces() is cached; a switch by scripts/reembed.py reaches
+    # every worker within this window
+    EMBEDDING_SPACES_TTL_SECONDS = 30
+
+    def __init__(self, connection_string: Optional[str] = None, connect: bool = True):
+        """
+        Initialize the Db Manager.
+
+        Args:
+            connection_string (str): Postgres URL. If None, reads env DATABASE_URL; without
+                one, runs in MOCK mode.
+            connect (bool): Connect now. Servers pass False and call connect() (and
+                warm_up()) from their startup hook, so importing the app stays cheap.
+        """
         self.connection_string = connection_string or os.getenv("DATABASE_URL")
-        self.conn = None
+        # Each transaction runs on a connection of its own from this pool (see connection());
+        # None in MOCK mode
+        self.pool: Optional[ThreadedConnectionPool] = None
+        self.pool_size = int(os.getenv("DB_POOL_SIZE", "20"))
+        self._pool_slots = threading.BoundedSemaphore(self.pool_size)
+        self._local = threading.local()
+        # Corpus versions for MOCK mode (see get_corpus_version)
+        self._mock_corpus_versions: Dict[str, int] = {}
+        # Server-side prepared statements for hot-path queries. Turn off when connecting
+        # through a pooler in transaction mode (e.g. PgBouncer), which can't keep them
+        self.use_prepared_statements = os.getenv("DB_PREPARED_STATEMENTS", "1").lower() not in ("0", "false", "no")
+        # Rows per round trip when streaming large scans (see iter_batches)
+        self.itersize = DEFAULT_ITERSIZE
+        # Schema features this database has; MOCK mode behaves like a fully migrated one
+        self.schema_version: Optional[int] = LATEST_VERSION
+        self.capabilities: Set[str] = set(ALL_CAPABILITIES - {"partitioned_embeddings"})
+        # (expires_at, spaces) for embedding_spaces()
+        self._embedding_spaces: Tuple[float, Optional[List[Dict[str, Any]]]] = (0.0, None)
         
-        if self.connection_string:
+        if connect:
+            self.connect()
+
+    def connect(self) -> bool:
+        """
+        Opens the connection pool and detects the schema. Returns False in MOCK mode or on failure.
+        """
+        if not self.connection_string:
+            print("Warning: No DATABASE_URL provided. Running in MOCK mode.")
+            return False
+        try:
+            self.pool = ThreadedConnectionPool(1, self.pool_size, self.connection_string,
+                                               connection_factory=PooledConnection)
+            self._detect_schema()
+            return True
+        except Exception as e:
+            print(f"Error connecting to database: {e}")
+            self.close()
+            return False
+
+    @contextmanager
+    def connection(self):
+        """
+        The calling thread's connection for one transaction. Requests run on several
+        threads (the threadpool, deadline stages), and psycopg2 keeps one transaction
+        per connection, so each checkout gets a connection no other thread uses until
+        it is returned. Nested checkouts on a thread share the outer one's transaction.
+        Waits while all DB_POOL_SIZE connections are checked out; whatever the caller
+        left uncommitted is rolled back on return.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            yield conn
+            return
+
+        with self._pool_slots:
+            conn = self.pool.getconn()
+            self._local.conn = conn
             try:
-                self.conn = psycopg2.connect(self.connection_string)
-                register_vector(self.conn)
+                yield conn
+            finally:
+                self._local.conn = None
+                broken = bool(conn.closed)
+                if not broken and conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    try:
+                        conn.rollback()
+                    except Exception:
+                        broken = True
+                self.pool.putconn(conn, close=broken)
+
+    def warm_up(self):
+        """
+        Loads what the first requests would otherwise wait for: a round trip on the new
+        connection and the embedding spaces cache.
+        """
+        if not self.pool:
+            return
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1;")
+                conn.commit()
+                self.embedding_spaces()
             except Exception as e:
-                print(f"Error connecting to database: {e}")
-                self.conn = None
-        else:
-            print("Warning: No DATABASE_URL provided. Running in MOCK mode.")
+                print(f"Error warming up database connection: {e}")
+                conn.rollback()
 
-    def upsert_embedding(self, resume_id: str, user_id: str, embedding: List[float]) -> bool:
+    def upsert_embedding(self, resume_id: str, user_id: str, embedding: List[float], table: str = "resume_embeddings") -> bool:
         """
         Inserts or updates a resume embedding.
         """
-        if not self.conn:
-            print(f"[MOCK DB] Upserting embedding for resume {resume_id}, user {user_id}")
-            return True
+        return self.upsert_embeddings(resume_id, user_id, {table: embedding})
 
-        query = """
-            INSERT INTO resume_embeddings (resume_id, user_id, embedding)
-            VALUES (%s, %s, %s)
-            ON CONFLICT (resume_id) 
-            DO UPDATE SET embedding = EXCLUDED.embedding, user_id = EXCLUDED.user_id;
+    def upsert_embeddings(self, resume_id: str, user_id: str, embeddings: Dict[str, List[float]]) -> bool:
         """
-        try:
-            with self.conn.cursor() as cur:
-                cur.execute(query, (resume_id, user_id, embedding))
-            self.conn.commit()
+        Inserts or updates a resume's embedding in each given table (one per embedding
+        space, see Embedder.embed_for_spaces) in a single transaction.
+        """
+        if not self.pool:
+            print(f"[MOCK DB] Upserting embedding for resume {resume_id}, user {user_id}")
+            self._bump_mock_corpus_version(user_id)
             return True
-        except Exception as e:
-            print(f"Error upserting embedding: {e}")
-            self.conn.rollback()
-            return False
+
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    for table, embedding in embeddings.items():
+                        # Partitioned tables key on (resume_id, user_id), since the key must include the
+                        # partition column; migration 10 gives plain tables that key too, so the same
+                        # statement keeps working while scripts/partition_embeddings.py swaps the layout
+                        owner_key = self.supports("embedding_owner_key")
+                        conflict = "resume_id, user_id" if owner_key else "resume_id"
+                        if owner_key:
+                            # A resume that changed owner would otherwise keep its old row (or partition)
+                            cur.execute(f"DELETE FROM {table} WHERE resume_id = %s AND user_id <> %s;", (resume_id, user_id))
+                        cur.execute(f"""
+                            INSERT INTO {table} (resume_id, user_id, embedding)
+                            VALUES (%s, %s, %s)
+                            ON CONFLICT ({conflict}) 
+                            DO UPDATE SET embedding = EXCLUDED.embedding, user_id = EXCLUDED.user_id;
+                        """, (resume_id, user_id, embedding))
+                    self._bump_corpus_version(cur, user_id)
+                conn.commit()
+                return True
+            except Exception as e:
+                print(f"Error upserting embedding: {e}")
+                conn.rollback()
+                if isinstance(e, psycopg2.errors.InvalidColumnReference) and not self.supports("embedding_owner_key"):
+                    # The table got its (resume_id, user_id) key after this worker connected
+                    # (migration 10, or partition_embeddings.py swapped the layout): detect and retry
+                    self._detect_schema()
+                    if self.supports("embedding_owner_key"):
+                        return self.upsert_embeddings(resume_id, user_id, embeddings)
+                return False
 
     def delete_embedding(self, resume_id: str) -> bool:
         """
-        Deletes a resume embedding.
+        Deletes a resume embedding (from every embedding space being served or built).
         """
-        if not self.conn:
+        if not self.pool:
             print(f"[MOCK DB] Deleting embedding for resume {resume_id}")
+            self._bump_mock_corpus_version(None)
             return True
 
-        query = "DELETE FROM resume_embeddings WHERE resume_id = %s;"
-        try:
-            with self.conn.cursor() as cur:
-                cur.execute(query, (resume_id,))
-            self.conn.commit()
-            return True
-        except Exception as e:
-            print(f"Error deleting embedding: {e}")
-            self.conn.rollback()
-            return False
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    owners = set()
+                    for space in self.embedding_spaces():
+                        cur.execute(f"DELETE FROM {space['table']} WHERE resume_id = %s RETURNING user_id;", (resume_id,))
+                        owners.update(str(row[0]) for row in cur.fetchall())
+                    for user_id in owners:
+                        self._bump_corpus_version(cur, user_id)
+                conn.commit()
+                return True
+            except Exception as e:
+                print(f"Error deleting embedding: {e}")
+                conn.rollback()
+                return False
 
-    def upsert_resume(self, resume_id: str, user_id: str, content: str, skills: List[str] = [], filename: str = None, tags: List[str] = []) -> bool:
+    def upsert_resume(self, resume_id: str, user_id: str, content: str, skills: List[str] = [], filename: str = None, tags: List[str] = [], digest: str = None,
+                      lsh_bands: List[int] = None) -> bool:
         """
-        Inserts or updates resume metadata (content, skills, filename, tags).
+        Inserts or updates resume metadata (content, skills, filename, tags, digest, LSH band keys).
+        A re-uploaded resume is the latest version again, even if a near-duplicate had superseded it.
         """
-        if not self.conn:
+        if not self.pool:
             print(f"[MOCK DB] Upserting resume metadata for {resume_id}")
+            self._bump_mock_corpus_version(user_id)
             return True
 
-        # Try with tags first, fall back to without tags if column doesn't exist
-        try:
-            query = """
-                INSERT INTO resumes (id, user_id, filename, content, skills, tags)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                ON CONFLICT (id) 
-                DO UPDATE SET filename = EXCLUDED.filename, content = EXCLUDED.content, skills = EXCLUDED.skills, tags = EXCLUDED.tags, user_id = EXCLUDED.user_id;
-            """
-            with self.conn.cursor() as cur:
-                from psycopg2.extras import Json
-                cur.execute(query, (resume_id, user_id, filename, content, Json(skills), tags))
-            self.conn.commit()
-            return True
-        except Exception as e:
-            # If tags column doesn't exist, try without it
-            if "tags" in str(e).lower():
-                print(f"Warning: tags column not found, inserting without tags")
-                self.conn.rollback()
-                try:
-                    query = """
-                        INSERT INTO resumes (id, user_id, filename, content, skills)
-                        VALUES (%s, %s, %s, %s, %s)
-                        ON CONFLICT (id) 
-                        DO UPDATE SET filename = EXCLUDED.filename, content = EXCLUDED.content, skills = EXCLUDED.skills, user_id = EXCLUDED.user_id;
-                    """
-                    with self.conn.cursor() as cur:
-                        from psycopg2.extras import Json
-                        cur.execute(query, (resume_id, user_id, filename, content, Json(skills)))
-                    self.conn.commit()
-                    return True
-                except Exception as e2:
-                    print(f"Error upserting resume metadata: {e2}")
-                    self.conn.rollback()
-                    return False
-            else:
+        from psycopg2.extras import Json
+        columns = ["id", "user_id", "filename", "content", "skills"]
+        values = (resume_id, user_id, filename, content, Json(skills))
+        # Columns older databases may not have yet
+        for column, value in (("tags", tags), ("digest", digest)):
+            if self.supports(column):
+                columns.append(column)
+                values += (value,)
+        if self.supports("near_duplicates"):
+            columns += ["lsh_bands", "superseded_by"]
+            values += (lsh_bands, None)
+
+        updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in columns if c != "id")
+        query = f"""
+            INSERT INTO resumes ({", ".join(columns)})
+            VALUES ({", ".join(["%s"] * len(columns))})
+            ON CONFLICT (id) 
+            DO UPDATE SET {updates};
+        """
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(query, values)
+                    self._bump_corpus_version(cur, user_id)
+                conn.commit()
+                return True
+            except Exception as e:
                 print(f"Error upserting resume metadata: {e}")
-                self.conn.rollback()
+                conn.rollback()
                 return False
 
-    def get_resumes_by_ids(self, resume_ids: List[str]) -> Dict[str, Any]:
+    def get_resumes_by_ids(self, resume_ids: List[str], content_chars: int = None) -> Dict[str, Any]:
         """
-        Fetches resume details (content, skills) for a list of IDs.
+        Fetches resume details (content, skills, digest) for a list of IDs.
+        With content_chars, only that many leading characters of each resume are
+        returned, cut server-side (left()), so long resumes aren't shipped whole.
         Returns a dictionary mapping resume_id to details.
         """
         if not resume_ids:
             return {}
 
-        if not self.conn:
+        if not self.pool:
             print(f"[MOCK DB] Fetching details for {len(resume_ids)} resumes")
             return {
-                rid: {"content": f"Mock Content for {rid}", "skills": ["Mock Skill"]}
+                rid: {"content": f"Mock Content for {rid}"[:content_chars], "skills": ["Mock Skill"], "digest": None}
                 for rid in resume_ids
             }
 
-        # Cast the string array to UUID array for PostgreSQL
-        query = "SELECT id, filename, content, skills FROM resumes WHERE id = ANY(%s::uuid[]);"
+        if content_chars:
+            content, name, types, params = "left(content, $2)", "resudoc_resumes_trimmed", ["uuid[]", "integer"], (resume_ids, content_chars)
+        else:
+            content, name, types, params = "content", "resudoc_resumes_full", ["uuid[]"], (resume_ids,)
+        digest = "digest" if self.supports("digest") else "NULL"
+        query = f"SELECT id, filename, {content}, skills, {digest} FROM resumes WHERE id = ANY($1::uuid[])"
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    rows = self._fetch_prepared(cur, name, query, types, params)
+            except Exception as e:
+                print(f"Error fetching resume details: {e}")
+                conn.rollback()
+                return {}
+
+        record_bytes("db_content", sum(len(row[2] or "") + len(row[4] or "") for row in rows))
+        return {
+            str(row[0]): {"filename": row[1], "content": row[2], "skills": row[3], "digest": row[4]}
+            for row in rows
+        }
+
+    def fetch_prepared(self, name: str, query: str, param_types: List[str], params: Tuple,
+                       timeout_ms: int = None) -> List[Tuple]:
+        """
+        Executes a hot-path query (written with $1..$n placeholders) as a prepared
+        statement and returns all results; see _fetch_prepared.
+        With timeout_ms, Postgres cancels the statement once it runs that long.
+        Unlike fetch_all, errors are raised (after rolling back) so callers can
+        tell a failed query from an empty result.
+        """
+        if not self.pool:
+            print(f"[MOCK DB] Fetching prepared: {name}")
+            return []
+
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    if timeout_ms:
+                        cur.execute("SET LOCAL statement_timeout = %s;", (int(timeout_ms),))
+                    rows = self._fetch_prepared(cur, name, query, param_types, params)
+                if timeout_ms:
+                    # End the transaction so the SET LOCAL doesn't apply to later queries
+                    conn.commit()
+                return rows
+            except Exception:
+                conn.rollback()
+                raise
+
+    @staticmethod
+    def to_pyformat(query: str, params: Tuple) -> Tuple[str, Dict[str, Any]]:
+        """
+        Rewrites $1..$n placeholders for client-side binding ($n -> %(pn)s), which
+        keeps parameters that appear more than once working.
+        """
+        return re.sub(r"\$(\d+)", r"%(p\1)s", query), {f"p{i}": v for i, v in enumerate(params, 1)}
+
+    def _fetch_prepared(self, cur, name: str, query: str, param_types: List[str], params: Tuple) -> List[Tuple]:
+        """
+        Runs a query written with $1..$n placeholders as a named prepared statement,
+        preparing it on first use in this session, so repeat calls skip parsing and planning.
+        The statement name gets a fingerprint of the query text, so changed SQL is prepared anew.
+        With prepared statements turned off, the same query runs as a plain statement.
+        """
+        if not self.use_prepared_statements:
+            cur.execute(*self.to_pyformat(query, params))
+            return cur.fetchall()
+
+        # The SQL behind a name can change at runtime (_detect_schema rereads the optional
+        # features queries are built for), so a session must not keep executing the plan
+        # it prepared earlier: statements are named after their text too
+        name = f"{name}_{hashlib.sha1(query.encode('utf-8')).hexdigest()[:10]}"
+        prepared = cur.connection.prepared
+        if name not in prepared:
+            cur.execute(f"PREPARE {name} ({', '.join(param_types)}) AS {query};")
+            prepared.add(name)
+        arguments = ", ".join(f"%s::{t}" for t in param_types)
         try:
-            with self.conn.cursor() as cur:
-                cur.execute(query, (resume_ids,))
-                rows = cur.fetchall()
-                
-            return {
-                str(row[0]): {"filename": row[1], "content": row[2], "skills": row[3]}
-                for row in rows
-            }
-        except Exception as e:
-            print(f"Error fetching resume details: {e}")
-            return {}
+            cur.execute(f"EXECUTE {name} ({arguments});", params)
+        except psycopg2.Error as e:
+            # The session lost the statement (e.g. a reconnect behind a pooler): prepare again next time
+            if "prepared statement" in str(e).lower():
+                prepared.discard(name)
+            raise
+        return cur.fetchall()
 
     def execute(self, query: str, params: Tuple = None):
         """
         Executes a raw SQL query (for inserts/updates without return).
         """
-        if not self.conn:
+        if not self.pool:
             print(f"[MOCK DB] Executing: {query}")
             return
 
-        try:
-            with self.conn.cursor() as cur:
-                cur.execute(query, params)
-            self.conn.commit()
-        except Exception as e:
-            print(f"Error executing query: {e}")
-            self.conn.rollback()
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(query, params)
+                conn.commit()
+            except Exception as e:
+                print(f"Error executing query: {e}")
+                conn.rollback()
 
-    def fetch_all(self, query: str, params: Tuple = None) -> List[Tuple]:
+    def fetch_all(self, query: str, params: Tuple = None, timeout_ms: int = None) -> List[Tuple]:
         """
         Executes a query and returns all results.
+        With timeout_ms, Postgres cancels the statement once it runs that long.
         """
-        if not self.conn:
+        if not self.pool:
             print(f"[MOCK DB] Fetching all: {query}")
             return []
 
-        try:
-            with self.conn.cursor() as cur:
-                cur.execute(query, params)
-                return cur.fetchall()
-        except Exception as e:
-            print(f"Error fetching data: {e}")
-            return []
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    if timeout_ms:
+                        cur.execute("SET LOCAL statement_timeout = %s;", (int(timeout_ms),))
+                    cur.execute(query, params)
+                    rows = cur.fetchall()
+                if timeout_ms:
+                    # End the transaction so the SET LOCAL doesn't apply to later queries
+                    conn.commit()
+                return rows
+            except Exception as e:
+                print(f"Error fetching data: {e}")
+                conn.rollback()
+                return []
 
-    def list_resumes(self, user_id: str) -> List[Dict[str, Any]]:
+    def iter_batches(self, query: str, params: Tuple = None, batch_size: int = None) -> Iterator[List[Tuple]]:
         """
-        Lists all resumes for a given user with their tags.
+        Streams a query's results in lists of up to batch_size rows (default: itersize)
+        through a server-side cursor; see stream_batches. The scan uses its own
+        read-only connection, outside the pool, so the caller can keep writing and
+        committing through this DbManager between batches.
+        """
+        if not self.pool:
+            print(f"[MOCK DB] Streaming: {query}")
+            return
+
+        yield from stream_batches(self.connection_string, query, params, batch_size or self.itersize)
+
+    def iter_rows(self, query: str, params: Tuple = None, itersize: int = None) -> Iterator[Tuple]:
+        """
+        Streams a query's results row by row; see iter_batches.
+        """
+        for batch in self.iter_batches(query, params, itersize):
+            yield from batch
+
+    def list_resumes(self, user_id: str, tag: str = None) -> List[Dict[str, Any]]:
+        """
+        Lists all resumes for a given user with their tags (newest first).
+        Prefer list_resumes_page for anything user-facing.
+        """
+        resumes, _ = self.list_resumes_page(user_id, limit=None, tag=tag)
+        return resumes
+
+    def list_resumes_page(self, user_id: str, limit: Optional[int] = 50, cursor: str = None,
+                          tag: str = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Lists one page of a user's resumes, newest first, optionally only those with a tag.
+        Pages are keyset-based on (created_at, id), served by idx_resumes_user_created,
+        so later pages cost the same as the first.
+
+        Returns:
+            (resumes, next_cursor): next_cursor is None on the last page.
+
+        Raises:
+            ValueError: If the cursor is malformed.
         """
-        if not self.conn:
+        after = self.decode_cursor(cursor) if cursor else None
+
+        if not self.pool:
             print(f"[MOCK DB] Listing resumes for user {user_id}")
-            return []
+            return [], None
 
-        query = """
-            SELECT id, filename, created_at, tags 
+        if tag and not self.supports("tags"):
+            return [], None
+
+        filters = ["user_id = %s"]
+        params: List[Any] = [user_id]
+        if tag:
+            filters.append("tags @> ARRAY[%s]::text[]")
+            params.append(tag)
+        if after:
+            filters.append("(created_at, id) < (%s::timestamptz, %s::uuid)")
+            params.extend(after)
+
+        # One extra row tells whether another page exists
+        query = f"""
+            SELECT id, filename, created_at, {"tags" if self.supports("tags") else "NULL"},
+                   {"superseded_by" if self.supports("near_duplicates") else "NULL"}
             FROM resumes 
-            WHERE user_id = %s 
-            ORDER BY created_at DESC;
+            WHERE {" AND ".join(filters)}
+            ORDER BY created_at DESC, id DESC
+            {"LIMIT %s" if limit else ""};
+        """
+        if limit:
+            params.append(limit + 1)
+
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(query, tuple(params))
+                    rows = cur.fetchall()
+            except Exception as e:
+                print(f"Error listing resumes: {e}")
+                conn.rollback()
+                return [], None
+
+        next_cursor = None
+        if limit and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self.encode_cursor(rows[-1][2], rows[-1][0])
+
+        return [
+            {
+                "id": str(row[0]),
+                "filename": row[1],
+                "created_at": str(row[2]) if row[2] else None,
+                "tags": row[3] if row[3] else [],
+                "superseded_by": str(row[4]) if row[4] else None
+            }
+            for row in rows
+        ], next_cursor
+
+    def count_resumes(self, user_id: str, tag: str = None) -> int:
+        """
+        Counts a user's resumes (optionally with a tag) without fetching them.
+        Reads the trigger-maintained summary tables (one indexed row); counts
+        resumes on databases that predate them.
+        """
+        if not self.pool:
+            print(f"[MOCK DB] Counting resumes for user {user_id}")
+            return 0
+        if tag and not self.supports("tags"):
+            return 0
+
+        if self.supports("tag_counts"):
+            if tag:
+                query, params = "SELECT count FROM user_tag_counts WHERE user_id = %s AND tag = %s;", (user_id, tag)
+            else:
+                query, params = "SELECT resume_count FROM user_corpus WHERE user_id = %s;", (user_id,)
+        elif tag:
+            query, params = "SELECT COUNT(*) FROM resumes WHERE user_id = %s AND tags @> ARRAY[%s]::text[];", (user_id, tag)
+        else:
+            query, params = "SELECT COUNT(*) FROM resumes WHERE user_id = %s;", (user_id,)
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(query, params)
+                    row = cur.fetchone()
+                # End the read-only transaction so later reads see fresh counts
+                conn.commit()
+                return row[0] if row else 0
+            except Exception as e:
+                print(f"Error counting resumes: {e}")
+                conn.rollback()
+                return 0
+
+    @staticmethod
+    def encode_cursor(created_at, resume_id) -> str:
+        """
+        Opaque page cursor for the position after (created_at, id).
+        """
+        raw = json.dumps([created_at.isoformat() if hasattr(created_at, "isoformat") else str(created_at), str(resume_id)])
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[str, str]:
+        """
+        Inverse of encode_cursor.
+
+        Raises:
+            ValueError: If the cursor was not produced by encode_cursor.
         """
         try:
-            with self.conn.cursor() as cur:
-                cur.execute(query, (user_id,))
-                rows = cur.fetchall()
-                
-            return [
-                {
-                    "id": str(row[0]),
-                    "filename": row[1],
-                    "created_at": str(row[2]) if row[2] else None,
-                    "tags": row[3] if row[3] else []
-                }
-                for row in rows
-            ]
-        except Exception as e:
-            print(f"Error listing resumes: {e}")
-            return []
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+            created_at, resume_id = json.loads(raw)
+            datetime.fromisoformat(created_at)
+            uuid.UUID(resume_id)
+            return created_at, resume_id
+        except Exception:
+            raise ValueError(f"Invalid cursor: {cursor}")
 
     def delete_resume(self, resume_id: str) -> bool:
         """
         Deletes a resume and its embedding (cascade will handle embedding).
         """
-        if not self.conn:
+        if not self.pool:
             print(f"[MOCK DB] Deleting resume {resume_id}")
+            self._bump_mock_corpus_version(None)
             return True
 
-        query = "DELETE FROM resumes WHERE id = %s;"
-        try:
-            with self.conn.cursor() as cur:
-                cur.execute(query, (resume_id,))
-                deleted = cur.rowcount > 0
-            self.conn.commit()
-            return deleted
-        except Exception as e:
-            print(f"Error deleting resume: {e}")
-            self.conn.rollback()
-            return False
+        query = "DELETE FROM resumes WHERE id = %s RETURNING user_id;"
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(query, (resume_id,))
+                    row = cur.fetchone()
+                    deleted = row is not None
+                    if deleted:
+                        self._bump_corpus_version(cur, str(row[0]))
+                conn.commit()
+                return deleted
+            except Exception as e:
+                print(f"Error deleting resume: {e}")
+                conn.rollback()
+                return False
 
     def list_folders(self, user_id: str) -> List[Dict[str, Any]]:
         """
         Lists all unique tags/folders for a user with resume counts.
-        Returns empty list if tags column doesn't exist.
+        Reads the trigger-maintained user_tag_counts table, so the cost does not
+        grow with the number of resumes; aggregates resumes.tags on databases
+        that predate it. Returns empty list if tags column doesn't exist.
         """
-        if not self.conn:
+        if not self.pool:
             print(f"[MOCK DB] Listing folders for user {user_id}")
             return []
+        if not self.supports("tags"):
+            return []
 
-        try:
+        if self.supports("tag_counts"):
+            query = "SELECT tag, count FROM user_tag_counts WHERE user_id = %s AND count > 0 ORDER BY tag;"
+        else:
             query = """
                 SELECT UNNEST(tags) as tag, COUNT(*) as count
                 FROM resumes
@@ -246,29 +639,56 @@ class DbManager:
                 GROUP BY tag
                 ORDER BY tag;
             """
-            with self.conn.cursor() as cur:
-                cur.execute(query, (user_id,))
-                rows = cur.fetchall()
-                
-            return [
-                {
-                    "name": row[0],
-                    "count": row[1]
-                }
-                for row in rows
-            ]
-        except Exception as e:
-            # If tags column doesn't exist, just return empty list
-            if "tags" in str(e).lower() or "does not exist" in str(e).lower():
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(query, (user_id,))
+                    rows = cur.fetchall()
+                conn.commit()
+            except Exception as e:
+                print(f"Error listing folders: {e}")
+                conn.rollback()
                 return []
-            print(f"Error listing folders: {e}")
-            return []
+                
+        return [
+            {
+                "name": row[0],
+                "count": row[1]
+            }
+            for row in rows
+        ]
+
+    def set_resume_tags(self, resume_id: str, tags: List[str]) -> bool:
+        """
+        Replaces a resume's tags. Folder counts follow via the resumes triggers.
+        Returns False if the resume doesn't exist.
+        """
+        if not self.pool:
+            print(f"[MOCK DB] Setting tags for resume {resume_id}: {tags}")
+            self._bump_mock_corpus_version(None)
+            return True
+
+        query = "UPDATE resumes SET tags = %s WHERE id = %s RETURNING user_id;"
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(query, (tags, resume_id))
+                    row = cur.fetchone()
+                    if row:
+                        # Tags filter matches, so cached results for this user are stale
+                        self._bump_corpus_version(cur, str(row[0]))
+                conn.commit()
+                return row is not None
+            except Exception as e:
+                print(f"Error setting resume tags: {e}")
+                conn.rollback()
+                return False
 
     def get_resumes_by_tags(self, user_id: str, tags: List[str]) -> List[str]:
         """
         Gets resume IDs that match ANY of the given tags.
         """
-        if not self.conn:
+        if not self.pool:
             print(f"[MOCK DB] Getting resumes by tags for user {user_id}")
             return []
 
@@ -277,16 +697,246 @@ class DbManager:
             FROM resumes
             WHERE user_id = %s AND tags && %s
         """
-        try:
-            with self.conn.cursor() as cur:
-                cur.execute(query, (user_id, tags))
-                rows = cur.fetchall()
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(query, (user_id, tags))
+                    rows = cur.fetchall()
                 
-            return [str(row[0]) for row in rows]
-        except Exception as e:
-            print(f"Error getting resumes by tags: {e}")
+                return [str(row[0]) for row in rows]
+            except Exception as e:
+                print(f"Error getting resumes by tags: {e}")
+                return []
+
+    def supersede_near_duplicates(self, resume_id: str, user_id: str, lsh_bands: List[int],
+                                  min_similarity: float = 0.95) -> List[str]:
+        """
+        Marks the user's resumes that are near-duplicates of this (newly stored) one as
+        superseded by it, so searches only return the latest version. Candidates share
+        an LSH band key (see NearDuplicateDetector) and are confirmed by the cosine
+        similarity of their embeddings in the active space. Versions those resumes had
+        superseded are re-pointed to this one.
+
+        Returns:
+            List[str]: IDs of the resumes now superseded by this one.
+        """
+        if not self.pool:
+            print(f"[MOCK DB] Checking near-duplicates of resume {resume_id}")
+            return []
+        if not lsh_bands or not self.supports("near_duplicates"):
             return []
 
+        table = self.active_embedding_space()["table"]
+        query = f"""
+            WITH matches AS (
+                SELECT r.id
+                FROM resumes r
+                JOIN {table} e ON e.resume_id = r.id
+                JOIN {table} n ON n.resume_id = %(id)s
+                WHERE r.user_id = %(user_id)s AND r.id <> %(id)s AND r.superseded_by IS NULL
+                  AND r.lsh_bands && %(bands)s::bigint[]
+                  AND 1 - (e.embedding <=> n.embedding) >= %(min_similarity)s
+            )
+            UPDATE resumes SET superseded_by = %(id)s
+            WHERE user_id = %(user_id)s
+              AND (id IN (SELECT id FROM matches) OR superseded_by IN (SELECT id FROM matches))
+            RETURNING id;
+        """
+        params = {"id": resume_id, "user_id": user_id, "bands": lsh_bands, "min_similarity": min_similarity}
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(query, params)
+                    superseded = [str(row[0]) for row in cur.fetchall()]
+                    if superseded:
+                        self._bump_corpus_version(cur, user_id)
+                conn.commit()
+                return superseded
+            except Exception as e:
+                print(f"Error checking near-duplicates: {e}")
+                conn.rollback()
+                return []
+
+    def get_corpus_version(self, user_id: str) -> Optional[int]:
+        """
+        Returns the user's corpus version, which changes whenever one of their resumes
+        or embeddings is written or deleted. Results computed against one version stay
+        valid until it changes. None if versions are not tracked (user_corpus table missing).
+        """
+        if not self.pool:
+            return self._mock_corpus_versions.setdefault(user_id, 0)
+        if not self.supports("user_corpus"):
+            return None
+
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT version FROM user_corpus WHERE user_id = %s;", (user_id,))
+                    row = cur.fetchone()
+                # End the read-only transaction so later reads see fresh versions
+                conn.commit()
+                return row[0] if row else 0
+            except Exception as e:
+                print(f"Error reading corpus version: {e}")
+                conn.rollback()
+                return None
+
+    def hot_users(self, limit: int = 20) -> List[str]:
+        """
+        The users whose corpus changed most recently, as a stand-in for the most active.
+        Empty in MOCK mode or without the user_corpus table. Unlike the request-path
+        reads, errors are raised, so a failed warm-up is reported (see main.py /ready).
+        """
+        if not self.pool or not self.supports("user_corpus") or limit <= 0:
+            return []
+        with self.connection() as conn, conn.cursor() as cur:
+            cur.execute("SELECT user_id FROM user_corpus ORDER BY updated_at DESC NULLS LAST LIMIT %s;", (limit,))
+            return [str(row[0]) for row in cur.fetchall()]
+
+    def preload_users(self, user_ids: List[str], table: str = "resume_embeddings") -> int:
+        """
+        Reads the users' resumes and embeddings once, so their pages are in Postgres's
+        buffer cache before their first search. Returns the number of resumes read.
+        Errors are raised, as in hot_users.
+        """
+        if not self.pool or not user_ids:
+            return 0
+        with self.connection() as conn, conn.cursor() as cur:
+            cur.execute(f"""
+                SELECT count(*), sum(length(r.content)), sum(pg_column_size(e.embedding))
+                FROM resumes r JOIN {table} e ON e.resume_id = r.id
+                WHERE r.user_id = ANY(%s::uuid[]) AND e.user_id = ANY(%s::uuid[]);
+            """, (user_ids, user_ids))
+            return cur.fetchone()[0]
+
+    def embedding_spaces(self) -> List[Dict[str, Any]]:
+        """
+        The embedding spaces being served: the active one, which searches read, then
+        any that scripts/reembed.py is building, which uploads also write. Each is a
+        dict of name, model, dimensions, table and status.
+        """
+        if not self.pool or not self.supports("embedding_spaces"):
+            return [dict(self.DEFAULT_EMBEDDING_SPACE)]
+
+        expires_at, spaces = self._embedding_spaces
+        if spaces is not None and expires_at > time.monotonic():
+            return spaces
+
+        query = """
+            SELECT name, model, dimensions, table_name, status
+            FROM embedding_spaces
+            WHERE status IN ('active', 'building')
+            ORDER BY status = 'building', created_at;
+        """
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(query)
+                    rows = cur.fetchall()
+                conn.commit()
+            except Exception as e:
+                print(f"Error reading embedding spaces: {e}")
+                conn.rollback()
+                # Keep serving the last known spaces rather than switching back to the default
+                return spaces or [dict(self.DEFAULT_EMBEDDING_SPACE)]
+
+        spaces = [
+            {"name": row[0], "model": row[1], "dimensions": row[2], "table": row[3], "status": row[4]}
+            for row in rows
+        ]
+        if not spaces or spaces[0]["status"] != "active":
+            spaces.insert(0, dict(self.DEFAULT_EMBEDDING_SPACE))
+        self._embedding_spaces = (time.monotonic() + self.EMBEDDING_SPACES_TTL_SECONDS, spaces)
+        return spaces
+
+    def active_embedding_space(self) -> Dict[str, Any]:
+        """
+        The embedding space searches use: query embeddings must come from its model.
+        """
+        return self.embedding_spaces()[0]
+
+    def supports(self, capability: str) -> bool:
+        """
+        Whether the connected database has an optional schema feature (see ALL_CAPABILITIES).
+        """
+        return capability in self.capabilities
+
+    def _detect_schema(self):
+        """
+        Reads the schema version and optional features once, so queries are built for
+        this database up front instead of failing and retrying on older schemas.
+        """
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        SELECT
+                            to_regclass('schema_migrations') IS NOT NULL,
+                            EXISTS (SELECT 1 FROM information_schema.columns
+                                    WHERE table_schema = current_schema() AND table_name = 'resumes' AND column_name = 'tags'),
+                            EXISTS (SELECT 1 FROM information_schema.columns
+                                    WHERE table_schema = current_schema() AND table_name = 'resumes' AND column_name = 'digest'),
+                            to_regclass('user_corpus') IS NOT NULL,
+                            to_regclass('user_tag_counts') IS NOT NULL
+                                AND EXISTS (SELECT 1 FROM information_schema.columns
+                                            WHERE table_schema = current_schema() AND table_name = 'user_corpus'
+                                            AND column_name = 'resume_count'),
+                            to_regclass('embedding_spaces') IS NOT NULL,
+                            EXISTS (SELECT 1 FROM information_schema.columns
+                                    WHERE table_schema = current_schema() AND table_name = 'resumes'
+                                    AND column_name = 'superseded_by'),
+                            EXISTS (SELECT 1 FROM pg_index i
+                                    WHERE i.indrelid = to_regclass('resume_embeddings') AND i.indisunique
+                                    AND i.indisvalid AND i.indnkeyatts = 2
+                                    AND (SELECT array_agg(a.attname::text ORDER BY a.attname) FROM pg_attribute a
+                                         WHERE a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey))
+                                        = ARRAY['resume_id', 'user_id']),
+                            EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('resume_embeddings'));
+                    """)
+                    has_migrations, *flags = cur.fetchone()
+                    self.capabilities = {
+                        name for name, present in zip(
+                            ["tags", "digest", "user_corpus", "tag_counts", "embedding_spaces", "near_duplicates",
+                             "embedding_owner_key", "partitioned_embeddings"], flags
+                        )
+                        if present
+                    }
+                    self.schema_version = None
+                    if has_migrations:
+                        cur.execute("SELECT max(version) FROM schema_migrations;")
+                        self.schema_version = cur.fetchone()[0]
+                conn.commit()
+            except Exception as e:
+                print(f"Error detecting schema: {e}")
+                conn.rollback()
+                return
+
+        if self.schema_version is None or self.schema_version < LATEST_VERSION:
+            missing = sorted(ALL_CAPABILITIES - {"partitioned_embeddings"} - self.capabilities)
+            print(f"Warning: Database schema is at version {self.schema_version or 0}, latest is {LATEST_VERSION}"
+                  f"{' (missing: ' + ', '.join(missing) + ')' if missing else ''}. Run: python scripts/migrate.py")
+
+    def _bump_corpus_version(self, cur, user_id: str):
+        """
+        Increments the user's corpus version inside the caller's transaction, so the
+        change and the version bump commit together. No-op on databases without
+        the user_corpus table.
+        """
+        if not self.supports("user_corpus"):
+            return
+        cur.execute("""
+            INSERT INTO user_corpus (user_id, version, updated_at)
+            VALUES (%s, 1, now())
+            ON CONFLICT (user_id)
+            DO UPDATE SET version = user_corpus.version + 1, updated_at = now();
+        """, (user_id,))
+
+    def _bump_mock_corpus_version(self, user_id: Optional[str]):
+        # MOCK mode doesn't know which user a deleted resume belonged to (None): bump everyone
+        for uid in ([user_id] if user_id else list(self._mock_corpus_versions)):
+            self._mock_corpus_versions[uid] = self._mock_corpus_versions.get(uid, 0) + 1
+
     def close(self):
-        if self.conn:
-            self.conn.close()
+        if self.pool:
+            self.pool.closeall()
+            self.pool = None
@@ -0,0 +1,84 @@
+import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, List, Optional
+
+# Threads that run budgeted stages; a stage that overruns keeps its thread until
+# its own client/statement timeout fires, so the pool is sized with headroom
+_stage_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="resudoc-stage")
+
+
+class StageTimeout(TimeoutError):
+    """Raised when a stage does not finish within its share of the deadline."""
+
+
+class Deadline:
+    """
+    A request-scoped latency budget for /match.
+    Splits the remaining time across the pipeline stages, runs each stage with a
+    timeout, and records which stages overran so the response can be flagged degraded.
+    """
+
+    # Relative share of the budget per stage; time a stage does not use rolls forward
+    STAGE_SHARES = {"embed": 0.15, "search": 0.15, "prescore": 0.2, "rank": 0.5}
+    # Kept back for the local fallback and response serialization
+    RESERVE_SECONDS = 0.05
+    # Placeholder replaced by the stage timeout in run() keyword arguments
+    STAGE_TIMEOUT = object()
+
+    def __init__(self, budget_ms: int):
+        """
+        Initialize the Deadline.
+
+        Args:
+            budget_ms (int): Total wall-clock budget for the request in milliseconds.
+        """
+        self.budget_ms = budget_ms
+        self.expires_at = time.monotonic() + budget_ms / 1000.0
+        self.degraded_stages: List[str] = []
+
+    @property
+    def degraded(self) -> bool:
+        return bool(self.degraded_stages)
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline, minus the reserve (never negative)."""
+        return max(0.0, self.expires_at - time.monotonic() - self.RESERVE_SECONDS)
+
+    def stage_timeout(self, stage: str, skip: Optional[List[str]] = None) -> float:
+        """
+        Seconds the given stage may take: its share of what is left, relative to
+        itself and the stages after it (minus any in `skip` that will not run).
+        """
+        stages = list(self.STAGE_SHARES)
+        later = [s for s in stages[stages.index(stage):] if s == stage or s not in (skip or [])]
+        share = self.STAGE_SHARES[stage] / sum(self.STAGE_SHARES[s] for s in later)
+        return self.remaining() * share
+
+    def mark_degraded(self, stage: str, reason: str):
+        print(f"   [Deadline] Stage '{stage}' degraded: {reason}")
+        if stage not in self.degraded_stages:
+            self.degraded_stages.append(stage)
+
+    def run(self, stage: str, fn: Callable, *args, skip: Optional[List[str]] = None, **kwargs):
+        """
+        Runs fn(*args, **kwargs) with the stage's timeout.
+        The callable may accept a `timeout` keyword (seconds) to cancel its own I/O;
+        pass `timeout=Deadline.STAGE_TIMEOUT` to have it filled in.
+
+        Raises:
+            StageTimeout: If the stage does not finish in time.
+        """
+        timeout = self.stage_timeout(stage, skip=skip)
+        if timeout <= 0:
+            raise StageTimeout(f"no time left for stage '{stage}'")
+        kwargs = {k: (timeout if v is Deadline.STAGE_TIMEOUT else v) for k, v in kwargs.items()}
+
+        # Copy the context so the stage still sees the request's trace
+        context = contextvars.copy_context()
+        future = _stage_executor.submit(context.run, fn, *args, **kwargs)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise StageTimeout(f"stage '{stage}' exceeded {timeout * 1000:.0f}ms")
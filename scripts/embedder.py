@@ -1,48 +1,82 @@
 import os
-from dotenv import load_dotenv
-load_dotenv()
-from typing import List
-try:
-    from openai import OpenAI
-except ImportError:
-    OpenAI = None
+from typing import List, Dict, Any
+from metrics import record_tokens
+from text_normalizer import embedding_text
+from openai_client import get_client
+
+# Output size of each model when no dimensions are requested
+NATIVE_DIMENSIONS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
 
 class Embedder:
     """
     A class to generate vector embeddings for text using OpenAI's API.
     """
 
-    def __init__(self, api_key: str = None, model: str = "text-embedding-3-small"):
+    def __init__(self, api_key: str = None, model: str = "text-embedding-3-small", dimensions: int = None):
         """
         Initialize the Embedder.
         
         Args:
             api_key (str): OpenAI API key. If None, reads from env OPENAI_API_KEY.
             model (str): The embedding model to use. Defaults to "text-embedding-3-small".
+            dimensions (int): Shortened output size (text-embedding-3 models only). If None, the model's native size.
         """
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.model = model
+        self.dimensions = dimensions
+        self._siblings: Dict[tuple, "Embedder"] = {}
         
-        if self.api_key and OpenAI:
-            self.client = OpenAI(api_key=self.api_key)
-        else:
-            self.client = None
+        # Shared, lazily created client (see openai_client.py)
+        self.client = get_client(self.api_key)
+
+    @property
+    def output_dimensions(self) -> int:
+        return self.dimensions or NATIVE_DIMENSIONS.get(self.model, 1536)
+
+    def for_model(self, model: str, dimensions: int = None) -> "Embedder":
+        """
+        An Embedder with the same credentials for another model or output size
+        (this one if they match). Instances are cached, so the client is reused.
+        """
+        if model == self.model and dimensions in (None, self.output_dimensions):
+            return self
+        if dimensions == NATIVE_DIMENSIONS.get(model):
+            dimensions = None
+        key = (model, dimensions)
+        if key not in self._siblings:
+            self._siblings[key] = Embedder(api_key=self.api_key, model=model, dimensions=dimensions)
+        return self._siblings[key]
+
+    def embed_for_spaces(self, text: str, spaces: List[Dict[str, Any]]) -> Dict[str, List[float]]:
+        """
+        Embeds text once per embedding space (see DbManager.embedding_spaces), so
+        uploads keep a space that is still being built in step with the active one.
+
+        Returns:
+            Dict[str, List[float]]: The embedding for each space's table.
+        """
+        return {
+            space["table"]: self.for_model(space["model"], space["dimensions"]).get_embedding(text)
+            for space in spaces
+        }
 
     def normalize_text(self, text: str) -> str:
         """
         Normalizes text for embedding by removing newlines and extra whitespace.
         """
-        if not text:
-            return ""
-        # Replace newlines with spaces (recommended by OpenAI for embeddings)
-        return text.replace("\n", " ").strip()
+        return embedding_text(text)
 
-    def get_embedding(self, text: str) -> List[float]:
+    def get_embedding(self, text: str, timeout: float = None) -> List[float]:
         """
         Generates an embedding vector for the given text.
 
         Args:
             text (str): The input text.
+            timeout (float): Optional request timeout in seconds.
 
         Returns:
             List[float]: The embedding vector.
@@ -52,16 +86,20 @@ class Embedder:
 
         if not self.client:
             print("Warning: OpenAI client not initialized. Returning mock embedding.")
-            # Return a mock vector of correct dimension (1536 for small) for testing
-            return [0.0] * 1536
+            # Return a mock vector of the model's dimension for testing
+            return [0.0] * self.output_dimensions
 
         try:
             text = self.normalize_text(text)
             
             response = self.client.embeddings.create(
                 input=[text],
-                model=self.model
+                model=self.model,
+                **({"dimensions": self.dimensions} if self.dimensions else {}),
+                **({"timeout": timeout} if timeout else {})
             )
+            if getattr(response, "usage", None):
+                record_tokens("embed", response.usage.prompt_tokens)
             
             return response.data[0].embedding
             
@@ -84,7 +122,7 @@ class Embedder:
 
         if not self.client:
             print("Warning: OpenAI client not initialized. Returning mock embeddings.")
-            return [[0.0] * 1536 for _ in texts]
+            return [[0.0] * self.output_dimensions for _ in texts]
 
         try:
             # Normalize all texts
@@ -95,8 +133,11 @@ class Embedder:
 
             response = self.client.embeddings.create(
                 input=normalized_texts,
-                model=self.model
+                model=self.model,
+                **({"dimensions": self.dimensions} if self.dimensions else {})
             )
+            if getattr(response, "usage", None):
+                record_tokens("embed", response.usage.prompt_tokens)
             
             # Map results back to order? OpenAI preserves order.
             return [data.embedding for data in response.data]
@@ -106,6 +147,8 @@ class Embedder:
             return []
 
 if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
     # Simple test
     embedder = Embedder()
     vec = embedder.get_embedding("Hello world")
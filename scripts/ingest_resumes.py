@@ -9,6 +9,9 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from pdf_reader import PDFReader
 from embedder import Embedder
 from db_manager import DbManager
+from resume_digest import ResumeDigester
+from near_duplicates import NearDuplicateDetector
+from metrics import RequestTrace, timed_stage
 
 def ingest_resumes(directory: str = "Resumes"):
     """
@@ -26,6 +29,8 @@ def ingest_resumes(directory: str = "Resumes"):
     pdf_reader = PDFReader()
     embedder = Embedder()
     db = DbManager()
+    digester = ResumeDigester()
+    detector = NearDuplicateDetector()
 
     # Test User ID for this batch (using deterministic UUID)
     user_id = str(uuid.uuid5(uuid.NAMESPACE_DNS, "test-user-123")) 
@@ -38,30 +43,57 @@ def ingest_resumes(directory: str = "Resumes"):
 
     print(f"Found {len(files)} resumes in {full_path}. Starting ingestion...")
 
+    # 1. Extract text from every file first so skills can be extracted in batches
+    parsed = []
     for filename in files:
         filepath = os.path.join(full_path, filename)
-        print(f"\nProcessing: {filename}")
+        print(f"\nReading: {filename}")
         
         try:
-            # 1. Extract Text
-            text = pdf_reader.read_pdf(filepath)
-            cleaned_text = pdf_reader.clean_text(text)
+            with timed_stage("pdf_parse"):
+                cleaned_text = pdf_reader.read_clean_pdf(filepath)
+            parsed.append((filename, cleaned_text))
             
             print(f"   - Extracted {len(cleaned_text)} chars")
 
-            # 2. Generate Embedding
-            embedding = embedder.get_embedding(cleaned_text)
-            print(f"   - Generated embedding ({len(embedding)} dim)")
+        except Exception as e:
+            print(f"   - ERROR: {e}")
+
+    # 2. Extract canonical skills (batched LLM calls, cached)
+    print(f"\nExtracting skills for {len(parsed)} resumes...")
+    with timed_stage("skills"):
+        skills_per_file = pdf_reader.extract_skills_batch([cleaned_text for _, cleaned_text in parsed])
+
+    for (filename, cleaned_text), skills in zip(parsed, skills_per_file):
+        print(f"\nProcessing: {filename}")
+        
+        try:
+            print(f"   - Found {len(skills)} skills")
+
+            # 3. Generate Embedding (one per embedding space being served)
+            with timed_stage("embed"):
+                embeddings = embedder.embed_for_spaces(cleaned_text, db.embedding_spaces())
+            print(f"   - Generated {len(embeddings)} embedding(s) ({', '.join(str(len(e)) for e in embeddings.values())} dim)")
+
+            # 4. Build the compact digest used in ranking prompts
+            with timed_stage("digest"):
+                digest = digester.build_digest(cleaned_text)
+            print(f"   - Built digest ({len(digest)} chars)")
 
-            # 3. Generate a deterministic ID based on filename
+            # 5. Generate a deterministic ID based on filename
             resume_id = str(uuid.uuid5(uuid.NAMESPACE_DNS, filename))
 
-            # 4. Upsert to DB (no skills - will be ranked by LLM later)
-            db.upsert_resume(resume_id, user_id, cleaned_text, filename=filename)
-            # Upsert Embedding
-            db.upsert_embedding(resume_id, user_id, embedding)
+            # 6. Upsert to DB
+            with timed_stage("db_upsert"):
+                lsh_bands = detector.band_keys(cleaned_text)
+                db.upsert_resume(resume_id, user_id, cleaned_text, skills=skills, filename=filename, digest=digest, lsh_bands=lsh_bands)
+                # Upsert Embedding
+                db.upsert_embeddings(resume_id, user_id, embeddings)
+                superseded = db.supersede_near_duplicates(resume_id, user_id, lsh_bands, detector.EMBEDDING_THRESHOLD)
             
             print(f"   - Saved to DB (ID: {resume_id})")
+            if superseded:
+                print(f"   - Supersedes {len(superseded)} near-duplicate version(s)")
 
         except Exception as e:
             print(f"   - ERROR: {e}")
@@ -70,6 +102,10 @@ def ingest_resumes(directory: str = "Resumes"):
     db.close()
 
 if __name__ == "__main__":
-    ingest_resumes()
+    from dotenv import load_dotenv
+    load_dotenv()
+    # Logs the per-stage totals for the whole run as one structured line
+    with RequestTrace("ingest"):
+        ingest_resumes()
     
 
@@ -0,0 +1,113 @@
+import re
+import math
+from typing import List, Dict, Any, Optional, Pattern
+
+# Tokens keep the characters that matter in tech terms (c++, c#, node.js, ci/cd pieces)
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.\-]*[a-z0-9+#]|[a-z0-9]")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "been", "but", "by", "can", "for", "from",
+    "has", "have", "in", "into", "is", "it", "its", "of", "on", "or", "our", "that", "the",
+    "their", "this", "to", "we", "will", "with", "you", "your", "who", "what", "which",
+    "all", "any", "other", "some", "such", "not", "also", "more", "most", "etc", "e.g",
+    "i.e", "may", "must", "should", "would", "about", "across", "within", "work", "working",
+    "experience", "years", "year", "team", "teams", "strong", "ability", "including",
+    "role", "responsibilities", "qualifications", "requirements", "preferred", "plus",
+    "looking", "seeking", "join", "ideal", "candidate", "candidates", "opportunity", "using",
+}
+
+
+class LexicalScorer:
+    """
+    Cheap, local first stage of the ranking cascade.
+    Scores candidates by IDF-weighted term overlap with the job description,
+    blended with the vector similarity from retrieval when it is available.
+    """
+
+    def __init__(self, similarity_weight: float = 0.5, max_resume_chars: int = 20000):
+        """
+        Initialize the Lexical Scorer.
+
+        Args:
+            similarity_weight (float): Share of the score taken from vector similarity (0-1).
+            max_resume_chars (int): Only this much of each resume is tokenized.
+        """
+        self.similarity_weight = similarity_weight
+        self.max_resume_chars = max_resume_chars
+
+    def tokenize(self, text: str) -> List[str]:
+        """
+        Lowercases and splits text into terms, dropping stopwords and trailing punctuation.
+        """
+        if not text:
+            return []
+        tokens = (t.rstrip(".-") for t in TOKEN_PATTERN.findall(text.lower()))
+        # Single letters are noise, except the languages C and R
+        return [t for t in tokens if t not in STOPWORDS and (len(t) > 1 or t in ("c", "r"))]
+
+    def compile_terms(self, terms: List[str]) -> Optional[Pattern]:
+        """
+        Compiles one regex matching any of the given terms as whole tokens in lowercased text.
+        """
+        if not terms:
+            return None
+        alternatives = "|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True))
+        return re.compile(rf"(?<![a-z0-9+#])(?:{alternatives})(?![a-z0-9+#])")
+
+    def score_candidates(self, jd_text: str, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Scores candidates against the JD and returns them sorted best first.
+
+        Args:
+            jd_text (str): The job description text
+            candidates (List[Dict]): Candidate dicts with 'content' and optionally 'similarity'
+
+        Returns:
+            List[Dict]: Copies of the candidates with an added 'prescore' (0-1), highest first.
+        """
+        if not candidates:
+            return []
+
+        jd_counts: Dict[str, int] = {}
+        for term in self.tokenize(jd_text):
+            jd_counts[term] = jd_counts.get(term, 0) + 1
+
+        candidate_terms = [
+            set(self.tokenize((c.get('content') or '')[:self.max_resume_chars]))
+            for c in candidates
+        ]
+
+        # IDF over the candidate pool: terms every candidate has do not separate them
+        n = len(candidates)
+        weights: Dict[str, float] = {}
+        for term, count in jd_counts.items():
+            df = sum(1 for terms in candidate_terms if term in terms)
+            weights[term] = (1.0 + math.log(count)) * math.log((n + 1) / (df + 0.5))
+        total_weight = sum(w for w in weights.values() if w > 0) or 1.0
+
+        scored = []
+        for candidate, terms in zip(candidates, candidate_terms):
+            coverage = sum(w for term, w in weights.items() if w > 0 and term in terms) / total_weight
+            similarity = candidate.get('similarity')
+            if similarity is None:
+                prescore = coverage
+            else:
+                prescore = (1 - self.similarity_weight) * coverage + self.similarity_weight * float(similarity)
+            scored.append({**candidate, 'prescore': round(prescore, 6)})
+
+        scored.sort(key=lambda c: c['prescore'], reverse=True)
+        return scored
+
+
+if __name__ == "__main__":
+    # Simple test
+    scorer = LexicalScorer()
+    results = scorer.score_candidates(
+        "Looking for a Python engineer with ML experience.",
+        [
+            {"resume_id": "test-1", "content": "Python developer, machine learning, TensorFlow.", "similarity": 0.8},
+            {"resume_id": "test-2", "content": "Java developer with backend experience.", "similarity": 0.7},
+        ]
+    )
+    for r in results:
+        print(f"{r['resume_id']}: {r['prescore']:.3f}")
@@ -1,35 +1,40 @@
 import os
-from dotenv import load_dotenv
-load_dotenv()
 import json
 from typing import List, Dict, Any
-try:
-    from openai import OpenAI
-except ImportError:
-    OpenAI = None
+from local_ranker import LocalRanker
+from metrics import record_tokens, record_bytes
+from openai_client import get_client
+from result_cache import RankingCache
 
 class LLMRanker:
     """
     Uses LLM to rank multiple resume candidates against a job description in a single batch call.
     """
 
-    def __init__(self, api_key: str = None, model: str = "gpt-4o"):
+    # Rough characters-per-token ratio for English text, used to turn token budgets into slices
+    CHARS_PER_TOKEN = 4
+
+    def __init__(self, api_key: str = None, model: str = "gpt-4o", candidate_token_budget: int = 8000):
         """
         Initialize the LLM Ranker.
         
         Args:
             api_key (str): OpenAI API key. If None, reads from env OPENAI_API_KEY.
             model (str): The model to use. Defaults to "gpt-4o" for best reasoning.
+            candidate_token_budget (int): Approximate tokens shared by all candidates in one prompt.
         """
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.model = model
+        self.candidate_token_budget = candidate_token_budget
+        self.fallback_ranker = LocalRanker()
+        # Rankings of prompts already answered, shared with other workers when configured
+        self.cache = RankingCache()
         
-        if self.api_key and OpenAI:
-            self.client = OpenAI(api_key=self.api_key)
-        else:
-            self.client = None
+        # Shared, lazily created client (see openai_client.py)
+        self.client = get_client(self.api_key)
 
-    def rank_resumes_batch(self, jd_text: str, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def rank_resumes_batch(self, jd_text: str, candidates: List[Dict[str, Any]], model: str = None, content_chars: int = 3000,
+                           timeout: float = None, raise_on_error: bool = False) -> List[Dict[str, Any]]:
         """
         Ranks all k resume candidates against a job description in ONE LLM call.
         
@@ -39,6 +44,13 @@ class LLMRanker:
                 - 'resume_id': str
                 - 'filename': str
                 - 'content': str
+                - 'digest': str (optional, preferred over content when present)
+            model (str): Overrides the ranker's model for this call (e.g. a cheaper
+                model for the pre-scoring stage of a cascade).
+            content_chars (int): Max characters of each resume included in the prompt.
+            timeout (float): Optional request timeout in seconds for the completion.
+            raise_on_error (bool): Re-raise LLM failures instead of ranking locally, so
+                callers with a deadline can decide how to degrade.
         
         Returns:
             List[Dict] sorted by score (highest first), each containing:
@@ -53,26 +65,21 @@ class LLMRanker:
             return []
         
         if not self.client:
-            print("Warning: OpenAI client not initialized. Returning mock rankings.")
-            # Return mock data for testing
-            return [
-                {
-                    "resume_id": c['resume_id'],
-                    "filename": c['filename'],
-                    "score": 75.0 - (i * 10),
-                    "reasoning": f"Mock ranking for {c['filename']}",
-                    "key_matches": ["Python", "Mock Skill"],
-                    "gaps": ["Mock Gap"]
-                }
-                for i, c in enumerate(candidates)
-            ]
+            print("Warning: OpenAI client not initialized. Ranking locally.")
+            return self.fallback_ranker.rank_resumes_batch(jd_text, candidates)
         
         # Build the prompt with JD and all candidates
-        prompt = self._build_batch_ranking_prompt(jd_text, candidates)
+        prompt = self._build_batch_ranking_prompt(jd_text, candidates, content_chars=content_chars)
+        model = model or self.model
+        cache_key = self.cache.make_key(model, prompt)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        record_bytes("llm_prompt", len(prompt.encode("utf-8")))
         
         try:
             response = self.client.chat.completions.create(
-                model=self.model,
+                model=model,
                 messages=[
                     {
                         "role": "system",
@@ -84,9 +91,13 @@ class LLMRanker:
                     }
                 ],
                 temperature=0.0,
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                **({"timeout": timeout} if timeout else {})
             )
             
+            if getattr(response, "usage", None):
+                record_tokens("rank", response.usage.prompt_tokens, response.usage.completion_tokens)
+            
             content = response.choices[0].message.content.strip()
             result = json.loads(content)
             
@@ -96,36 +107,40 @@ class LLMRanker:
             # Sort by score (highest first)
             rankings.sort(key=lambda x: x.get("score", 0), reverse=True)
             
+            self.cache.set(cache_key, rankings)
             return rankings
             
         except Exception as e:
-            print(f"Error in LLM ranking: {e}")
-            # Return candidates with default scores
-            return [
-                {
-                    "resume_id": c['resume_id'],
-                    "filename": c['filename'],
-                    "score": 50.0,
-                    "reasoning": f"Error during ranking: {str(e)}",
-                    "key_matches": [],
-                    "gaps": []
-                }
-                for c in candidates
-            ]
+            if raise_on_error:
+                raise
+            print(f"Error in LLM ranking: {e}. Ranking locally.")
+            return self.fallback_ranker.rank_resumes_batch(jd_text, candidates)
     
-    def _build_batch_ranking_prompt(self, jd_text: str, candidates: List[Dict[str, Any]]) -> str:
+    def content_chars_for(self, n_candidates: int, content_chars: int = 3000) -> int:
+        """
+        Characters of each resume that a prompt for n_candidates includes: content_chars,
+        capped by an equal share of the candidate token budget.
+        """
+        return min(content_chars, self.candidate_token_budget * self.CHARS_PER_TOKEN // max(1, n_candidates))
+
+    def _build_batch_ranking_prompt(self, jd_text: str, candidates: List[Dict[str, Any]], content_chars: int = 3000) -> str:
         """
         Builds the prompt for batch ranking all candidates.
+        Each candidate is represented by its ingest-time digest when one exists,
+        otherwise by its raw content, sliced to a share of the token budget.
         """
+        max_chars = self.content_chars_for(len(candidates), content_chars)
+
         # Build candidate sections
         candidate_sections = []
         for i, candidate in enumerate(candidates, 1):
+            text = candidate.get('digest') or candidate.get('content') or ''
             candidate_sections.append(f"""
 === CANDIDATE {i}: {candidate['filename']} ===
 Resume ID: {candidate['resume_id']}
 
-{candidate['content'][:3000]}
-{'...(truncated)' if len(candidate['content']) > 3000 else ''}
+{text[:max_chars]}
+{'...(truncated)' if len(text) > max_chars else ''}
 """)
         
         candidates_text = "\n".join(candidate_sections)
@@ -177,6 +192,8 @@ IMPORTANT: Include ALL {len(candidates)} candidates in your rankings array. Be o
 
 
 if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
     # Simple test
     ranker = LLMRanker()
     
@@ -0,0 +1,180 @@
+import math
+from typing import List, Dict, Any, Optional
+import numpy as np
+from lexical_scorer import LexicalScorer
+from skill_normalizer import SkillNormalizer
+from resume_digest import ResumeDigester
+
+# How much a JD term counts depending on the resume section it appears in
+SECTION_WEIGHTS = {
+    "experience": 1.0,
+    "projects": 0.9,
+    "skills": 0.8,
+    "summary": 0.6,
+    "awards": 0.6,
+    "education": 0.5,
+    "_preamble": 0.5,
+}
+
+
+class LocalRanker:
+    """
+    Deterministic ranker that runs entirely locally, with the same contract as
+    LLMRanker.rank_resumes_batch. Scores blend vector similarity, coverage of the
+    JD's skills and coverage of its key terms weighted by resume section.
+    Used when no LLM is available (offline, load tests) or the LLM call fails.
+    """
+
+    def __init__(self, similarity_weight: float = 0.4, skill_weight: float = 0.35, keyword_weight: float = 0.25,
+                 max_keywords: int = 40, max_resume_chars: int = 20000):
+        """
+        Initialize the Local Ranker.
+
+        Args:
+            similarity_weight (float): Weight of the retrieval vector similarity.
+            skill_weight (float): Weight of the share of JD skills the resume covers.
+            keyword_weight (float): Weight of the section-weighted share of JD key terms covered.
+            max_keywords (int): Most frequent JD terms (besides skills) that are scored.
+            max_resume_chars (int): Only this much of each resume is analysed.
+        """
+        self.similarity_weight = similarity_weight
+        self.skill_weight = skill_weight
+        self.keyword_weight = keyword_weight
+        self.max_keywords = max_keywords
+        self.max_resume_chars = max_resume_chars
+        self.scorer = LexicalScorer()
+        self.skill_normalizer = SkillNormalizer()
+        self.digester = ResumeDigester()
+
+    def rank_resumes_batch(self, jd_text: str, candidates: List[Dict[str, Any]], model: str = None, content_chars: int = None) -> List[Dict[str, Any]]:
+        """
+        Ranks candidates against a job description without any network calls.
+
+        Args:
+            jd_text (str): The job description text
+            candidates (List[Dict]): Candidate dicts with 'resume_id', 'filename', 'content'
+                and optionally 'similarity' (vector similarity) and 'skills'.
+            model, content_chars: Accepted for compatibility with LLMRanker; unused.
+
+        Returns:
+            List[Dict] sorted by score (highest first), in the LLMRanker result format.
+        """
+        if not candidates:
+            return []
+
+        jd_skills = self.skill_normalizer.find_in_text(jd_text)
+        jd_skill_set = set(jd_skills)
+        keywords = self._jd_keywords(jd_text, jd_skill_set)
+
+        # One compiled pattern each for the JD's skills and key terms, reused for every resume
+        skill_matcher = self.skill_normalizer.compile_matcher(jd_skills)
+        keyword_matcher = self.scorer.compile_terms(keywords)
+        skill_index = {skill: j for j, skill in enumerate(jd_skills)}
+        keyword_index = {term: j for j, term in enumerate(keywords)}
+
+        # Per-candidate feature rows, then all scoring in matrix form
+        skill_hits = np.zeros((len(candidates), len(jd_skills)))
+        keyword_hits = np.zeros((len(candidates), len(keywords)))
+        similarity = np.full(len(candidates), np.nan)
+
+        for i, candidate in enumerate(candidates):
+            content = (candidate.get('content') or '')[:self.max_resume_chars]
+            candidate_skills = set(self.skill_normalizer.normalize_all(candidate.get('skills') or []))
+            candidate_skills |= self.skill_normalizer.match_skills(skill_matcher, content)
+            for skill in candidate_skills & jd_skill_set:
+                skill_hits[i, skill_index[skill]] = 1.0
+
+            if keyword_matcher is not None:
+                for section, lines in self.digester.split_sections(content).items():
+                    weight = SECTION_WEIGHTS.get(section, 0.5)
+                    for term in set(keyword_matcher.findall("\n".join(lines).lower())):
+                        j = keyword_index[term]
+                        if weight > keyword_hits[i, j]:
+                            keyword_hits[i, j] = weight
+
+            if candidate.get('similarity') is not None:
+                similarity[i] = float(candidate['similarity'])
+
+        # Terms most candidates share separate them least
+        document_frequency = (keyword_hits > 0).sum(axis=0)
+        keyword_importance = np.log((len(candidates) + 1) / (document_frequency + 0.5)) + 1.0
+
+        components = []
+        weights = []
+        if len(jd_skills):
+            components.append(skill_hits.mean(axis=1))
+            weights.append(self.skill_weight)
+        if len(keywords):
+            components.append(keyword_hits @ keyword_importance / keyword_importance.sum())
+            weights.append(self.keyword_weight)
+        if not np.isnan(similarity).all():
+            components.append(np.clip(np.nan_to_num(similarity, nan=np.nanmin(similarity)), 0.0, 1.0))
+            weights.append(self.similarity_weight)
+
+        if components:
+            weight_vector = np.array(weights) / sum(weights)
+            scores = np.vstack(components).T @ weight_vector * 100
+        else:
+            scores = np.zeros(len(candidates))
+
+        results = []
+        for i, candidate in enumerate(candidates):
+            matched_skills = [s for j, s in enumerate(jd_skills) if skill_hits[i, j]]
+            missing_skills = [s for j, s in enumerate(jd_skills) if not skill_hits[i, j]]
+            matched_terms = [t for j, t in enumerate(keywords) if keyword_hits[i, j]]
+            missing_terms = [t for j, t in enumerate(keywords) if not keyword_hits[i, j]]
+            results.append({
+                "resume_id": candidate['resume_id'],
+                "filename": candidate.get('filename', 'Unknown'),
+                "score": round(float(scores[i]), 1),
+                "reasoning": self._reasoning(len(matched_skills), len(jd_skills), matched_terms, keywords, similarity[i]),
+                "key_matches": (matched_skills + matched_terms)[:5],
+                "gaps": (missing_skills + missing_terms)[:4]
+            })
+
+        # Ties broken by resume_id so the ordering is fully deterministic
+        results.sort(key=lambda r: (-r["score"], r["resume_id"]))
+        return results
+
+    def _jd_keywords(self, jd_text: str, jd_skills: set) -> List[str]:
+        """
+        Most frequent JD terms that are not already counted as skills, in first-seen order on ties.
+        """
+        skill_words = {word for skill in jd_skills for word in skill.split()}
+        counts: Dict[str, int] = {}
+        for term in self.scorer.tokenize(jd_text):
+            if term not in skill_words and not term.isdigit():
+                counts[term] = counts.get(term, 0) + 1
+        ranked = sorted(counts, key=lambda t: -counts[t])
+        return ranked[:self.max_keywords]
+
+    def _reasoning(self, skills_matched: int, skills_total: int, matched_terms: List[str], keywords: List[str],
+                   similarity: Optional[float]) -> str:
+        parts = []
+        if skills_total:
+            parts.append(f"covers {skills_matched} of {skills_total} skills named in the job description")
+        if keywords:
+            parts.append(f"mentions {len(matched_terms)} of its {len(keywords)} key terms")
+        if similarity is not None and not math.isnan(similarity):
+            parts.append(f"has vector similarity {similarity:.2f}")
+        if not parts:
+            return "Local ranking: no comparable signals found in the job description."
+        return "Local ranking: the resume " + ", ".join(parts) + "."
+
+
+if __name__ == "__main__":
+    # Simple test
+    ranker = LocalRanker()
+    results = ranker.rank_resumes_batch(
+        "Looking for a Python engineer with machine learning and AWS experience.",
+        [
+            {"resume_id": "test-1", "filename": "resume1.pdf", "similarity": 0.52,
+             "content": "Experience\nPython developer, 5 years in machine learning with TensorFlow."},
+            {"resume_id": "test-2", "filename": "resume2.pdf", "similarity": 0.31,
+             "content": "Experience\nJava developer with backend experience."}
+        ]
+    )
+    for i, result in enumerate(results, 1):
+        print(f"{i}. {result['filename']} - Score: {result['score']}")
+        print(f"   Reasoning: {result['reasoning']}")
+        print(f"   Matches: {result['key_matches']}  Gaps: {result['gaps']}")
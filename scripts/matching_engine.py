@@ -3,45 +3,125 @@ from db_manager import DbManager
 from nearest_neighbor import NearestNeighbor
 from embedder import Embedder
 from llm_ranker import LLMRanker
+from lexical_scorer import LexicalScorer
+from skill_normalizer import SkillNormalizer
+from deadline import Deadline
+from result_cache import ResultCache, EmbeddingCache
+from metrics import timed_stage, current_trace
 
 class MatchingEngine:
     """
     Orchestrates the matching process:
     1. Embeds the Job Description (JD).
     2. Finds nearest neighbors using vector similarity.
-    3. Uses LLM to rank all k candidates in a single batch call.
+    3. Optionally prunes a wide candidate pool with a cheap pre-scoring stage.
+    4. Uses LLM to rank the surviving k candidates in a single batch call.
+    Results are cached per user corpus version, so repeated requests skip all of it.
+    With a Deadline, each stage runs under its share of the latency budget and an
+    overrunning stage degrades to the best ordering available instead of stalling.
     """
 
+    # Characters of each resume the cheap LLM pre-scoring stage sees
+    PRESCORE_CONTENT_CHARS = 1000
+    # Leading characters of each resume the local stages (lexical pre-scoring, local
+    # ranking) look at; the fetch never trims below this even if the prompt takes less
+    LOCAL_CONTENT_CHARS = 6000
+    # Extra time the database gets beyond the search stage timeout before Postgres
+    # cancels the statement, so the stage timeout fires first and is reported
+    SEARCH_STATEMENT_GRACE_MS = 250
+
     def __init__(self, db_manager: DbManager, embedder: Embedder):
         self.db = db_manager
         self.embedder = embedder
         self.nn = NearestNeighbor(db_manager)
         self.llm_ranker = LLMRanker()
+        self.lexical_scorer = LexicalScorer()
+        self.skill_normalizer = SkillNormalizer()
+        self.result_cache = ResultCache()
+        self.embedding_cache = EmbeddingCache()
 
-    def match_best_resume(self, user_id: str, jd_text: str, k: int = 5, tags: List[str] = None) -> List[Dict[str, Any]]:
+    def match_best_resume(self, user_id: str, jd_text: str, k: int = 5, tags: List[str] = None,
+                          candidate_pool: int = None, prescore_model: str = None, rank_model: str = None,
+                          must_have_skills: List[str] = None, deadline: Deadline = None,
+                          explain: bool = False) -> List[Dict[str, Any]]:
         """
         Finds and ranks the best resumes for a given JD using LLM-based ranking.
+
+        When candidate_pool is larger than k, retrieval widens to candidate_pool
+        resumes and a cheap stage keeps the best k for the expensive LLM: lexical
+        overlap by default, or an LLM call with prescore_model if one is given.
+        rank_model overrides the model of the final ranking stage.
+        must_have_skills restricts retrieval to resumes listing all of those skills.
+        deadline bounds the total latency; overrunning stages are recorded on it.
+        explain attaches the search query's EXPLAIN ANALYZE plan to the request trace.
         """
         if not jd_text:
             return []
 
+        # The JD must be embedded with the model of the space being searched
+        space = self.db.active_embedding_space()
+        embedder = self.embedder.for_model(space["model"], space["dimensions"])
+
+        # Explain requests always run the pipeline, since they exist to profile it
+        cache_key = None
+        if not explain:
+            corpus_version = self.db.get_corpus_version(user_id)
+            if corpus_version is not None:
+                cache_key = self.result_cache.make_key(
+                    user_id, corpus_version, jd_text, k, tags=tags or [], must_have_skills=must_have_skills or [],
+                    candidate_pool=candidate_pool, prescore_model=prescore_model, rank_model=rank_model,
+                    embedding_space=space["name"]
+                )
+                cached = self.result_cache.get(cache_key)
+                if cached is not None:
+                    print("   [MatchingEngine] Serving cached results.")
+                    return cached
+
+        pool_size = max(k, candidate_pool or k)
+        required_skills = self.skill_normalizer.normalize_all(must_have_skills or [])
+
+        # Stages that will not run hand their share of the budget to later ones
+        skip = [] if (prescore_model and pool_size > k) else ["prescore"]
+        # LLM stages that failed without a deadline and fell back to local scoring
+        fallbacks: List[str] = []
+
         # 1. Generate JD Embedding
         print("   [MatchingEngine] Generating JD embedding...")
-        jd_embedding = self.embedder.get_embedding(jd_text)
+        try:
+            with timed_stage("embed"):
+                jd_embedding = self._run_stage(deadline, "embed", self._embed_query, embedder, jd_text, skip=skip)
+        except Exception as e:
+            if deadline is None:
+                raise
+            deadline.mark_degraded("embed", str(e))
+            return []
+        
+        if not jd_embedding:
+            print("   [MatchingEngine] No JD embedding available.")
+            if deadline is not None:
+                deadline.mark_degraded("embed", "embedding unavailable")
+            return []
 
-        # 2. Find Nearest Neighbors (Semantic Search)
-        print(f"   [MatchingEngine] Finding top {k} candidates via vector search...")
-        candidates = self.nn.find_nearest_resumes(user_id, jd_embedding, k=k, tags=tags)
+        # 2-3. Find Nearest Neighbors (Semantic Search) together with their content
+        print(f"   [MatchingEngine] Finding top {pool_size} candidates via vector search...")
+        try:
+            candidates, resume_details = self._run_stage(
+                deadline, "search", self._retrieve, user_id, jd_embedding, pool_size, tags, required_skills,
+                space["table"], skip=skip
+            )
+        except Exception as e:
+            if deadline is None:
+                raise
+            deadline.mark_degraded("search", str(e))
+            return []
         
         if not candidates:
             print("   [MatchingEngine] No candidates found.")
+            if explain:
+                self._explain_search(user_id, jd_embedding, pool_size, tags, required_skills, space["table"])
+            self._cache_results(cache_key, [], deadline)
             return []
 
-        # 3. Fetch Resume Content
-        print("   [MatchingEngine] Fetching candidate content...")
-        resume_ids = [c['resume_id'] for c in candidates]
-        resume_details = self.db.get_resumes_by_ids(resume_ids)
-
         # 4. Prepare candidates for batch ranking
         candidates_for_ranking = []
         for candidate in candidates:
@@ -51,13 +131,148 @@ class MatchingEngine:
             candidates_for_ranking.append({
                 'resume_id': rid,
                 'filename': details.get('filename', 'Unknown'),
-                'content': details.get('content', '')
+                'content': details.get('content', ''),
+                'digest': details.get('digest'),
+                'skills': details.get('skills') or [],
+                'similarity': candidate.get('similarity')
             })
 
-        # 5. Batch LLM Ranking (SINGLE CALL for all k candidates)
+        # 5. Cheap pre-scoring stage (only when the pool is wider than k)
+        if len(candidates_for_ranking) > k:
+            candidates_for_ranking = self._prescore(jd_text, candidates_for_ranking, k, prescore_model, deadline, fallbacks)
+
+        # 6. Batch LLM Ranking (SINGLE CALL for all k candidates)
         print(f"   [MatchingEngine] Ranking {len(candidates_for_ranking)} candidates with LLM...")
-        ranked_results = self.llm_ranker.rank_resumes_batch(jd_text, candidates_for_ranking)
+        try:
+            with timed_stage("rank"):
+                ranked_results = self._run_stage(
+                    deadline, "rank", self.llm_ranker.rank_resumes_batch, jd_text, candidates_for_ranking,
+                    model=rank_model, raise_on_error=True
+                )
+        except Exception as e:
+            # Best available ordering: vector similarity and lexical/skill overlap, computed locally
+            if deadline is not None:
+                deadline.mark_degraded("rank", str(e))
+            else:
+                print(f"   [MatchingEngine] LLM ranking failed: {e}. Ranking locally.")
+                fallbacks.append("rank")
+            with timed_stage("rank_fallback"):
+                ranked_results = self.llm_ranker.fallback_ranker.rank_resumes_batch(jd_text, candidates_for_ranking)
         
         print(f"   [MatchingEngine] Ranking complete!")
+
+        # Runs after ranking so re-executing the query does not eat into the deadline
+        if explain:
+            self._explain_search(user_id, jd_embedding, pool_size, tags, required_skills, space["table"])
+
+        self._cache_results(cache_key, ranked_results, deadline, fallbacks)
         
         return ranked_results
+
+    def _run_stage(self, deadline: Deadline, stage: str, fn, *args, skip: List[str] = None, **kwargs):
+        """
+        Calls fn directly, or under the stage's share of the deadline when there is one.
+        """
+        if deadline is None:
+            return fn(*args, **kwargs)
+        return deadline.run(stage, fn, *args, skip=skip, timeout=Deadline.STAGE_TIMEOUT, **kwargs)
+
+    def _embed_query(self, embedder: Embedder, jd_text: str, timeout: float = None) -> List[float]:
+        """
+        Embeds a JD, reusing the embedding when any worker has embedded the same text before.
+        """
+        key = self.embedding_cache.make_key(embedder.model, embedder.output_dimensions, jd_text)
+        cached = self.embedding_cache.get(key)
+        if cached is not None:
+            return cached
+        embedding = embedder.get_embedding(jd_text, timeout=timeout)
+        # MOCK embeddings and failures are not worth keeping
+        if embedding and embedder.client:
+            self.embedding_cache.set(key, embedding)
+        return embedding
+
+    def _retrieve(self, user_id: str, jd_embedding: List[float], k: int, tags: List[str], must_have_skills: List[str],
+                  table: str = "resume_embeddings", timeout: float = None):
+        """
+        Runs the vector search and fetches the candidates' content in one query.
+        """
+        timeout_ms = int(timeout * 1000) + self.SEARCH_STATEMENT_GRACE_MS if timeout else None
+        with timed_stage("retrieve"):
+            rows = self.nn.retrieve_candidates(
+                user_id, jd_embedding, k=k, tags=tags, must_have_skills=must_have_skills,
+                content_chars=self._fetch_chars(k), timeout_ms=timeout_ms, table=table
+            )
+        candidates = [{"resume_id": r["resume_id"], "similarity": r["similarity"]} for r in rows]
+        return candidates, {r["resume_id"]: r for r in rows}
+
+    def _cache_results(self, cache_key: str, results: List[Dict[str, Any]], deadline: Deadline = None,
+                       fallbacks: List[str] = None):
+        """
+        Caches a finished result set, unless a stage degraded or an LLM stage fell back
+        to local scoring (a retry may do better).
+        """
+        if cache_key is None or fallbacks or (deadline is not None and deadline.degraded):
+            return
+        self.result_cache.set(cache_key, results)
+
+    def _explain_search(self, user_id: str, jd_embedding: List[float], k: int, tags: List[str], must_have_skills: List[str],
+                        table: str = "resume_embeddings"):
+        """
+        Captures the vector search plan on the current request trace for explain mode.
+        """
+        trace = current_trace()
+        if trace is None:
+            return
+        try:
+            with timed_stage("explain_plan"):
+                trace.details["query_plan"] = self.nn.explain_nearest_resumes(
+                    user_id, jd_embedding, k=k, tags=tags, must_have_skills=must_have_skills,
+                    content_chars=self._fetch_chars(k), table=table
+                )
+        except Exception as e:
+            print(f"   [MatchingEngine] Could not explain search query: {e}")
+            trace.details["query_plan"] = None
+
+    def _fetch_chars(self, k: int) -> int:
+        """
+        Characters of each resume worth fetching: what the final ranking prompt
+        for k candidates includes, but never less than the local stages use.
+        """
+        return max(self.llm_ranker.content_chars_for(k), self.LOCAL_CONTENT_CHARS)
+
+    def _prescore(self, jd_text: str, candidates: List[Dict[str, Any]], k: int, prescore_model: str = None,
+                  deadline: Deadline = None, fallbacks: List[str] = None) -> List[Dict[str, Any]]:
+        """
+        Prunes the candidate pool down to the k most promising resumes.
+        A failed LLM pre-scoring call falls back to lexical scoring and is recorded on
+        the deadline, or without one appended to fallbacks.
+        """
+        prescored = None
+        if prescore_model:
+            print(f"   [MatchingEngine] Pre-scoring {len(candidates)} candidates with {prescore_model}...")
+            try:
+                with timed_stage("prescore"):
+                    prescored = self._run_stage(
+                        deadline, "prescore", self.llm_ranker.rank_resumes_batch, jd_text, candidates,
+                        model=prescore_model, content_chars=self.PRESCORE_CONTENT_CHARS, raise_on_error=True
+                    )
+            except Exception as e:
+                if deadline is not None:
+                    deadline.mark_degraded("prescore", str(e))
+                else:
+                    print(f"   [MatchingEngine] LLM pre-scoring failed: {e}. Pre-scoring lexically.")
+                    if fallbacks is not None:
+                        fallbacks.append("prescore")
+
+        if prescored is not None:
+            by_id = {c['resume_id']: c for c in candidates}
+            survivors = [by_id[r['resume_id']] for r in prescored if r.get('resume_id') in by_id]
+            # Candidates the model dropped from its answer keep their retrieval order
+            seen = {c['resume_id'] for c in survivors}
+            survivors.extend(c for c in candidates if c['resume_id'] not in seen)
+        else:
+            print(f"   [MatchingEngine] Pre-scoring {len(candidates)} candidates lexically...")
+            with timed_stage("prescore_lexical"):
+                survivors = self.lexical_scorer.score_candidates(jd_text, candidates)
+
+        return survivors[:k]
@@ -0,0 +1,242 @@
+import json
+import time
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, List, Tuple, Optional
+
+# Seconds; covers fast DB lookups up to slow LLM completions
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Structured (one JSON object per line) per-request logs
+logger = logging.getLogger("resudoc.requests")
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def _format_labels(label_names: Tuple[str, ...], label_values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """
+    A monotonically increasing counter, optionally split by labels.
+    """
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            return self._values.get(key, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    """
+    A cumulative-bucket histogram in the Prometheus exposition format.
+    """
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [bucket counts..., sum, count]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    le = 'le="%g"' % bound
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {count:g}")
+                le = 'le="+Inf"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {series[-1]:g}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {series[-2]:.6f}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {series[-1]:g}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Holds the process's metrics and renders them for the /metrics endpoint.
+    """
+
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, help_text: str, labels: Tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, help_text, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, help_text, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        lines.extend(self._render_cache_ratios())
+        return "\n".join(lines) + "\n"
+
+    def _render_cache_ratios(self) -> List[str]:
+        lines = ["# HELP resudoc_cache_hit_ratio Share of cache lookups served from cache since start.",
+                 "# TYPE resudoc_cache_hit_ratio gauge"]
+        with CACHE_REQUESTS._lock:
+            caches = sorted({key[0] for key in CACHE_REQUESTS._values})
+        for cache in caches:
+            hits = CACHE_REQUESTS.value(cache=cache, result="hit")
+            total = hits + CACHE_REQUESTS.value(cache=cache, result="miss")
+            if total:
+                lines.append(f'resudoc_cache_hit_ratio{{cache="{cache}"}} {hits / total:.6f}')
+        return lines
+
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "resudoc_request_duration_seconds", "End-to-end request latency.", labels=("endpoint",))
+STAGE_SECONDS = REGISTRY.histogram(
+    "resudoc_stage_duration_seconds", "Latency of individual pipeline stages.", labels=("stage",))
+LLM_TOKENS = REGISTRY.counter(
+    "resudoc_llm_tokens_total", "Tokens sent to and received from OpenAI.", labels=("component", "kind"))
+BYTES = REGISTRY.counter(
+    "resudoc_bytes_total", "Bytes moved through the pipeline.", labels=("kind",))
+CACHE_REQUESTS = REGISTRY.counter(
+    "resudoc_cache_requests_total", "Cache lookups by outcome.", labels=("cache", "result"))
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("resudoc_trace", default=None)
+
+
+class RequestTrace:
+    """
+    Collects one request's stage timings and counters, feeds them into the
+    process-wide histograms, and writes them as a structured log line on exit.
+    Used as a context manager; code running inside it (including threads started
+    with a copied context) can reach it through current_trace().
+    """
+
+    def __init__(self, endpoint: str, **fields):
+        self.endpoint = endpoint
+        self.fields = dict(fields)
+        self.timings: Dict[str, float] = {}
+        self.counters: Dict[str, float] = {}
+        # Diagnostics handed back to the caller (e.g. query plans); kept out of the log line
+        self.details: Dict[str, Any] = {}
+        self._started = None
+        self._token = None
+
+    def __enter__(self) -> "RequestTrace":
+        self._started = time.perf_counter()
+        self._token = _current_trace.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_trace.reset(self._token)
+        total = time.perf_counter() - self._started
+        REQUEST_SECONDS.observe(total, endpoint=self.endpoint)
+        record = {
+            "event": "request",
+            "endpoint": self.endpoint,
+            **self.fields,
+            "total_ms": round(total * 1000, 2),
+            "stages_ms": {k: round(v * 1000, 2) for k, v in self.timings.items()},
+            "counters": self.counters,
+        }
+        if exc is not None:
+            record["error"] = str(exc)
+        logger.info(json.dumps(record, default=str))
+        return False
+
+    def add(self, name: str, amount: float = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def elapsed_ms(self) -> float:
+        """Milliseconds since the trace started (so far, if it is still open)."""
+        return round((time.perf_counter() - self._started) * 1000, 2) if self._started else 0.0
+
+
+def current_trace() -> Optional[RequestTrace]:
+    """The trace of the request being handled, if any."""
+    return _current_trace.get()
+
+
+@contextmanager
+def timed_stage(name: str):
+    """
+    Times a block into the stage histogram and, inside a request, into its trace
+    (repeated stages accumulate).
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        trace = current_trace()
+        if trace is not None:
+            trace.timings[name] = trace.timings.get(name, 0.0) + elapsed
+
+
+def record_tokens(component: str, prompt_tokens: int, completion_tokens: int = 0):
+    """Counts LLM/embedding token usage globally and on the current request."""
+    LLM_TOKENS.inc(prompt_tokens, component=component, kind="prompt")
+    LLM_TOKENS.inc(completion_tokens, component=component, kind="completion")
+    trace = current_trace()
+    if trace is not None:
+        trace.add(f"{component}_prompt_tokens", prompt_tokens)
+        trace.add(f"{component}_completion_tokens", completion_tokens)
+
+
+def record_bytes(kind: str, amount: int):
+    BYTES.inc(amount, kind=kind)
+    trace = current_trace()
+    if trace is not None:
+        trace.add(f"{kind}_bytes", amount)
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+    trace = current_trace()
+    if trace is not None:
+        trace.add(f"{cache}_cache_{'hits' if hit else 'misses'}")
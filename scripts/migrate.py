@@ -0,0 +1,338 @@
+"""
+Versioned schema migrations. Each migration runs once, in order, and is recorded
+in schema_migrations; DbManager reads the result at startup to pick its SQL.
+Every step is idempotent (IF NOT EXISTS, backfills that skip finished rows), so
+databases set up with schema.sql or the old one-off add_* scripts migrate cleanly.
+
+Usage: python scripts/migrate.py            # apply pending migrations
+       python scripts/migrate.py --status   # list applied and pending migrations
+"""
+import os
+import sys
+import psycopg2
+from psycopg2.extras import Json
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+BACKFILL_BATCH_SIZE = 500
+
+
+def _base_schema(conn, cur):
+    cur.execute("CREATE EXTENSION IF NOT EXISTS vector;")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS resumes (
+            id UUID PRIMARY KEY,
+            user_id UUID NOT NULL,
+            filename TEXT,
+            content TEXT,
+            skills JSONB,
+            created_at TIMESTAMPTZ DEFAULT now()
+        );
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS resume_embeddings (
+            resume_id UUID PRIMARY KEY REFERENCES resumes(id) ON DELETE CASCADE,
+            user_id UUID NOT NULL,
+            embedding VECTOR(1536),
+            created_at TIMESTAMPTZ DEFAULT now()
+        );
+    """)
+    # Same name Postgres generated for the unnamed index in the original schema.sql
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS resume_embeddings_embedding_idx
+        ON resume_embeddings USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);
+    """)
+
+
+def _tags(conn, cur):
+    cur.execute("ALTER TABLE resumes ADD COLUMN IF NOT EXISTS tags TEXT[] DEFAULT '{}';")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_resumes_tags ON resumes USING GIN(tags);")
+
+
+def _skills(conn, cur):
+    from pdf_reader import PDFReader
+
+    cur.execute("ALTER TABLE resumes ALTER COLUMN skills SET DEFAULT '[]';")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_resumes_skills ON resumes USING GIN(skills jsonb_path_ops);")
+    conn.commit()
+
+    # Canonical skills for resumes ingested without them, one batch per transaction
+    reader = PDFReader()
+    _backfill(conn, cur, "(skills IS NULL OR skills = '[]'::jsonb)",
+              lambda rows: [Json(s) for s in reader.extract_skills_batch([content or "" for _, content in rows])],
+              "UPDATE resumes SET skills = %s WHERE id = %s;")
+
+
+def _digest(conn, cur):
+    from resume_digest import ResumeDigester
+
+    cur.execute("ALTER TABLE resumes ADD COLUMN IF NOT EXISTS digest TEXT;")
+    conn.commit()
+
+    digester = ResumeDigester()
+    _backfill(conn, cur, "digest IS NULL",
+              lambda rows: [digester.build_digest(content or "") for _, content in rows],
+              "UPDATE resumes SET digest = %s WHERE id = %s;")
+
+
+def _user_corpus(conn, cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS user_corpus (
+            user_id UUID PRIMARY KEY,
+            version BIGINT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMPTZ DEFAULT now()
+        );
+    """)
+    # Every existing user starts at version 1; new users get a row on their first write
+    cur.execute("""
+        INSERT INTO user_corpus (user_id, version)
+        SELECT DISTINCT user_id, 1 FROM resumes
+        ON CONFLICT (user_id) DO NOTHING;
+    """)
+
+
+def _listing_index(conn, cur):
+    # CONCURRENTLY doesn't block uploads on large tables, but can't run inside a transaction
+    conn.commit()
+    conn.autocommit = True
+    try:
+        cur.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_resumes_user_created
+            ON resumes (user_id, created_at DESC, id DESC);
+        """)
+    finally:
+        conn.autocommit = False
+
+
+def _tag_counts(conn, cur):
+    # Block resume writes (not reads) until the triggers are live and the backfill is done
+    cur.execute("LOCK TABLE resumes IN SHARE ROW EXCLUSIVE MODE;")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS user_tag_counts (
+            user_id UUID NOT NULL,
+            tag TEXT NOT NULL,
+            count BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, tag)
+        );
+    """)
+    cur.execute("ALTER TABLE user_corpus ADD COLUMN IF NOT EXISTS resume_count BIGINT NOT NULL DEFAULT 0;")
+    cur.execute("""
+        CREATE OR REPLACE FUNCTION maintain_user_tag_counts() RETURNS trigger AS $$
+        BEGIN
+          IF tg_op IN ('UPDATE', 'DELETE') THEN
+            UPDATE user_tag_counts c SET count = c.count - 1
+            FROM (SELECT DISTINCT unnest(coalesce(old.tags, '{}')) AS tag) t
+            WHERE c.user_id = old.user_id AND c.tag = t.tag;
+            DELETE FROM user_tag_counts WHERE user_id = old.user_id AND count <= 0;
+            UPDATE user_corpus SET resume_count = resume_count - 1 WHERE user_id = old.user_id;
+          END IF;
+          IF tg_op IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO user_tag_counts (user_id, tag, count)
+            SELECT new.user_id, t.tag, 1
+            FROM (SELECT DISTINCT unnest(coalesce(new.tags, '{}')) AS tag) t
+            ORDER BY t.tag
+            ON CONFLICT (user_id, tag) DO UPDATE SET count = user_tag_counts.count + 1;
+            INSERT INTO user_corpus (user_id, resume_count) VALUES (new.user_id, 1)
+            ON CONFLICT (user_id) DO UPDATE SET resume_count = user_corpus.resume_count + 1;
+          END IF;
+          RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    cur.execute("DROP TRIGGER IF EXISTS resumes_tag_counts_insert_delete ON resumes;")
+    cur.execute("""
+        CREATE TRIGGER resumes_tag_counts_insert_delete
+        AFTER INSERT OR DELETE ON resumes
+        FOR EACH ROW EXECUTE FUNCTION maintain_user_tag_counts();
+    """)
+    cur.execute("DROP TRIGGER IF EXISTS resumes_tag_counts_update ON resumes;")
+    cur.execute("""
+        CREATE TRIGGER resumes_tag_counts_update
+        AFTER UPDATE OF tags, user_id ON resumes
+        FOR EACH ROW WHEN (old.tags IS DISTINCT FROM new.tags OR old.user_id IS DISTINCT FROM new.user_id)
+        EXECUTE FUNCTION maintain_user_tag_counts();
+    """)
+
+    cur.execute("DELETE FROM user_tag_counts;")
+    cur.execute("""
+        INSERT INTO user_tag_counts (user_id, tag, count)
+        SELECT user_id, tag, COUNT(*)
+        FROM (SELECT DISTINCT id, user_id, unnest(tags) AS tag FROM resumes) t
+        GROUP BY user_id, tag;
+    """)
+    cur.execute("UPDATE user_corpus SET resume_count = 0;")
+    cur.execute("""
+        INSERT INTO user_corpus (user_id, resume_count)
+        SELECT user_id, COUNT(*) FROM resumes GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE SET resume_count = EXCLUDED.resume_count;
+    """)
+
+
+def _embedding_spaces(conn, cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS embedding_spaces (
+            name TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            dimensions INTEGER NOT NULL,
+            table_name TEXT NOT NULL UNIQUE,
+            status TEXT NOT NULL CHECK (status IN ('building', 'active', 'retired')),
+            created_at TIMESTAMPTZ DEFAULT now(),
+            activated_at TIMESTAMPTZ
+        );
+    """)
+    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_embedding_spaces_active ON embedding_spaces ((true)) WHERE status = 'active';")
+    # The existing table becomes the default space, at whatever dimension it was created with
+    cur.execute("""
+        INSERT INTO embedding_spaces (name, model, dimensions, table_name, status, activated_at)
+        SELECT 'default', 'text-embedding-3-small', atttypmod, 'resume_embeddings', 'active', now()
+        FROM pg_attribute
+        WHERE attrelid = 'resume_embeddings'::regclass AND attname = 'embedding'
+        ON CONFLICT (name) DO NOTHING;
+    """)
+
+
+def _near_duplicates(conn, cur):
+    from near_duplicates import NearDuplicateDetector
+
+    cur.execute("ALTER TABLE resumes ADD COLUMN IF NOT EXISTS lsh_bands BIGINT[];")
+    cur.execute("ALTER TABLE resumes ADD COLUMN IF NOT EXISTS superseded_by UUID REFERENCES resumes(id) ON DELETE SET NULL;")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_resumes_lsh_bands ON resumes USING GIN(lsh_bands);")
+    conn.commit()
+
+    # Band keys only; existing copies are linked when a new version of them is uploaded
+    detector = NearDuplicateDetector()
+    _backfill(conn, cur, "lsh_bands IS NULL",
+              lambda rows: [detector.band_keys(content or "") for _, content in rows],
+              "UPDATE resumes SET lsh_bands = %s WHERE id = %s;")
+
+
+def _embedding_owner_key(conn, cur):
+    # Uploads upsert embeddings on (resume_id, user_id), the key a table hash-partitioned
+    # by user_id must use (scripts/partition_embeddings.py); a unique index on plain
+    # tables makes the same statement valid before and after the layout swap
+    cur.execute("SELECT table_name FROM embedding_spaces;")
+    tables = sorted({row[0] for row in cur.fetchall()} | {"resume_embeddings"})
+    # CONCURRENTLY doesn't block uploads on large tables, but can't run inside a transaction
+    conn.commit()
+    conn.autocommit = True
+    try:
+        for table in tables:
+            cur.execute("""
+                SELECT to_regclass(%s) IS NOT NULL
+                   AND NOT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s));
+            """, (table, table))
+            if cur.fetchone()[0]:
+                cur.execute(f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {table}_resume_user_key ON {table} (resume_id, user_id);")
+    finally:
+        conn.autocommit = False
+
+
+# (version, name, function). Append only; never renumber or edit applied ones.
+# A migration runs in one transaction together with its schema_migrations row, unless
+# it commits along the way (batched backfills, CONCURRENTLY); those must be idempotent.
+MIGRATIONS = [
+    (1, "base schema", _base_schema),
+    (2, "resume tags", _tags),
+    (3, "canonical skills index and backfill", _skills),
+    (4, "resume digests", _digest),
+    (5, "per-user corpus version", _user_corpus),
+    (6, "resume listing index", _listing_index),
+    (7, "incremental folder counts", _tag_counts),
+    (8, "embedding spaces", _embedding_spaces),
+    (9, "near-duplicate detection", _near_duplicates),
+    (10, "embedding owner key", _embedding_owner_key),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def _backfill(conn, cur, condition: str, compute, update: str, batch_size: int = BACKFILL_BATCH_SIZE):
+    """
+    Streams resumes matching condition (db_manager.stream_batches) and writes
+    compute(rows)[i] for each row, committing once per batch.
+    """
+    from db_manager import stream_batches
+
+    total = 0
+    for rows in stream_batches(os.getenv("DATABASE_URL"), f"SELECT id, content FROM resumes WHERE {condition} ORDER BY id;",
+                               batch_size=batch_size):
+        for (resume_id, _), value in zip(rows, compute(rows)):
+            cur.execute(update, (value, resume_id))
+        conn.commit()
+
+        total += len(rows)
+        print(f"   - {total} resumes processed")
+
+
+def applied_versions(cur) -> set:
+    """
+    Versions recorded in schema_migrations (empty if the table doesn't exist yet).
+    """
+    cur.execute("SELECT to_regclass('schema_migrations') IS NOT NULL;")
+    if not cur.fetchone()[0]:
+        return set()
+    cur.execute("SELECT version FROM schema_migrations;")
+    return {row[0] for row in cur.fetchall()}
+
+
+def migrate(status_only: bool = False):
+    """
+    Applies pending migrations in order, stopping at the first failure.
+    """
+    connection_string = os.getenv("DATABASE_URL")
+
+    if not connection_string:
+        print("Error: DATABASE_URL not found in environment")
+        return False
+
+    try:
+        conn = psycopg2.connect(connection_string)
+        cur = conn.cursor()
+
+        applied = applied_versions(cur)
+        conn.commit()
+        pending = [m for m in MIGRATIONS if m[0] not in applied]
+
+        if status_only:
+            for version, name, _ in MIGRATIONS:
+                print(f"   {'✅' if version in applied else '⏳'} {version:04d} {name}")
+            return True
+
+        if not pending:
+            print(f"Schema is up to date (version {LATEST_VERSION}).")
+            return True
+
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMPTZ DEFAULT now()
+            );
+        """)
+        conn.commit()
+
+        for version, name, run in pending:
+            print(f"Applying {version:04d} {name}...")
+            try:
+                run(conn, cur)
+                cur.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s);", (version, name))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+        print(f"✅ Migrated to version {LATEST_VERSION}!")
+
+        cur.close()
+        conn.close()
+        return True
+
+    except Exception as e:
+        print(f"❌ Error during migration: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+    migrate(status_only="--status" in sys.argv)
@@ -0,0 +1,90 @@
+import re
+import zlib
+import hashlib
+from typing import List
+import numpy as np
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+# Mersenne prime for the universal hash family; shingle hashes and multipliers stay
+# below 2^32, so a * x fits in 64 bits before the modulo
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+
+
+class NearDuplicateDetector:
+    """
+    Finds resumes that are slightly edited copies of each other (MinHash/LSH).
+    Each resume is reduced to MinHash signatures over word shingles and split into
+    bands; a band key is stored per band, so likely copies are found by key overlap
+    in an index lookup instead of comparing against every resume. Candidates are
+    confirmed by embedding similarity (DbManager.supersede_near_duplicates).
+
+    Band keys are stored, so changing any parameter needs the lsh_bands backfill rerun.
+    """
+
+    # Cosine similarity of the embeddings a candidate pair must also reach
+    EMBEDDING_THRESHOLD = 0.95
+
+    def __init__(self, shingle_size: int = 5, bands: int = 16, rows_per_band: int = 8, seed: int = 1):
+        """
+        Initialize the Near-Duplicate Detector.
+
+        Args:
+            shingle_size (int): Words per shingle.
+            bands (int): LSH bands. With rows_per_band, sets the Jaccard similarity at which
+                a pair becomes a likely candidate: about (1 / bands) ** (1 / rows_per_band),
+                0.71 by default.
+            rows_per_band (int): Signature values hashed together into each band key.
+            seed (int): Seed of the hash family; must stay fixed once keys are stored.
+        """
+        self.shingle_size = shingle_size
+        self.bands = bands
+        self.rows_per_band = rows_per_band
+        num_perm = bands * rows_per_band
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> List[str]:
+        """
+        Overlapping word n-grams of the lowercased text (the whole text if it is shorter).
+        """
+        words = WORD_PATTERN.findall((text or "").lower())
+        if len(words) <= self.shingle_size:
+            return [" ".join(words)] if words else []
+        return [" ".join(words[i:i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)]
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        MinHash signature: for each hash function, the smallest hash over the text's shingles.
+        Returns an empty array for text without words.
+        """
+        shingles = set(self.shingles(text))
+        if not shingles:
+            return np.array([], dtype=np.uint64)
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+        permuted = (np.outer(hashes, self._a) % MERSENNE_PRIME + self._b) % MERSENNE_PRIME
+        return permuted.min(axis=0)
+
+    def band_keys(self, text: str) -> List[int]:
+        """
+        One signed 64-bit key per band (the band index is part of the key), ready for
+        resumes.lsh_bands. Two texts sharing any key are near-duplicate candidates.
+        """
+        signature = self.signature(text)
+        if signature.size == 0:
+            return []
+        keys = []
+        for band in range(self.bands):
+            values = signature[band * self.rows_per_band:(band + 1) * self.rows_per_band]
+            digest = hashlib.blake2b(band.to_bytes(2, "little") + values.tobytes(), digest_size=8).digest()
+            keys.append(int.from_bytes(digest, "little", signed=True))
+        return keys
+
+    def estimate_similarity(self, text_a: str, text_b: str) -> float:
+        """
+        Estimated Jaccard similarity of two texts' shingle sets.
+        """
+        a, b = self.signature(text_a), self.signature(text_b)
+        if a.size == 0 or b.size == 0:
+            return 0.0
+        return float(np.mean(a == b))
@@ -1,5 +1,8 @@
+import json
 from typing import List, Dict, Any, Optional
+import numpy as np
 from db_manager import DbManager
+from metrics import record_bytes
 
 class NearestNeighbor:
     """
@@ -9,45 +12,26 @@ class NearestNeighbor:
     def __init__(self, db_manager: DbManager):
         self.db = db_manager
 
-    def find_nearest_resumes(self, user_id: str, job_embedding: List[float], k: int = 5, tags: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    def find_nearest_resumes(self, user_id: str, job_embedding: List[float], k: int = 5, tags: Optional[List[str]] = None,
+                             must_have_skills: Optional[List[str]] = None, timeout_ms: int = None,
+                             table: str = "resume_embeddings") -> List[Dict[str, Any]]:
         """
         Finds the k nearest resumes for a given user and job description embedding.
-        Optionally filters by tags.
+        Optionally filters by tags (any match) and must-have skills (all required,
+        canonical forms; served by the GIN index on resumes.skills).
+        timeout_ms caps the query's run time on the server.
+        table is the embedding space's table; job_embedding must come from its model.
         """
-        # Build query with optional tag filtering
-        if tags:
-            query = """
-                SELECT re.resume_id, 1 - (re.embedding <=> %s::vector) as similarity
-                FROM resume_embeddings re
-                JOIN resumes r ON re.resume_id = r.id
-                WHERE re.user_id = %s AND r.tags && %s
-                ORDER BY re.embedding <=> %s::vector
-                LIMIT %s;
-            """
-        else:
-            query = """
-                SELECT resume_id, 1 - (embedding <=> %s::vector) as similarity
-                FROM resume_embeddings
-                WHERE user_id = %s
-                ORDER BY embedding <=> %s::vector
-                LIMIT %s;
-            """
-        
         # In mock mode, return dummy data
-        if not self.db.conn:
+        if not self.db.pool:
             print(f"[MOCK NN] Finding {k} nearest resumes for user {user_id}")
             return [
                 {"resume_id": "mock-resume-1", "similarity": 0.95},
                 {"resume_id": "mock-resume-2", "similarity": 0.88}
             ]
 
-        # Convert embedding list to string format for pgvector
-        embedding_str = '[' + ','.join(map(str, job_embedding)) + ']'
-        
-        if tags:
-            rows = self.db.fetch_all(query, (embedding_str, user_id, tags, embedding_str, k))
-        else:
-            rows = self.db.fetch_all(query, (embedding_str, user_id, embedding_str, k))
+        query, params = self._build_query(user_id, job_embedding, k, tags, must_have_skills, table)
+        rows = self.db.fetch_all(query, params, timeout_ms=timeout_ms)
         
         results = []
         for row in rows:
@@ -57,3 +41,134 @@ class NearestNeighbor:
             })
             
         return results
+
+    def retrieve_candidates(self, user_id: str, job_embedding: List[float], k: int = 5, tags: Optional[List[str]] = None,
+                            must_have_skills: Optional[List[str]] = None, content_chars: int = 6000,
+                            timeout_ms: int = None, table: str = "resume_embeddings") -> List[Dict[str, Any]]:
+        """
+        Finds the k nearest resumes and returns them with everything ranking needs
+        (filename, first content_chars of content, skills, digest) in one statement,
+        instead of a search followed by get_resumes_by_ids. Filters as in find_nearest_resumes.
+        Results are ordered by similarity, highest first.
+        """
+        if not self.db.pool:
+            print(f"[MOCK NN] Retrieving {k} nearest resumes for user {user_id}")
+            nearest = [
+                {"resume_id": "mock-resume-1", "similarity": 0.95},
+                {"resume_id": "mock-resume-2", "similarity": 0.88}
+            ]
+            details = self.db.get_resumes_by_ids([n["resume_id"] for n in nearest], content_chars=content_chars)
+            return [{**n, "filename": "Unknown", **details[n["resume_id"]]} for n in nearest]
+
+        name, query, param_types, params = self._build_retrieval_query(
+            user_id, job_embedding, k, tags, must_have_skills, content_chars, table
+        )
+        rows = self.db.fetch_prepared(name, query, param_types, params, timeout_ms=timeout_ms)
+
+        record_bytes("db_content", sum(len(row[3] or "") + len(row[5] or "") for row in rows))
+        return [
+            {
+                "resume_id": str(row[0]),
+                "similarity": float(row[1]),
+                "filename": row[2],
+                "content": row[3],
+                "skills": row[4],
+                "digest": row[5]
+            }
+            for row in rows
+        ]
+
+    def explain_nearest_resumes(self, user_id: str, job_embedding: List[float], k: int = 5, tags: Optional[List[str]] = None,
+                                must_have_skills: Optional[List[str]] = None, content_chars: int = 6000,
+                                table: str = "resume_embeddings") -> Optional[Dict[str, Any]]:
+        """
+        Runs the retrieval query (see retrieve_candidates) under EXPLAIN (ANALYZE, BUFFERS)
+        and returns Postgres' JSON plan (index used, rows scanned, buffer hits/reads, timings).
+        The query really executes, so call it only for opt-in diagnostics.
+        """
+        if not self.db.pool:
+            print(f"[MOCK NN] No query plan for user {user_id}")
+            return None
+
+        _, query, _, params = self._build_retrieval_query(
+            user_id, job_embedding, k, tags, must_have_skills, content_chars, table
+        )
+        rows = self.db.fetch_all(*self.db.to_pyformat("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query, params))
+        if not rows:
+            return None
+        plan = rows[0][0]
+        # psycopg2 decodes the json column; older servers may hand back text
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0] if isinstance(plan, list) and plan else plan
+
+    def _build_retrieval_query(self, user_id: str, job_embedding: List[float], k: int, tags: Optional[List[str]],
+                               must_have_skills: Optional[List[str]], content_chars: int,
+                               table: str = "resume_embeddings"):
+        """
+        Builds the single-statement retrieval query as a prepared statement: its name
+        (one per filter combination, see DbManager._fetch_prepared), $n-placeholder SQL, parameter types and values.
+        The query vector is bound once as $1 and reused for the distance and the ordering.
+        """
+        param_types = ["vector", "uuid", "integer", "integer"]
+        params: List[Any] = [np.asarray(job_embedding, dtype=np.float32), user_id, content_chars, k]
+        # Equality on the typed user_id also lets Postgres prune to the user's partition
+        # (and its ANN index) when embeddings are hash-partitioned by user_id
+        filters = ["re.user_id = $2"]
+        # Only the latest version of near-duplicate resumes is a candidate
+        if self.db.supports("near_duplicates"):
+            filters.append("r.superseded_by IS NULL")
+        if tags:
+            param_types.append("text[]")
+            params.append(tags)
+            filters.append(f"r.tags && ${len(params)}")
+        if must_have_skills:
+            param_types.append("jsonb")
+            params.append(json.dumps(must_have_skills))
+            filters.append(f"r.skills @> ${len(params)}")
+        # The table and schema-dependent parts are told apart by the SQL fingerprint
+        # DbManager._fetch_prepared adds to the name
+        name = "resudoc_retrieve" + ("_tags" if tags else "") + ("_skills" if must_have_skills else "")
+        # Databases that predate digests: retrieve NULL in its place
+        digest = "r.digest" if self.db.supports("digest") else "NULL"
+
+        query = f"""
+            SELECT re.resume_id, 1 - (re.embedding <=> $1) as similarity,
+                   r.filename, left(r.content, $3), r.skills, {digest}
+            FROM {table} re
+            JOIN resumes r ON re.resume_id = r.id
+            WHERE {" AND ".join(filters)}
+            ORDER BY re.embedding <=> $1
+            LIMIT $4
+        """
+        return name, query, param_types, tuple(params)
+
+    def _build_query(self, user_id: str, job_embedding: List[float], k: int, tags: Optional[List[str]],
+                     must_have_skills: Optional[List[str]], table: str = "resume_embeddings"):
+        """
+        Builds the search SQL and its parameters, with optional tag and skill filtering.
+        """
+        filters = ["re.user_id = %s"]
+        filter_params = []
+        if self.db.supports("near_duplicates"):
+            filters.append("r.superseded_by IS NULL")
+        if tags:
+            filters.append("r.tags && %s")
+            filter_params.append(tags)
+        if must_have_skills:
+            filters.append("r.skills @> %s::jsonb")
+            filter_params.append(json.dumps(must_have_skills))
+        join = "JOIN resumes r ON re.resume_id = r.id" if len(filters) > 1 else ""
+
+        query = f"""
+            SELECT re.resume_id, 1 - (re.embedding <=> %s::vector) as similarity
+            FROM {table} re
+            {join}
+            WHERE {" AND ".join(filters)}
+            ORDER BY re.embedding <=> %s::vector
+            LIMIT %s;
+        """
+
+        # Convert embedding list to string format for pgvector
+        embedding_str = '[' + ','.join(map(str, job_embedding)) + ']'
+        return query, (embedding_str, user_id, *filter_params, embedding_str, k)
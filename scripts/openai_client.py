@@ -0,0 +1,80 @@
+import os
+import threading
+import importlib.util
+from typing import Dict, Optional
+
+_clients: Dict[str, "SharedOpenAIClient"] = {}
+_clients_lock = threading.Lock()
+
+
+class SharedOpenAIClient:
+    """
+    The process-wide OpenAI client for one API key, shared by Embedder, PDFReader and
+    LLMRanker so they reuse one pool of keep-alive connections. The openai package is
+    imported and the client built on first use (or by warm_up), not at import time.
+    Attribute access is forwarded to the openai.OpenAI client.
+    """
+
+    def __init__(self, api_key: str):
+        """
+        Initialize the Shared OpenAI Client.
+
+        Args:
+            api_key (str): OpenAI API key.
+        """
+        self.api_key = api_key
+        # Concurrent requests to the API, and idle connections kept open between them
+        self.max_connections = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+        self.max_keepalive_connections = int(os.getenv("OPENAI_KEEPALIVE_CONNECTIONS", "20"))
+        # Longer than the client default (5s), so connections survive gaps between requests
+        self.keepalive_seconds = float(os.getenv("OPENAI_KEEPALIVE_SECONDS", "60"))
+        self._client = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._create()
+        return self._client
+
+    def _create(self):
+        import openai
+
+        # The Limits class of whichever HTTP library this openai version is built on
+        limits = type(openai.DEFAULT_CONNECTION_LIMITS)(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_seconds,
+        )
+        # base_url comes from env OPENAI_BASE_URL when set (e.g. the load-test stand-in)
+        return openai.OpenAI(api_key=self.api_key, http_client=openai.DefaultHttpxClient(limits=limits))
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+
+def get_client(api_key: str = None) -> Optional[SharedOpenAIClient]:
+    """
+    The shared client for api_key (default: env OPENAI_API_KEY), or None without a key
+    or the openai package, in which case callers run in MOCK mode.
+    """
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    if not api_key or importlib.util.find_spec("openai") is None:
+        return None
+    client = _clients.get(api_key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.setdefault(api_key, SharedOpenAIClient(api_key))
+    return client
+
+
+def warm_up(api_key: str = None) -> bool:
+    """
+    Builds the shared client ahead of the first request. Returns False in MOCK mode.
+    """
+    client = get_client(api_key)
+    if client is None:
+        return False
+    client.get()
+    return True
@@ -0,0 +1,171 @@
+import os
+import re
+import argparse
+from dotenv import load_dotenv
+load_dotenv()
+import psycopg2
+from migrate import applied_versions
+
+def partition_embeddings(partitions: int = 16, batch_size: int = 5000, table: str = None):
+    """
+    Migration script that moves an embeddings table (default: the active embedding
+    space's, see scripts/reembed.py) to a layout hash-partitioned by user_id,
+    with one ivfflat index per partition. A user's search then scans a
+    single partition (Postgres prunes on the user_id filter) and its ANN index
+    only holds that partition's tenants, instead of one global index filtered
+    after the scan.
+
+    Rows are copied in batches while the app keeps running; writes are blocked
+    only for the final catch-up and table swap. The old table is kept as
+    <table>_unpartitioned until you drop it.
+    """
+    connection_string = os.getenv("DATABASE_URL")
+
+    if not connection_string:
+        print("Error: DATABASE_URL not found in environment")
+        return False
+
+    if table and not re.match(r"^[a-z_][a-z0-9_]{0,47}$", table):
+        print(f"Error: invalid table name '{table}'")
+        return False
+
+    try:
+        conn = psycopg2.connect(connection_string)
+        cur = conn.cursor()
+
+        if not table:
+            cur.execute("SELECT to_regclass('embedding_spaces') IS NOT NULL;")
+            if cur.fetchone()[0]:
+                cur.execute("SELECT table_name FROM embedding_spaces WHERE status = 'active';")
+                row = cur.fetchone()
+                table = row[0] if row else None
+            table = table or "resume_embeddings"
+
+        # Keep whatever dimension the table was created with
+        cur.execute("""
+            SELECT atttypmod FROM pg_attribute
+            WHERE attrelid = to_regclass(%s) AND attname = 'embedding';
+        """, (table,))
+        row = cur.fetchone()
+        if not row:
+            print(f"Error: {table} does not exist or has no embedding column")
+            return False
+        dimensions = row[0]
+
+        cur.execute("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s));", (table,))
+        if cur.fetchone()[0]:
+            print(f"{table} is already partitioned, nothing to do.")
+            return True
+
+        # Workers upsert on (resume_id, user_id), the partitioned table's key, once the
+        # plain table has it too; without it their writes would fail after the swap
+        if 10 not in applied_versions(cur):
+            print(f"Error: {table} has no (resume_id, user_id) key yet. Run: python scripts/migrate.py")
+            return False
+
+        print(f"Creating partitioned {table} ({dimensions} dimensions) with {partitions} hash partitions...")
+
+        # The primary key of a partitioned table must include the partition key
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table}_partitioned (
+                resume_id UUID NOT NULL REFERENCES resumes(id) ON DELETE CASCADE,
+                user_id UUID NOT NULL,
+                embedding VECTOR({dimensions}),
+                created_at TIMESTAMPTZ DEFAULT now(),
+                PRIMARY KEY (resume_id, user_id)
+            ) PARTITION BY HASH (user_id);
+        """)
+        for i in range(partitions):
+            cur.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table}_p{i}
+                PARTITION OF {table}_partitioned
+                FOR VALUES WITH (MODULUS {partitions}, REMAINDER {i});
+            """)
+        conn.commit()
+
+        print("Copying embeddings...")
+
+        # Keyset batches, one transaction each, so uploads are never blocked for long
+        last_id = None
+        total = 0
+        while True:
+            cur.execute(
+                f"""
+                WITH batch AS (
+                    SELECT resume_id, user_id, embedding, created_at FROM {table}
+                    WHERE %s::uuid IS NULL OR resume_id > %s::uuid
+                    ORDER BY resume_id LIMIT %s
+                ), copied AS (
+                    INSERT INTO {table}_partitioned (resume_id, user_id, embedding, created_at)
+                    SELECT * FROM batch
+                    ON CONFLICT (resume_id, user_id) DO UPDATE SET embedding = EXCLUDED.embedding
+                )
+                SELECT max(resume_id::text), count(*) FROM batch;
+                """,
+                (last_id, last_id, batch_size)
+            )
+            max_id, count = cur.fetchone()
+            conn.commit()
+            if not count:
+                break
+            last_id = max_id
+            total += count
+            print(f"   - {total} embeddings copied")
+
+        print("Building per-partition ANN indexes...")
+
+        # Built after loading so ivfflat's lists are trained on the real data
+        for i in range(partitions):
+            cur.execute(f"SELECT count(*) FROM {table}_p{i};")
+            rows = cur.fetchone()[0]
+            lists = max(10, rows // 1000)
+            cur.execute(f"""
+                CREATE INDEX IF NOT EXISTS {table}_p{i}_embedding_idx
+                ON {table}_p{i} USING ivfflat (embedding vector_cosine_ops)
+                WITH (lists = {lists});
+            """)
+            conn.commit()
+            print(f"   - {table}_p{i}: {rows} rows, lists = {lists}")
+
+        print("Catching up and swapping tables...")
+
+        # Block writes (not reads) to apply changes made during the copy, then swap
+        cur.execute(f"LOCK TABLE {table} IN EXCLUSIVE MODE;")
+        cur.execute(f"""
+            DELETE FROM {table}_partitioned p
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {table} o
+                WHERE o.resume_id = p.resume_id AND o.user_id = p.user_id
+            );
+        """)
+        cur.execute(f"""
+            INSERT INTO {table}_partitioned (resume_id, user_id, embedding, created_at)
+            SELECT o.resume_id, o.user_id, o.embedding, o.created_at
+            FROM {table} o
+            LEFT JOIN {table}_partitioned p ON p.resume_id = o.resume_id AND p.user_id = o.user_id
+            WHERE p.resume_id IS NULL OR p.embedding IS DISTINCT FROM o.embedding
+            ON CONFLICT (resume_id, user_id) DO UPDATE SET embedding = EXCLUDED.embedding;
+        """)
+        print(f"   - {cur.rowcount} embeddings changed during the copy")
+        cur.execute(f"ALTER TABLE {table} RENAME TO {table}_unpartitioned;")
+        cur.execute(f"ALTER TABLE {table}_partitioned RENAME TO {table};")
+        conn.commit()
+
+        print("✅ Migration completed successfully!")
+        print(f"   Once verified: DROP TABLE {table}_unpartitioned;")
+
+        cur.close()
+        conn.close()
+        return True
+
+    except Exception as e:
+        print(f"❌ Error during migration: {e}")
+        return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hash-partition the embeddings table by user_id.")
+    parser.add_argument("--partitions", type=int, default=16, help="Number of hash partitions")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Embeddings copied per transaction")
+    parser.add_argument("--table", help="Embeddings table to partition (default: the active embedding space's)")
+    args = parser.parse_args()
+    partition_embeddings(args.partitions, args.batch_size, args.table)
@@ -0,0 +1,207 @@
+import os
+import importlib.util
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Iterator, List
+
+
+class PDFExtractionError(ValueError):
+    """Raised when a PDF can't be read or breaks one of the extraction limits."""
+
+
+def _check_page_count(pages: int, max_pages: int = None):
+    if max_pages and pages > max_pages:
+        raise PDFExtractionError(f"PDF has {pages} pages (limit is {max_pages})")
+
+
+class PDFBackend(ABC):
+    """
+    A PDF text extractor. Backends yield the text of each page in reading order and
+    refuse documents over max_pages before extracting any text; a backend whose
+    library isn't installed is unavailable and never selected.
+    """
+
+    name = None
+    # Module the backend imports
+    requires = None
+
+    @classmethod
+    def available(cls) -> bool:
+        return importlib.util.find_spec(cls.requires) is not None
+
+    @abstractmethod
+    def iter_pages(self, file_path: str, max_pages: int = None) -> Iterator[str]:
+        """
+        Yields the text of each page, raising PDFExtractionError beyond max_pages.
+        """
+
+
+class PypdfBackend(PDFBackend):
+    """
+    pypdf (pure Python), text in content-stream order. The default.
+    """
+
+    name = "pypdf"
+    requires = "pypdf"
+
+    def iter_pages(self, file_path: str, max_pages: int = None) -> Iterator[str]:
+        from pypdf import PdfReader
+
+        reader = PdfReader(file_path)
+        _check_page_count(len(reader.pages), max_pages)
+        for page in reader.pages:
+            yield page.extract_text() or ""
+
+
+class PdfiumBackend(PDFBackend):
+    """
+    pypdfium2 (PDFium, native code): many times faster than pypdf on large documents.
+    """
+
+    name = "pypdfium2"
+    requires = "pypdfium2"
+
+    def iter_pages(self, file_path: str, max_pages: int = None) -> Iterator[str]:
+        import pypdfium2
+
+        pdf = pypdfium2.PdfDocument(file_path)
+        try:
+            _check_page_count(len(pdf), max_pages)
+            for index in range(len(pdf)):
+                page = pdf[index]
+                textpage = page.get_textpage()
+                try:
+                    yield textpage.get_text_range().replace("\r\n", "\n")
+                finally:
+                    textpage.close()
+                    page.close()
+        finally:
+            pdf.close()
+
+
+class PdfminerBackend(PDFBackend):
+    """
+    pdfminer.six layout analysis: groups text into boxes and reads columns one after
+    the other, so multi-column resumes keep their reading order. Slowest of the three.
+    """
+
+    name = "pdfminer"
+    requires = "pdfminer"
+
+    def iter_pages(self, file_path: str, max_pages: int = None) -> Iterator[str]:
+        from pdfminer.high_level import extract_pages
+        from pdfminer.layout import LAParams, LTTextContainer
+        from pdfminer.pdfpage import PDFPage
+
+        with open(file_path, "rb") as f:
+            _check_page_count(sum(1 for _ in PDFPage.get_pages(f)), max_pages)
+        for layout in extract_pages(file_path, laparams=LAParams()):
+            yield "".join(element.get_text() for element in layout if isinstance(element, LTTextContainer))
+
+
+BACKENDS = {backend.name: backend for backend in (PypdfBackend, PdfiumBackend, PdfminerBackend)}
+DEFAULT_BACKEND = "pypdf"
+# Preferred backends, best first, for what the automatic pre-check finds
+MULTI_COLUMN_BACKENDS = ("pdfminer", "pypdfium2")
+LARGE_DOCUMENT_BACKENDS = ("pypdfium2",)
+# Documents with at least this many pages count as large (resumes are mostly 1-3)
+LARGE_DOCUMENT_PAGES = 4
+
+
+def available_backends() -> List[str]:
+    return [name for name, backend in BACKENDS.items() if backend.available()]
+
+
+def get_backend(name: str) -> PDFBackend:
+    """
+    The backend called `name`, or the default one (with a warning) if it is unknown
+    or not installed.
+    """
+    backend = BACKENDS.get(name)
+    if backend is None or not backend.available():
+        print(f"Warning: PDF backend '{name}' is not available. Using {DEFAULT_BACKEND}.")
+        backend = BACKENDS[DEFAULT_BACKEND]
+    return backend()
+
+
+def select_backend(file_path: str, preferred: str = None) -> PDFBackend:
+    """
+    Picks the backend for a document.
+
+    Args:
+        file_path (str): The PDF.
+        preferred (str): A backend name, or "auto" to pick one by a quick look at the
+            document: multi-column first page -> a layout-aware backend, many pages ->
+            a fast native one, else the default. If None, reads env PDF_BACKEND (pypdf).
+    """
+    preferred = preferred or os.getenv("PDF_BACKEND", DEFAULT_BACKEND)
+    if preferred != "auto":
+        return get_backend(preferred)
+
+    try:
+        pages, multi_column = inspect_document(file_path)
+    except Exception:
+        # Unreadable here too; let the default backend report it
+        return get_backend(DEFAULT_BACKEND)
+    candidates = MULTI_COLUMN_BACKENDS if multi_column else LARGE_DOCUMENT_BACKENDS if pages >= LARGE_DOCUMENT_PAGES else ()
+    for name in candidates:
+        if BACKENDS[name].available():
+            return BACKENDS[name]()
+    return get_backend(DEFAULT_BACKEND)
+
+
+def inspect_document(file_path: str):
+    """
+    Cheap pre-check with pypdf: the page count, and whether the first page looks
+    multi-column. Only the first page's content stream is parsed; no text is decoded.
+
+    Returns:
+        tuple: (pages, multi_column)
+    """
+    from pypdf import PdfReader
+
+    reader = PdfReader(file_path)
+    pages = len(reader.pages)
+    if not pages:
+        return 0, False
+    page = reader.pages[0]
+    return pages, looks_multi_column(_text_line_starts(page), float(page.mediabox.width))
+
+
+def looks_multi_column(starts: List[float], width: float) -> bool:
+    """
+    True when many text lines start at one shared x position right of the page's
+    left third: a second column. Right-aligned dates start at varying positions and
+    a few tab-aligned entries are too few to count.
+    """
+    if len(starts) < 16 or width <= 0:
+        return False
+    right = Counter(round(x / 6) for x in starts if x > width / 3)
+    if not right:
+        return False
+    column = right.most_common(1)[0][1]
+    return column >= 8 and column >= len(starts) / 5
+
+
+def _text_line_starts(page) -> List[float]:
+    """
+    X position of each text-showing operation on the page, following the text
+    matrix through BT/Tm/Td/TD (the current transformation matrix is ignored).
+    """
+    from pypdf.generic import ContentStream
+
+    contents = page.get_contents()
+    if contents is None:
+        return []
+    starts = []
+    line_x = 0.0
+    for operands, operator in ContentStream(contents, page.pdf).operations:
+        if operator == b"BT":
+            line_x = 0.0
+        elif operator == b"Tm":
+            line_x = float(operands[4])
+        elif operator in (b"Td", b"TD"):
+            line_x += float(operands[0])
+        elif operator in (b"Tj", b"TJ", b"'", b'"'):
+            starts.append(line_x)
+    return starts
@@ -1,27 +1,38 @@
 import os
-from dotenv import load_dotenv
-load_dotenv()
-import re
 import json
-import ftfy
-from typing import List, Set
-from pypdf import PdfReader
-try:
-    from openai import OpenAI
-except ImportError:
-    OpenAI = None
+import hashlib
+from collections import OrderedDict
+from typing import List, Set, Iterator
+from skill_normalizer import SkillNormalizer
+from text_normalizer import clean_text
+from pdf_sandbox import SandboxedPDFExtractor, PDFExtractionError
+from metrics import record_cache, record_tokens
+from openai_client import get_client
 
 class PDFReader:
     """
     A class to handle the ingestion of PDF files, text cleaning, and skill extraction.
     """
 
-    def __init__(self, api_key: str = None):
+    # Resumes sent to the LLM per batched skill-extraction call
+    SKILL_BATCH_SIZE = 5
+    # Extracted skill lists kept in memory, keyed by a hash of the text
+    SKILL_CACHE_SIZE = 2048
+    # Rough characters-per-token ratio (as in LLMRanker), for token budgets
+    CHARS_PER_TOKEN = 4
+
+    def __init__(self, api_key: str = None, extractor: SandboxedPDFExtractor = None, backend: str = None):
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
-        if self.api_key and OpenAI:
-            self.client = OpenAI(api_key=self.api_key)
-        else:
-            self.client = None
+        # Text extraction runs in a resource-limited child process (see pdf_sandbox.py),
+        # with a pluggable backend: pypdf, pypdfium2, pdfminer or "auto" (see pdf_backends.py)
+        self.extractor = extractor or SandboxedPDFExtractor(backend=backend)
+        # Cleaned text kept per resume: the embedding model's 8191-token input, which
+        # is more than the digest, skills and ranking stages ever read
+        self.max_text_chars = int(os.getenv("PDF_MAX_TEXT_CHARS", "32000"))
+        # Shared, lazily created client (see openai_client.py)
+        self.client = get_client(self.api_key)
+        self.skill_normalizer = SkillNormalizer()
+        self._skill_cache = OrderedDict()
 
 
 
@@ -31,7 +42,11 @@ class PDFReader:
     #Read and extrat text from a pdf
     def read_pdf(self, file_path: str) -> str:
         """
-        Reads a PDF file and extracts its text content.
+        Reads a PDF file and extracts its text content, under the extractor's
+        time, memory and page limits.
+
+        Raises:
+            PDFExtractionError: If the PDF is unreadable or breaks a limit (a ValueError).
         """
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"The file at {file_path} was not found.")
@@ -40,40 +55,80 @@ class PDFReader:
             raise ValueError("The provided file is not a PDF.")
 
         try:
-            reader = PdfReader(file_path)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            return text.strip()
+            return self.extractor.extract(file_path)
+        except PDFExtractionError:
+            raise
         except Exception as e:
-            raise ValueError(f"Failed to read PDF file: {e}")
+            raise PDFExtractionError(f"Failed to read PDF file: {e}")
+
+
 
 
 
 
 
+    def iter_clean_pages(self, file_path: str) -> Iterator[str]:
+        """
+        Yields each page's cleaned text (see clean_text) as it is extracted, skipping
+        empty pages. Stopping early stops the extraction.
 
+        Raises:
+            PDFExtractionError: If the PDF is unreadable or breaks a limit.
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"The file at {file_path} was not found.")
+
+        if not file_path.lower().endswith('.pdf'):
+            raise ValueError("The provided file is not a PDF.")
+
+        pages = self.extractor.iter_pages(file_path)
+        try:
+            for text in pages:
+                cleaned = self.clean_text(text)
+                if cleaned:
+                    yield cleaned
+        except PDFExtractionError:
+            raise
+        except Exception as e:
+            raise PDFExtractionError(f"Failed to read PDF file: {e}")
+        finally:
+            pages.close()
+
+    def read_clean_pdf(self, file_path: str, max_chars: int = None, max_tokens: int = None) -> str:
+        """
+        Reads a PDF and returns its cleaned text, page by page, up to a character
+        budget (max_chars, or max_tokens estimated; default max_text_chars).
+        Pages past the budget are never extracted, and the result is joined once.
+
+        Raises:
+            PDFExtractionError: If the PDF is unreadable or breaks a limit.
+        """
+        budget = max_chars or self.max_text_chars
+        if max_tokens:
+            budget = min(budget, max_tokens * self.CHARS_PER_TOKEN)
+
+        parts = []
+        size = 0
+        pages = self.iter_clean_pages(file_path)
+        try:
+            for page in pages:
+                # Pages are joined with one newline
+                remaining = budget - size - (1 if parts else 0)
+                if remaining <= 0:
+                    break
+                parts.append(page[:remaining])
+                size += len(parts[-1]) + (1 if len(parts) > 1 else 0)
+        finally:
+            pages.close()
+        return "\n".join(parts)
 
     def clean_text(self, text: str) -> str:
         """
         Cleans the text by fixing encoding issues, normalizing whitespace,
         and removing non-printable characters. Preserves newlines.
+        (See text_normalizer.clean_text; ftfy only runs when the text needs it.)
         """
-        if not text:
-            return ""
-            
-        # Fix mojibake and encoding issues using ftfy
-        text = ftfy.fix_text(text)
-        
-        # Replace tabs and multiple spaces with a single space
-        text = re.sub(r'[ \t]+', ' ', text)
-        
-        # Normalize newlines: replace multiple newlines with two (paragraph)
-        # or just keep them as is? 
-        # Let's collapse 3+ newlines into 2, and keep 1 or 2.
-        text = re.sub(r'\n\s*\n', '\n\n', text)
-        
-        return text.strip()
+        return clean_text(text)
 
 
 
@@ -171,8 +226,105 @@ class PDFReader:
 
 
 
+    def extract_skills_batch(self, texts: List[str]) -> List[List[str]]:
+        """
+        Extracts canonical technical skills for many resumes at once.
+        Uncached texts are sent to the LLM in batches of SKILL_BATCH_SIZE per call;
+        results are normalized and cached by content hash. Without an OpenAI client,
+        known skills are found by scanning the text locally.
+
+        Returns:
+            List[List[str]]: One list of canonical skills per input text, in order.
+        """
+        keys = [hashlib.sha256((t or "")[:4000].encode("utf-8")).hexdigest() for t in texts]
+        results = {}
+        pending = []
+        for key, text in zip(keys, texts):
+            if key in self._skill_cache:
+                record_cache("skills", hit=True)
+                self._skill_cache.move_to_end(key)
+                results[key] = self._skill_cache[key]
+            elif text and key not in results:
+                record_cache("skills", hit=False)
+                results[key] = None
+                pending.append((key, text))
+
+        for start in range(0, len(pending), self.SKILL_BATCH_SIZE):
+            batch = pending[start:start + self.SKILL_BATCH_SIZE]
+            if self.client:
+                extracted = self._extract_skills_llm_batch([text for _, text in batch])
+            else:
+                extracted = [None] * len(batch)
+
+            for (key, text), skills in zip(batch, extracted):
+                if skills is None:
+                    # No client or the call failed: fall back to the local vocabulary scan (not cached)
+                    results[key] = self.skill_normalizer.find_in_text(text)
+                    continue
+                results[key] = self.skill_normalizer.normalize_all(skills)
+                self._skill_cache[key] = results[key]
+                if len(self._skill_cache) > self.SKILL_CACHE_SIZE:
+                    self._skill_cache.popitem(last=False)
+
+        return [list(results.get(key) or []) for key in keys]
+
+    def _extract_skills_llm_batch(self, texts: List[str]) -> List[List[str]]:
+        """
+        Sends several resumes to the LLM in one call. Returns None entries on failure.
+        """
+        resumes_text = "\n".join(
+            f"=== RESUME {i} ===\n{text[:4000]}\n" for i, text in enumerate(texts, 1)
+        )
+        prompt = f"""
+        Extract 15-20 CONCRETE technical skills from EACH of the {len(texts)} resumes below.
+        
+        Focus ONLY on programming languages, frameworks and libraries, tools and technologies,
+        and specific technical methodologies. DO NOT include soft skills, abstract concepts
+        or job responsibilities.
+        
+        Return a JSON object with this EXACT structure, one entry per resume:
+        {{"results": [{{"index": 1, "skills": ["Python", "Docker"]}}]}}
+        
+        {resumes_text}
+        """
+
+        try:
+            response = self.client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": "You are a technical recruiter who extracts concrete technical skills from resumes and job descriptions. Focus on specific technologies, not abstract concepts."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.0,
+                response_format={"type": "json_object"}
+            )
+            
+            if getattr(response, "usage", None):
+                record_tokens("skills", response.usage.prompt_tokens, response.usage.completion_tokens)
+            
+            result = json.loads(response.choices[0].message.content)
+            by_index = {
+                entry.get("index"): entry.get("skills")
+                for entry in result.get("results", [])
+                if isinstance(entry, dict)
+            }
+            return [
+                by_index.get(i) if isinstance(by_index.get(i), list) else None
+                for i in range(1, len(texts) + 1)
+            ]
+                
+        except Exception as e:
+            print(f"Error extracting skills in batch: {e}")
+            return [None] * len(texts)
+
+
+
+
+
 #Not needed in actual class
 if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
     # Simple manual test if run directly
     import sys
     if len(sys.argv) > 1:
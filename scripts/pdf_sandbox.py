@@ -0,0 +1,167 @@
+import os
+import sys
+import json
+import signal
+import threading
+import subprocess
+from typing import Iterator
+try:
+    import resource
+except ImportError:
+    resource = None
+from pdf_backends import PDFExtractionError, get_backend, select_backend
+
+
+def iter_page_texts(file_path: str, max_pages: int = None, backend: str = None) -> Iterator[str]:
+    """
+    Yields the text of each page as the backend (see pdf_backends.select_backend)
+    extracts it, refusing documents over max_pages. Pages after the consumer stops
+    are never parsed.
+    """
+    yield from select_backend(file_path, backend).iter_pages(file_path, max_pages)
+
+
+def extract_text(file_path: str, max_pages: int = None, backend: str = None) -> str:
+    """
+    Extracts the text of every page, refusing documents over max_pages.
+    """
+    return "\n".join(iter_page_texts(file_path, max_pages, backend)).strip()
+
+
+class SandboxedPDFExtractor:
+    """
+    Runs PDF text extraction in a short-lived child process with a wall-clock timeout,
+    a CPU-time limit and an address-space limit, so a pathological PDF (decompression
+    bomb, huge page count, deeply nested objects) fails on its own instead of pinning
+    or exhausting the API worker. Every violation surfaces as a PDFExtractionError.
+    """
+
+    def __init__(self, timeout_seconds: float = None, memory_mb: int = None, max_pages: int = None,
+                 sandbox: bool = None, backend: str = None):
+        """
+        Initialize the Sandboxed PDF Extractor.
+
+        Args:
+            timeout_seconds (float): Wall-clock limit per document. If None, reads env PDF_TIMEOUT_SECONDS (20).
+            memory_mb (int): Address-space limit of the child. If None, reads env PDF_MEMORY_LIMIT_MB (512).
+            max_pages (int): Documents with more pages are refused. If None, reads env PDF_MAX_PAGES (50).
+            sandbox (bool): Use a child process. If None, reads env PDF_SANDBOX (on); when off,
+                only the page limit applies (for platforms without fork/rlimits).
+            backend (str): Extraction backend name, or "auto" (see pdf_backends.select_backend).
+                If None, reads env PDF_BACKEND (pypdf). Chosen inside the sandbox.
+        """
+        self.timeout_seconds = timeout_seconds or float(os.getenv("PDF_TIMEOUT_SECONDS", "20"))
+        self.memory_mb = memory_mb or int(os.getenv("PDF_MEMORY_LIMIT_MB", "512"))
+        self.max_pages = max_pages or int(os.getenv("PDF_MAX_PAGES", "50"))
+        if sandbox is None:
+            sandbox = os.getenv("PDF_SANDBOX", "1").lower() not in ("0", "false", "no")
+        self.sandbox = sandbox
+        self.backend = backend or os.getenv("PDF_BACKEND", "pypdf")
+        if self.backend != "auto":
+            # Warns here, once, if it isn't installed
+            self.backend = get_backend(self.backend).name
+
+    def extract(self, file_path: str) -> str:
+        """
+        Extracts the PDF's text under the limits.
+
+        Raises:
+            PDFExtractionError: If the PDF is unreadable or breaks a limit.
+        """
+        return "\n".join(self.iter_pages(file_path)).strip()
+
+    def iter_pages(self, file_path: str) -> Iterator[str]:
+        """
+        Yields each page's text as the child extracts it. Closing the iterator early
+        stops the child, so pages past what the caller needs are never parsed.
+
+        Raises:
+            PDFExtractionError: If the PDF is unreadable or breaks a limit.
+        """
+        if not self.sandbox:
+            yield from iter_page_texts(file_path, self.max_pages, self.backend)
+            return
+
+        command = [
+            sys.executable, os.path.abspath(__file__), file_path,
+            str(self.max_pages), str(self.memory_mb), str(int(self.timeout_seconds) + 1), self.backend
+        ]
+        process = subprocess.Popen(
+            command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+        )
+        timed_out = threading.Event()
+
+        def expire():
+            timed_out.set()
+            process.kill()
+
+        timer = threading.Timer(self.timeout_seconds, expire)
+        timer.start()
+        try:
+            # One JSON object per line: {"page": ...} per page, or a final {"error": ...}
+            for line in process.stdout:
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    raise PDFExtractionError("PDF extraction failed")
+                if "error" in message:
+                    raise PDFExtractionError(message["error"])
+                yield message["page"]
+
+            returncode = process.wait()
+            if timed_out.is_set():
+                raise PDFExtractionError(f"PDF extraction timed out after {self.timeout_seconds:g}s")
+            if returncode in (-signal.SIGXCPU, -signal.SIGKILL):
+                raise PDFExtractionError("PDF extraction exceeded its CPU time limit")
+            if returncode < 0:
+                raise PDFExtractionError(f"PDF extraction was killed ({signal.Signals(-returncode).name})")
+            if returncode != 0:
+                raise PDFExtractionError("PDF extraction failed")
+        finally:
+            timer.cancel()
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+
+
+def _apply_limits(memory_mb: int, cpu_seconds: int):
+    if resource is None:
+        return
+    memory = memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    # No core dumps of (possibly hostile) document contents
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+
+def _child_main(file_path: str, max_pages: str, memory_mb: str, cpu_seconds: str, backend: str) -> int:
+    """
+    Entry point of the extraction child: applies the limits to itself, then writes
+    {"page": ...} per page, or {"error": ...}, as JSON lines on stdout.
+    """
+    _apply_limits(int(memory_mb), int(cpu_seconds))
+    # stdout carries the protocol only; anything a backend prints goes to stderr
+    protocol, sys.stdout = sys.stdout, sys.stderr
+    try:
+        for text in iter_page_texts(file_path, int(max_pages) or None, backend):
+            _emit(protocol, {"page": text})
+        return 0
+    except MemoryError:
+        _emit(protocol, {"error": f"PDF extraction exceeded the {memory_mb} MB memory limit"})
+    except PDFExtractionError as e:
+        _emit(protocol, {"error": str(e)})
+    except Exception as e:
+        _emit(protocol, {"error": f"Failed to read PDF file: {e}"})
+    return 1
+
+
+def _emit(stream, message: dict):
+    # Flushed per line, so the parent can use (and stop at) each page as it arrives
+    stream.write(json.dumps(message) + "\n")
+    stream.flush()
+
+
+if __name__ == "__main__":
+    sys.exit(_child_main(*sys.argv[1:6]))
@@ -0,0 +1,325 @@
+import os
+import re
+import sys
+import time
+import argparse
+from dotenv import load_dotenv
+load_dotenv()
+import psycopg2
+from pgvector.psycopg2 import register_vector
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from embedder import Embedder, NATIVE_DIMENSIONS
+from db_manager import DbManager, stream_batches
+
+# ivfflat can't index vectors wider than this; larger spaces are searched exactly
+IVFFLAT_MAX_DIMENSIONS = 2000
+SPACE_NAME_PATTERN = re.compile(r"^[a-z][a-z0-9_]{0,23}$")
+
+
+def reembed(model: str, dimensions: int = None, name: str = None, batch_size: int = 100,
+            rate: int = 0, switch: bool = True):
+    """
+    Re-embeds every resume from resumes.content with another model or dimension,
+    online. The new embeddings go to their own table, laid out like the active
+    space's (plain, or hash-partitioned by user_id with an ANN index per partition)
+    and registered in embedding_spaces as 'building'; API workers pick that up within
+    DbManager.EMBEDDING_SPACES_TTL_SECONDS and from then on write uploads to both spaces. Existing resumes are streamed
+    through a server-side cursor and embedded in throttled batches, then the new
+    space is indexed and made active in one transaction, and searches move to it.
+
+    The job only fills in missing rows, so it can be stopped and rerun at any time.
+    The previous space is retired (no longer written) and kept until you drop it.
+    """
+    connection_string = os.getenv("DATABASE_URL")
+
+    if not connection_string:
+        print("Error: DATABASE_URL not found in environment")
+        return False
+
+    dimensions = dimensions or NATIVE_DIMENSIONS.get(model)
+    if not dimensions:
+        print(f"Error: unknown native dimension for {model}; pass --dimensions")
+        return False
+    name = name or re.sub(r"[^a-z0-9_]", "_", f"{model.replace('text-embedding-', 'te')}_{dimensions}".lower())
+    if not SPACE_NAME_PATTERN.match(name):
+        print(f"Error: invalid space name '{name}' (lowercase letters, digits and _, at most 24 chars)")
+        return False
+    table = f"resume_embeddings__{name}"
+
+    embedder = Embedder(model=model, dimensions=None if dimensions == NATIVE_DIMENSIONS.get(model) else dimensions)
+    if not embedder.client:
+        print("Error: OPENAI_API_KEY not found in environment")
+        return False
+
+    try:
+        conn = psycopg2.connect(connection_string)
+        register_vector(conn)
+        cur = conn.cursor()
+
+        cur.execute("SELECT model, dimensions, table_name, status FROM embedding_spaces WHERE name = %s;", (name,))
+        existing = cur.fetchone()
+        if existing and (existing[0], existing[1]) != (model, dimensions):
+            print(f"Error: space '{name}' already holds {existing[0]} at {existing[1]} dimensions")
+            return False
+        if existing and existing[3] == "active":
+            print(f"Space '{name}' is already active, nothing to do.")
+            return True
+
+        if not existing or existing[3] == "retired":
+            print(f"Creating embedding space '{name}' ({model}, {dimensions} dimensions)...")
+            if existing:
+                # A retired space missed every change since it was retired; start over,
+                # in the current layout
+                cur.execute(f"DROP TABLE IF EXISTS {table};")
+            # Same layout as the space being replaced, so a re-embed keeps the hash
+            # partitioning (and per-partition ANN indexes) of scripts/partition_embeddings.py
+            cur.execute("SELECT table_name FROM embedding_spaces WHERE status = 'active';")
+            active = cur.fetchone()
+            partitions = len(_partitions(cur, active[0] if active else "resume_embeddings"))
+            if partitions:
+                print(f"   - Hash-partitioned by user_id into {partitions} partitions, like the active space")
+                # The primary key of a partitioned table must include the partition key
+                cur.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        resume_id UUID NOT NULL REFERENCES resumes(id) ON DELETE CASCADE,
+                        user_id UUID NOT NULL,
+                        embedding VECTOR({dimensions}),
+                        created_at TIMESTAMPTZ DEFAULT now(),
+                        PRIMARY KEY (resume_id, user_id)
+                    ) PARTITION BY HASH (user_id);
+                """)
+                for i in range(partitions):
+                    cur.execute(f"""
+                        CREATE TABLE IF NOT EXISTS {table}_p{i}
+                        PARTITION OF {table}
+                        FOR VALUES WITH (MODULUS {partitions}, REMAINDER {i});
+                    """)
+            else:
+                cur.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        resume_id UUID PRIMARY KEY REFERENCES resumes(id) ON DELETE CASCADE,
+                        user_id UUID NOT NULL,
+                        embedding VECTOR({dimensions}),
+                        created_at TIMESTAMPTZ DEFAULT now(),
+                        -- The upload upsert's conflict target (see migration 10)
+                        CONSTRAINT {table}_resume_user_key UNIQUE (resume_id, user_id)
+                    );
+                """)
+            cur.execute(f"CREATE INDEX IF NOT EXISTS {table}_user_idx ON {table} (user_id);")
+            cur.execute("""
+                INSERT INTO embedding_spaces (name, model, dimensions, table_name, status)
+                VALUES (%s, %s, %s, %s, 'building')
+                ON CONFLICT (name) DO UPDATE SET status = 'building';
+            """, (name, model, dimensions, table))
+            conn.commit()
+
+            # A worker that hasn't seen the new space yet would re-upload a resume to the
+            # old space only, leaving a stale row here; start once every worker dual-writes
+            wait = DbManager.EMBEDDING_SPACES_TTL_SECONDS
+            print(f"Waiting {wait}s for API workers to start writing the new space...")
+            time.sleep(wait)
+
+        print("Embedding resumes...")
+
+        # Repeat until a pass finds nothing missing (uploads during a pass are dual-written)
+        total = 0
+        while True:
+            embedded = _backfill_pass(conn, connection_string, embedder, table, batch_size, rate, total)
+            if embedded is None:
+                print("❌ Embedding failed; rerun to resume where it stopped.")
+                return False
+            if not embedded:
+                break
+            total += embedded
+
+        print(f"   - {total} resumes embedded")
+
+        _index_space(conn, cur, table, dimensions)
+
+        if not switch:
+            print(f"✅ Space '{name}' is built. Switch with: python scripts/reembed.py --switch {name}")
+            return True
+        return switch_space(name, conn)
+
+    except Exception as e:
+        print(f"❌ Error during re-embedding: {e}")
+        return False
+
+
+def _backfill_pass(conn, connection_string: str, embedder: Embedder, table: str, batch_size: int, rate: int,
+                   done: int):
+    """
+    Streams resumes missing from the space (db_manager.stream_batches) and writes their
+    embeddings batch by batch. Returns how many were embedded (None on failure).
+    """
+    batches = stream_batches(connection_string, f"""
+        SELECT r.id, r.user_id, r.content FROM resumes r
+        WHERE r.content IS NOT NULL AND r.content <> ''
+          AND NOT EXISTS (SELECT 1 FROM {table} s WHERE s.resume_id = r.id)
+        ORDER BY r.id;
+    """, batch_size=batch_size)
+
+    embedded = 0
+    with conn.cursor() as cur:
+        for rows in batches:
+            started = time.monotonic()
+            vectors = embedder.get_embeddings_from_list([content for _, _, content in rows])
+            if len(vectors) != len(rows):
+                batches.close()
+                return None
+
+            # An upload that raced the batch already wrote the fresher embedding
+            cur.executemany(f"""
+                INSERT INTO {table} (resume_id, user_id, embedding)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (resume_id, user_id) DO NOTHING;
+            """, [(resume_id, user_id, vector) for (resume_id, user_id, _), vector in zip(rows, vectors)])
+            conn.commit()
+
+            embedded += len(rows)
+            print(f"   - {done + embedded} resumes embedded")
+
+            # Throttle to `rate` resumes per minute to stay inside the API rate limits
+            if rate:
+                time.sleep(max(0.0, len(rows) * 60.0 / rate - (time.monotonic() - started)))
+    return embedded
+
+
+def _partitions(cur, table: str) -> list:
+    """
+    The partitions of table, in order (empty if it is a plain table).
+    """
+    cur.execute("""
+        SELECT inhrelid::regclass::text FROM pg_inherits
+        WHERE inhparent = to_regclass(%s)
+        ORDER BY inhrelid::regclass::text;
+    """, (table,))
+    return [row[0] for row in cur.fetchall()]
+
+
+def _index_space(conn, cur, table: str, dimensions: int):
+    """
+    Builds the space's ANN index once it is loaded, so ivfflat's lists fit the real data.
+    A partitioned space gets one index per partition, sized to that partition.
+    """
+    if dimensions > IVFFLAT_MAX_DIMENSIONS:
+        print(f"   - Skipping ANN index: ivfflat supports at most {IVFFLAT_MAX_DIMENSIONS} dimensions")
+        return
+
+    lists_by_table = {}
+    for part in _partitions(cur, table) or [table]:
+        cur.execute(f"SELECT count(*) FROM {part};")
+        lists_by_table[part] = max(10, cur.fetchone()[0] // 1000)
+    print(f"Building ANN index on {len(lists_by_table)} table(s)...")
+
+    # CONCURRENTLY keeps dual-written uploads flowing, but can't run inside a transaction
+    # (or on a partitioned parent, hence one index per partition)
+    conn.commit()
+    conn.autocommit = True
+    try:
+        for part, lists in lists_by_table.items():
+            cur.execute(f"""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS {part}_embedding_idx
+                ON {part} USING ivfflat (embedding vector_cosine_ops) WITH (lists = {lists});
+            """)
+            print(f"   - {part}: lists = {lists}")
+    finally:
+        conn.autocommit = False
+
+
+def switch_space(name: str, conn=None):
+    """
+    Makes a fully built space the active one and retires the previous one, atomically.
+    Workers move their searches over within DbManager.EMBEDDING_SPACES_TTL_SECONDS.
+    """
+    conn = conn or psycopg2.connect(os.getenv("DATABASE_URL"))
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT table_name, status FROM embedding_spaces WHERE name = %s;", (name,))
+        row = cur.fetchone()
+        if not row:
+            print(f"Error: no embedding space named '{name}'")
+            return False
+        table, status = row
+        if status == "active":
+            print(f"Space '{name}' is already active.")
+            return True
+        if status != "building":
+            print(f"Error: space '{name}' is {status}; rebuild it with scripts/reembed.py first")
+            return False
+
+        cur.execute(f"""
+            SELECT count(*) FROM resumes r
+            WHERE r.content IS NOT NULL AND r.content <> ''
+              AND NOT EXISTS (SELECT 1 FROM {table} s WHERE s.resume_id = r.id);
+        """)
+        missing = cur.fetchone()[0]
+        if missing:
+            print(f"Error: {missing} resumes are not embedded in '{name}' yet; rerun scripts/reembed.py")
+            return False
+
+        # A space built before the active one was partitioned (or the reverse) would
+        # silently change the layout searches run against
+        cur.execute("SELECT table_name FROM embedding_spaces WHERE status = 'active';")
+        active = cur.fetchone()
+        active_partitions = len(_partitions(cur, active[0])) if active else 0
+        partitions = len(_partitions(cur, table))
+        if partitions != active_partitions:
+            print(f"Error: '{name}' has {partitions} partitions but the active space has {active_partitions}; "
+                  f"retire it (UPDATE embedding_spaces SET status = 'retired' WHERE name = '{name}') "
+                  f"and rerun scripts/reembed.py to rebuild it")
+            return False
+
+        print(f"Switching searches to '{name}'...")
+        cur.execute("UPDATE embedding_spaces SET status = 'retired' WHERE status = 'active' RETURNING name, table_name;")
+        retired = cur.fetchall()
+        cur.execute("UPDATE embedding_spaces SET status = 'active', activated_at = now() WHERE name = %s;", (name,))
+        conn.commit()
+
+        print("✅ Switch completed successfully!")
+        for old_name, old_table in retired:
+            print(f"   '{old_name}' is retired and no longer written. Once verified: DROP TABLE {old_table};")
+        return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error during switch: {e}")
+        return False
+    finally:
+        conn.close()
+
+
+def print_status():
+    conn = psycopg2.connect(os.getenv("DATABASE_URL"))
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT name, model, dimensions, table_name, status FROM embedding_spaces ORDER BY created_at;")
+        for name, model, dimensions, table, status in cur.fetchall():
+            cur.execute(f"SELECT count(*) FROM {table};")
+            print(f"   {status:<8} {name:<24} {model} ({dimensions} dims, {cur.fetchone()[0]} embeddings in {table})")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-embed all resumes with another model or dimension, online.")
+    parser.add_argument("--model", help="Embedding model for the new space, e.g. text-embedding-3-large")
+    parser.add_argument("--dimensions", type=int, help="Output dimensions (text-embedding-3 models); default: native")
+    parser.add_argument("--name", help="Space name (default: derived from model and dimensions)")
+    parser.add_argument("--batch-size", type=int, default=100, help="Resumes per embedding request")
+    parser.add_argument("--rate", type=int, default=0, help="Max resumes embedded per minute (0 = unthrottled)")
+    parser.add_argument("--no-switch", action="store_true", help="Build the space but keep searching the current one")
+    parser.add_argument("--switch", metavar="NAME", help="Only switch searches to an already built space")
+    parser.add_argument("--status", action="store_true", help="List embedding spaces")
+    args = parser.parse_args()
+
+    if args.status:
+        print_status()
+    elif args.switch:
+        switch_space(args.switch)
+    elif args.model:
+        reembed(args.model, args.dimensions, args.name, args.batch_size, args.rate, switch=not args.no_switch)
+    else:
+        parser.error("pass --model, --switch or --status")
@@ -0,0 +1,144 @@
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+from metrics import record_cache
+from shared_cache import shared_tier
+
+
+class TieredCache:
+    """
+    A cache of JSON values: a bounded in-process LRU, in front of a tier shared by all
+    worker processes when one is configured (Redis, or a local SQLite file; see
+    shared_cache.py), so workers see each other's entries. Entries live ttl_seconds in
+    either tier. Subclasses set the key prefix in the shared tier and the cache name
+    reported in metrics, and build their keys with make_key.
+    """
+
+    KEY_PREFIX = "resudoc:"
+    CACHE_NAME = "cache"
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: int = 3600, redis_url: str = None):
+        """
+        Initialize the Tiered Cache.
+
+        Args:
+            max_entries (int): Entries kept in the in-process tier (least recently used evicted).
+            ttl_seconds (int): How long an entry stays valid in either tier.
+            redis_url (str): Shared tier URL. If None, the one configured by env (see shared_tier).
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.shared = shared_tier(redis_url)
+
+    @staticmethod
+    def hash_key(payload: Dict[str, Any]) -> str:
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Returns a fresh copy of the cached value, or None on a miss.
+        """
+        raw = self._get_local(key)
+        if raw is None and self.shared is not None:
+            try:
+                raw = self.shared.get(self.KEY_PREFIX + key)
+            except Exception as e:
+                print(f"Warning: Shared cache read failed: {e}")
+                raw = None
+            if raw is not None:
+                self._set_local(key, raw)
+
+        record_cache(self.CACHE_NAME, raw is not None)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any):
+        """
+        Stores a value in both tiers.
+        """
+        raw = json.dumps(value, default=str)
+        self._set_local(key, raw)
+        if self.shared is not None:
+            try:
+                self.shared.setex(self.KEY_PREFIX + key, self.ttl_seconds, raw)
+            except Exception as e:
+                print(f"Warning: Shared cache write failed: {e}")
+
+    def _get_local(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, raw = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return raw
+
+    def _set_local(self, key: str, raw):
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8")
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, raw)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class ResultCache(TieredCache):
+    """
+    Cache of /match results keyed by the request inputs and the user's corpus version.
+    Any upload or delete bumps the version, so entries for an older corpus are never
+    read again and simply age out.
+    """
+
+    KEY_PREFIX = "resudoc:match:"
+    CACHE_NAME = "match_results"
+
+    def make_key(self, user_id: str, corpus_version: int, jd_text: str, k: int, **options) -> str:
+        """
+        Hashes everything that determines a match result into a cache key.
+        List options (tags, skills) are order-insensitive.
+        """
+        normalized = {
+            name: sorted(value) if isinstance(value, (list, tuple, set)) else value
+            for name, value in options.items()
+        }
+        return self.hash_key(
+            {"user_id": user_id, "version": corpus_version, "jd": jd_text, "k": k, "options": normalized}
+        )
+
+
+class EmbeddingCache(TieredCache):
+    """
+    Cache of query (job description) embeddings by model and output size. An
+    embedding never changes for the same input, so entries live for a day.
+    """
+
+    KEY_PREFIX = "resudoc:embedding:"
+    CACHE_NAME = "embeddings"
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: int = 86400, redis_url: str = None):
+        super().__init__(max_entries, ttl_seconds, redis_url)
+
+    def make_key(self, model: str, dimensions: int, text: str) -> str:
+        return self.hash_key({"model": model, "dimensions": dimensions, "text": text})
+
+
+class RankingCache(TieredCache):
+    """
+    Cache of LLM rankings by model and prompt. The prompt holds the job description
+    and every candidate's text, so a hit is the same question asked again, e.g. after
+    an upload that bumped the corpus version but didn't change the top candidates.
+    """
+
+    KEY_PREFIX = "resudoc:ranking:"
+    CACHE_NAME = "rankings"
+
+    def make_key(self, model: str, prompt: str) -> str:
+        return self.hash_key({"model": model, "prompt": prompt})
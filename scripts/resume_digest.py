@@ -0,0 +1,208 @@
+import re
+from datetime import date
+from typing import List, Dict, Optional, Tuple
+
+SECTION_ALIASES = {
+    "experience": ["experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "relevant experience", "internships"],
+    "skills": ["skills", "technical skills", "technologies", "tech stack", "core competencies",
+               "skills & interests", "skills and interests", "tools"],
+    "education": ["education", "academic background"],
+    "projects": ["projects", "personal projects", "selected projects", "research", "research experience"],
+    "summary": ["summary", "profile", "objective", "about", "about me", "professional summary"],
+    "awards": ["awards", "honors", "achievements", "certifications", "publications", "leadership"],
+}
+HEADER_LOOKUP = {alias: name for name, aliases in SECTION_ALIASES.items() for alias in aliases}
+
+MONTHS = {m: i for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1)}
+DATE_TOKEN = r"(?:(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+\d{4}|\d{1,2}/\d{4}|\d{4})"
+DATE_RANGE_PATTERN = re.compile(
+    rf"({DATE_TOKEN})\s*(?:-|–|—|to)\s*({DATE_TOKEN}|present|current|now)", re.IGNORECASE
+)
+BULLET_PATTERN = re.compile(r"^\s*(?:[•●▪◦\-*–]|\d+\.)\s*")
+SKILL_SPLIT_PATTERN = re.compile(r"[,;|•·]|\s{2,}")
+IMPACT_PATTERN = re.compile(r"\d|%|\$")
+ACTION_VERBS = {
+    "built", "led", "designed", "developed", "implemented", "launched", "improved", "reduced",
+    "increased", "optimized", "architected", "created", "shipped", "scaled", "automated",
+    "migrated", "deployed", "managed", "founded", "published", "trained", "mentored",
+}
+
+
+class ResumeDigester:
+    """
+    Builds a compact, structured digest of a resume (roles, tenure, skills, highlights).
+    Digests are computed once at ingest and stored next to the full content, so ranking
+    prompts can carry the signal of a resume in a fraction of its tokens.
+    """
+
+    def __init__(self, max_chars: int = 1500, max_roles: int = 6, max_highlights: int = 6, max_skills: int = 30):
+        """
+        Initialize the Resume Digester.
+
+        Args:
+            max_chars (int): Hard cap on the digest length.
+            max_roles (int): Roles listed, most recent first as they appear.
+            max_highlights (int): Achievement bullets kept.
+            max_skills (int): Skills kept from the skills section.
+        """
+        self.max_chars = max_chars
+        self.max_roles = max_roles
+        self.max_highlights = max_highlights
+        self.max_skills = max_skills
+
+    def build_digest(self, text: str) -> str:
+        """
+        Builds the digest for cleaned resume text. Returns "" for empty input.
+        """
+        if not text:
+            return ""
+
+        sections = self.split_sections(text)
+        roles = self._extract_roles(sections.get("experience", []) or sections.get("_preamble", []))
+        skills = self._extract_skills(sections.get("skills", []))
+        education = [l for l in sections.get("education", []) if l][:2]
+        highlights = self._extract_highlights(
+            sections.get("experience", []) + sections.get("projects", []) + sections.get("awards", [])
+        )
+
+        parts = []
+        if roles:
+            parts.append("ROLES:\n" + "\n".join(f"- {line}" for line, _ in roles[:self.max_roles]))
+            months = self._merged_months([span for _, span in roles if span])
+            if months:
+                parts.append(f"TOTAL EXPERIENCE: ~{months / 12:.1f} years")
+        if skills:
+            parts.append("SKILLS: " + ", ".join(skills))
+        if education:
+            parts.append("EDUCATION: " + " | ".join(education))
+        if highlights:
+            parts.append("HIGHLIGHTS:\n" + "\n".join(f"- {h}" for h in highlights))
+
+        if not parts:
+            # Nothing structured found; fall back to the start of the resume body
+            parts.append(" ".join(l for l in text.split("\n") if l.strip()))
+
+        digest = "\n".join(parts)
+        return digest[:self.max_chars].rstrip()
+
+    def split_sections(self, text: str) -> Dict[str, List[str]]:
+        """
+        Groups resume lines under the section header they follow.
+        Lines before the first recognised header go under '_preamble'.
+        """
+        sections: Dict[str, List[str]] = {"_preamble": []}
+        current = "_preamble"
+        for raw_line in text.split("\n"):
+            line = raw_line.strip()
+            if not line:
+                continue
+            header = self._section_for_header(line)
+            if header:
+                current = header
+                sections.setdefault(current, [])
+                continue
+            sections[current].append(line)
+        return sections
+
+    def _section_for_header(self, line: str) -> Optional[str]:
+        if len(line) > 40:
+            return None
+        key = re.sub(r"[^a-z& ]", "", line.lower()).strip()
+        return HEADER_LOOKUP.get(key)
+
+    def _extract_roles(self, lines: List[str]) -> List[Tuple[str, Optional[Tuple[int, int]]]]:
+        roles = []
+        for i, line in enumerate(lines):
+            match = DATE_RANGE_PATTERN.search(line)
+            if not match:
+                continue
+            role = BULLET_PATTERN.sub("", line)
+            # A bare date line belongs to the title on the line above it
+            if len(role) - len(match.group(0)) < 5 and i > 0:
+                role = f"{lines[i - 1]} ({match.group(0)})"
+            span = self._parse_span(match.group(1), match.group(2))
+            if span:
+                years, months = divmod(span[1] - span[0], 12)
+                role = f"{role} [{years}y {months}m]" if years else f"{role} [{months}m]"
+            roles.append((role[:160], span))
+        return roles
+
+    def _parse_span(self, start: str, end: str) -> Optional[Tuple[int, int]]:
+        start_month = self._to_month_index(start, is_end=False)
+        end_month = self._to_month_index(end, is_end=True)
+        if start_month is None or end_month is None or end_month < start_month:
+            return None
+        return start_month, end_month
+
+    def _to_month_index(self, token: str, is_end: bool) -> Optional[int]:
+        token = token.strip().lower()
+        if token in ("present", "current", "now"):
+            today = date.today()
+            return today.year * 12 + today.month
+        if "/" in token:
+            month, year = token.split("/")
+            return int(year) * 12 + int(month)
+        parts = token.split()
+        if len(parts) == 2:
+            return int(parts[1]) * 12 + MONTHS.get(parts[0][:3], 1)
+        if token.isdigit():
+            # Year-only dates cover the whole year
+            return int(token) * 12 + (12 if is_end else 1)
+        return None
+
+    def _merged_months(self, spans: List[Tuple[int, int]]) -> int:
+        """Total months covered by the spans, counting overlapping roles once."""
+        total = 0
+        current_start, current_end = None, None
+        for start, end in sorted(spans):
+            if current_end is None or start > current_end:
+                if current_end is not None:
+                    total += current_end - current_start
+                current_start, current_end = start, end
+            else:
+                current_end = max(current_end, end)
+        if current_end is not None:
+            total += current_end - current_start
+        return total
+
+    def _extract_skills(self, lines: List[str]) -> List[str]:
+        skills = []
+        seen = set()
+        for line in lines:
+            # Drop "Languages:" style labels
+            line = line.split(":", 1)[1] if ":" in line[:30] else line
+            for item in SKILL_SPLIT_PATTERN.split(line):
+                item = item.strip(" .()")
+                if item and len(item) <= 40 and item.lower() not in seen:
+                    seen.add(item.lower())
+                    skills.append(item)
+        return skills[:self.max_skills]
+
+    def _extract_highlights(self, lines: List[str]) -> List[str]:
+        scored = []
+        for i, line in enumerate(lines):
+            text = BULLET_PATTERN.sub("", line)
+            if len(text) < 25 or DATE_RANGE_PATTERN.search(text):
+                continue
+            words = text.lower().split()
+            score = (2 if IMPACT_PATTERN.search(text) else 0) + (1 if words and words[0] in ACTION_VERBS else 0)
+            if score:
+                scored.append((score, i, text[:200]))
+        best = sorted(scored, key=lambda s: (-s[0], s[1]))[:self.max_highlights]
+        # Keep the resume's own order for the chosen bullets
+        return [text for _, _, text in sorted(best, key=lambda s: s[1])]
+
+
+if __name__ == "__main__":
+    # Simple manual test if run directly
+    import sys
+    if len(sys.argv) > 1:
+        from dotenv import load_dotenv
+        from pdf_reader import PDFReader
+        load_dotenv()
+        reader = PDFReader()
+        print(ResumeDigester().build_digest(reader.clean_text(reader.read_pdf(sys.argv[1]))))
+    else:
+        print("Usage: python resume_digest.py <path_to_pdf>")
@@ -0,0 +1,122 @@
+import os
+import time
+import sqlite3
+import threading
+from typing import Optional
+
+
+class SqliteCache:
+    """
+    A key/value store with expiry in a local SQLite file, shared by every worker
+    process on one machine: the shared cache tier when there is no Redis. Implements
+    the two Redis calls the caches use (get, setex), so either can back them.
+
+    Each thread gets its own connection; the file is in WAL mode, so readers never
+    wait for writers. Expired entries are purged, and the oldest dropped beyond
+    max_entries, every PURGE_EVERY writes.
+    """
+
+    PURGE_EVERY = 256
+
+    def __init__(self, path: str, max_entries: int = 100000, timeout: float = 0.2):
+        """
+        Initialize the Sqlite Cache.
+
+        Args:
+            path (str): The database file (created if missing).
+            max_entries (int): Entries kept across all caches using the file.
+            timeout (float): Seconds to wait for another process's write lock.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._local = threading.local()
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._connection()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit: every statement is its own short transaction
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.execute("PRAGMA synchronous=NORMAL;")
+            conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL);")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_expires_at ON cache (expires_at);")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self._connection().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires_at > ?;", (key, time.time())
+        ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def setex(self, key: str, seconds: int, value):
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?);",
+            (key, value, time.time() + seconds)
+        )
+        with self._lock:
+            self._writes += 1
+            purge = self._writes % self.PURGE_EVERY == 0
+        if purge:
+            self.purge(conn)
+
+    def purge(self, conn: sqlite3.Connection = None):
+        """
+        Deletes expired entries, then the soonest-expiring ones beyond max_entries.
+        """
+        conn = conn or self._connection()
+        conn.execute("DELETE FROM cache WHERE expires_at <= ?;", (time.time(),))
+        conn.execute(
+            "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?);",
+            (self.max_entries,)
+        )
+
+
+_tiers = {}
+_tiers_lock = threading.Lock()
+
+
+def shared_tier(redis_url: str = None, path: str = None):
+    """
+    The shared cache tier for this process: Redis at redis_url (default: env
+    CACHE_REDIS_URL, or RESULT_CACHE_REDIS_URL), else a SQLite file at path (default:
+    env SHARED_CACHE_PATH), else None (each process caches on its own). One client
+    per URL or file is shared by all caches in the process.
+    """
+    redis_url = redis_url or os.getenv("CACHE_REDIS_URL") or os.getenv("RESULT_CACHE_REDIS_URL")
+    path = path or os.getenv("SHARED_CACHE_PATH")
+    target = redis_url or path
+    if not target:
+        return None
+
+    with _tiers_lock:
+        if target not in _tiers:
+            _tiers[target] = _connect(redis_url, path)
+        return _tiers[target]
+
+
+def _connect(redis_url: str, path: str):
+    if redis_url:
+        try:
+            import redis
+        except ImportError:
+            print("Warning: A Redis cache URL is set but the redis package is not installed; using the local cache only")
+            return None
+        try:
+            return redis.Redis.from_url(redis_url, socket_timeout=0.2, socket_connect_timeout=0.2)
+        except Exception as e:
+            print(f"Warning: Could not connect to the shared cache at {redis_url}: {e}")
+            return None
+
+    try:
+        return SqliteCache(path)
+    except Exception as e:
+        print(f"Warning: Could not open the shared cache at {path}: {e}")
+        return None
@@ -0,0 +1,212 @@
+import re
+from typing import List, Iterable, Optional, Pattern, Set
+
+# alias -> canonical skill. Canonical forms are lowercase so stored skills and
+# must-have filters compare exactly inside Postgres.
+SKILL_ALIASES = {
+    "python": ["python", "python3", "py"],
+    "java": ["java"],
+    "javascript": ["javascript", "js", "java script", "ecmascript", "es6"],
+    "typescript": ["typescript", "ts"],
+    "go": ["go", "golang"],
+    "rust": ["rust"],
+    "c": ["c"],
+    "c++": ["c++", "cpp"],
+    "c#": ["c#", "csharp", "c sharp"],
+    "r": ["r"],
+    "scala": ["scala"],
+    "kotlin": ["kotlin"],
+    "swift": ["swift"],
+    "ruby": ["ruby"],
+    "php": ["php"],
+    "sql": ["sql"],
+    "nosql": ["nosql"],
+    "bash": ["bash", "shell scripting", "shell"],
+    "html": ["html", "html5"],
+    "css": ["css", "css3"],
+    "react": ["react", "reactjs", "react.js"],
+    "angular": ["angular", "angularjs", "angular.js"],
+    "vue": ["vue", "vuejs", "vue.js"],
+    "node.js": ["node.js", "nodejs", "node"],
+    "express": ["express", "express.js", "expressjs"],
+    "next.js": ["next.js", "nextjs"],
+    "django": ["django"],
+    "flask": ["flask"],
+    "fastapi": ["fastapi"],
+    "spring": ["spring", "spring boot", "springboot"],
+    "graphql": ["graphql"],
+    "rest api": ["rest", "rest api", "rest apis", "restful", "restful api", "restful apis"],
+    "postgresql": ["postgresql", "postgres", "psql"],
+    "mysql": ["mysql"],
+    "mongodb": ["mongodb", "mongo"],
+    "redis": ["redis"],
+    "elasticsearch": ["elasticsearch", "elastic search"],
+    "kafka": ["kafka", "apache kafka"],
+    "spark": ["spark", "apache spark", "pyspark"],
+    "hadoop": ["hadoop"],
+    "airflow": ["airflow", "apache airflow"],
+    "snowflake": ["snowflake"],
+    "aws": ["aws", "amazon web services"],
+    "gcp": ["gcp", "google cloud", "google cloud platform"],
+    "azure": ["azure", "microsoft azure"],
+    "docker": ["docker"],
+    "kubernetes": ["kubernetes", "k8s"],
+    "terraform": ["terraform"],
+    "ci/cd": ["ci/cd", "cicd", "ci cd", "continuous integration"],
+    "git": ["git"],
+    "linux": ["linux"],
+    "machine learning": ["machine learning", "ml"],
+    "deep learning": ["deep learning", "dl"],
+    "natural language processing": ["natural language processing", "nlp"],
+    "computer vision": ["computer vision"],
+    "reinforcement learning": ["reinforcement learning", "rl"],
+    "large language models": ["large language models", "large language model", "llm", "llms"],
+    "generative ai": ["generative ai", "genai", "gen ai"],
+    "tensorflow": ["tensorflow", "tf"],
+    "pytorch": ["pytorch", "torch"],
+    "scikit-learn": ["scikit-learn", "scikit learn", "sklearn"],
+    "pandas": ["pandas"],
+    "numpy": ["numpy"],
+    "langchain": ["langchain"],
+    "a/b testing": ["a/b testing", "ab testing"],
+    "data engineering": ["data engineering"],
+}
+
+ALIAS_TO_CANONICAL = {alias: canonical for canonical, aliases in SKILL_ALIASES.items() for alias in aliases}
+
+# Aliases that are ordinary words (or letters) in prose; only trusted when they
+# come from an explicit skill list, including one inside free text (see find_in_text)
+AMBIGUOUS_ALIASES = {"go", "c", "r", "py", "ts", "tf", "dl", "rl", "ml", "node", "rest", "shell",
+                     "spring", "express", "swift", "rust", "torch", "flask", "spark", "ruby"}
+
+VERSION_SUFFIX_PATTERN = re.compile(r"\s+v?\d+(\.\d+)*$")
+TEXT_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#./\-]*[a-z0-9+#]|[a-z0-9]")
+MAX_ALIAS_WORDS = max(len(alias.split()) for alias in ALIAS_TO_CANONICAL)
+# A heading that introduces a skill list: "Skills:", "Programming Languages -", "Tech Stack"
+SKILL_LIST_HEADING = re.compile(
+    r"^(?:[a-z]+\s+){0,2}(?:skills|technologies|tech stack|stack|languages|tools|frameworks|"
+    r"requirements|required|must[- ]haves?|nice[- ]to[- ]haves?)\s*(?:[:|\-\u2013]\s*|$)"
+)
+# Any other section heading, which ends a skill list
+SECTION_HEADING = re.compile(r"^[a-z][a-z &]{2,40}:?$")
+SKILL_LIST_SEPARATORS = re.compile(r"[,;|\u2022\u00b7]|\s/\s|\s+and\s+")
+
+
+class SkillNormalizer:
+    """
+    Maps skill spellings to canonical forms ("JS", "Javascript" -> "javascript")
+    so skills extracted at ingest and must-have filters at match time agree.
+    """
+
+    def normalize(self, skill: str) -> str:
+        """
+        Returns the canonical form of a single skill ("" if nothing is left).
+        Unknown skills are lowercased with whitespace and version suffixes trimmed.
+        """
+        if not skill:
+            return ""
+        key = " ".join(skill.lower().split()).strip(" .,;:()")
+        key = VERSION_SUFFIX_PATTERN.sub("", key)
+        return ALIAS_TO_CANONICAL.get(key, key)
+
+    def normalize_all(self, skills: Iterable[str]) -> List[str]:
+        """
+        Normalizes a list of skills, dropping empties and duplicates (first occurrence wins).
+        """
+        seen = set()
+        result = []
+        for skill in skills or []:
+            canonical = self.normalize(skill) if isinstance(skill, str) else ""
+            if canonical and canonical not in seen:
+                seen.add(canonical)
+                result.append(canonical)
+        return result
+
+    def find_in_text(self, text: str) -> List[str]:
+        """
+        Finds known skills mentioned in free text without an LLM.
+        Used as the offline fallback for skill extraction.
+
+        Ambiguous aliases ("go", "c", "r") count only as whole items of a skill list
+        ("Languages: Go, C, R"), so a skill such as Go that a resume mentions only in
+        prose is not found offline, and a must-have filter on it excludes that resume
+        until it is re-ingested with an LLM.
+        """
+        if not text:
+            return []
+        tokens = [t.rstrip(".") for t in TEXT_TOKEN_PATTERN.findall(text.lower())]
+        found = []
+        seen = set()
+
+        def add(canonical: str):
+            if canonical not in seen:
+                seen.add(canonical)
+                found.append(canonical)
+
+        for i in range(len(tokens)):
+            for n in range(MAX_ALIAS_WORDS, 0, -1):
+                alias = " ".join(tokens[i:i + n])
+                canonical = ALIAS_TO_CANONICAL.get(alias)
+                if canonical and alias not in AMBIGUOUS_ALIASES:
+                    add(canonical)
+                    break
+
+        for item in self._skill_list_items(text):
+            # "C/C++" lists two skills, "CI/CD" is one
+            for part in [item] if item in ALIAS_TO_CANONICAL else item.split("/"):
+                canonical = self.normalize(part)
+                if canonical in SKILL_ALIASES:
+                    add(canonical)
+        return found
+
+    def _skill_list_items(self, text: str) -> List[str]:
+        """
+        The items of the skill lists in text: what follows a skill list heading on its
+        line ("Languages: Go, C"), and the lines below a heading that stands alone,
+        up to a blank line or the next section heading.
+        """
+        items = []
+        in_list = False
+        for line in text.lower().splitlines():
+            line = " ".join(line.split())
+            heading = SKILL_LIST_HEADING.match(line)
+            if heading:
+                rest = line[heading.end():]
+                in_list = not rest
+            elif not line or (SECTION_HEADING.match(line) and line.rstrip(":") not in ALIAS_TO_CANONICAL):
+                in_list = False
+                continue
+            elif in_list:
+                rest = line
+            else:
+                continue
+            items.extend(item.strip(" .:-") for item in SKILL_LIST_SEPARATORS.split(rest))
+        return [item for item in items if item]
+
+    def compile_matcher(self, canonical_skills: Iterable[str]) -> Optional[Pattern]:
+        """
+        Compiles one regex that finds any of the given canonical skills (via their
+        unambiguous aliases) in lowercased text. Much faster than find_in_text when
+        only a few skills matter, e.g. scanning many resumes for a JD's skills.
+        """
+        wanted = set(canonical_skills)
+        aliases = [
+            alias for alias, canonical in ALIAS_TO_CANONICAL.items()
+            if canonical in wanted and alias not in AMBIGUOUS_ALIASES
+        ]
+        if not aliases:
+            return None
+        # Longest aliases first so "machine learning" wins over shorter overlaps
+        alternatives = "|".join(
+            r"\s+".join(re.escape(word) for word in alias.split())
+            for alias in sorted(aliases, key=len, reverse=True)
+        )
+        return re.compile(rf"(?<![a-z0-9+#])(?:{alternatives})(?![a-z0-9+#])")
+
+    def match_skills(self, matcher: Optional[Pattern], text: str) -> Set[str]:
+        """
+        Returns the canonical skills a compile_matcher pattern finds in text.
+        """
+        if matcher is None or not text:
+            return set()
+        return {ALIAS_TO_CANONICAL.get(" ".join(m.split()), m) for m in matcher.findall(text.lower())}
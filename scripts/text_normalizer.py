@@ -0,0 +1,109 @@
+import re
+import unicodedata
+import ftfy
+from ftfy import fixes
+from ftfy.badness import BADNESS_RE
+
+# Characters ftfy.fix_text leaves alone: printable ASCII, tab, newline and form feed.
+# Text made only of these (and without HTML entities) needs no fixing at all.
+NEEDS_FIXING = re.compile(r"[^\t\n\x0c\x20-\x7e]")
+HTML_ENTITY = fixes.HTML_ENTITY_RE
+NON_ASCII_RUN = re.compile(r"[^\x00-\x7f]+")
+# Every match of ftfy's mojibake heuristic contains a non-ASCII character and is at
+# most 8 characters long, so it lies within this many characters of one
+MOJIBAKE_CONTEXT = 7
+# Runs of blank lines (with any whitespace between them), and the runs of spaces and
+# tabs that collapsing changes (single spaces are left where they are)
+WHITESPACE_RUN = re.compile(r"\n\s*\n|[ \t]{2,}|\t")
+
+
+def _any_of(table: dict):
+    return re.compile("[" + "".join(re.escape(chr(code)) for code in table) + "]")
+
+
+# The character-level steps of ftfy.fix_text, in its order, each with a pattern that
+# finds whether it has anything to do (None: it scans the text itself). fix_encoding
+# is left out because it never changes text that ftfy.badness.is_bad doesn't flag.
+CHARACTER_FIXES = (
+    (None, fixes.fix_c1_controls),
+    (_any_of(fixes.LIGATURES), fixes.fix_latin_ligatures),
+    (_any_of(fixes.WIDTH_MAP), fixes.fix_character_width),
+    (None, fixes.uncurl_quotes),
+    (None, fixes.fix_line_breaks),
+    (None, fixes.fix_surrogates),
+    (None, fixes.remove_terminal_escapes),
+    (_any_of(fixes.CONTROL_CHARS), fixes.remove_control_chars),
+)
+
+
+def looks_like_mojibake(text: str) -> bool:
+    """
+    Same answer as ftfy.badness.is_bad, but only runs its heuristic around the
+    non-ASCII characters instead of at every position of the text.
+    """
+    spans = []
+    for run in NON_ASCII_RUN.finditer(text):
+        start, end = max(0, run.start() - MOJIBAKE_CONTEXT), run.end() + MOJIBAKE_CONTEXT
+        if spans and start <= spans[-1][1]:
+            spans[-1][1] = end
+        else:
+            spans.append([start, end])
+    return any(BADNESS_RE.search(text, start, end) for start, end in spans)
+
+
+def fix_text(text: str) -> str:
+    """
+    Same result as ftfy.fix_text, without its cost on text that can't need it:
+    plain ASCII is returned as is, and text without mojibake or HTML entities only
+    gets ftfy's character fixes, on the whole text at once instead of line by line
+    (and ftfy.fix_text after all if those fixes expose mojibake).
+    """
+    if HTML_ENTITY.search(text):
+        return ftfy.fix_text(text)
+    if not NEEDS_FIXING.search(text):
+        return text
+    if looks_like_mojibake(text):
+        return ftfy.fix_text(text)
+    fixed = text
+    for needed, fix in CHARACTER_FIXES:
+        if needed is None or needed.search(fixed):
+            fixed = fix(fixed)
+    # ftfy repeats its fixes until the text stops changing: removing an escape or a
+    # control character can join mojibake (or an entity) that only the next pass sees
+    if fixed != text and (HTML_ENTITY.search(fixed) or looks_like_mojibake(fixed)):
+        return ftfy.fix_text(text)
+    return unicodedata.normalize("NFC", fixed)
+
+
+def _collapse(match) -> str:
+    return "\n\n" if match.group()[0] == "\n" else " "
+
+
+def normalize_whitespace(text: str) -> str:
+    """
+    Collapses runs of spaces and tabs to one space and runs of blank lines to a
+    single paragraph break, in one pass, then strips the ends.
+    """
+    return WHITESPACE_RUN.sub(_collapse, text).strip()
+
+
+def clean_text(text: str) -> str:
+    """
+    The ingest normalization stage: fixes encoding issues (see fix_text), normalizes
+    whitespace and removes non-printable characters. Preserves newlines.
+    """
+    if not text:
+        return ""
+    return normalize_whitespace(fix_text(text))
+
+
+def embedding_text(text: str) -> str:
+    """
+    Text as sent to the embedding model: newlines become spaces (recommended by
+    OpenAI for embeddings). Already-flat text is only stripped.
+    """
+    if not text:
+        return ""
+    if "\n" in text:
+        text = text.replace("\n", " ")
+    return text.strip()
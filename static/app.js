@@ -16,23 +16,35 @@ const loadingOverlay = document.getElementById('loadingOverlay');
 const folderList = document.getElementById('folderList');
 const tagFilters = document.getElementById('tagFilters');
 
+const RESUME_PAGE_SIZE = 50;
+
 let selectedFiles = [];
 let folders = [];
+// Paging state of the sidebar resume list
+let resumeListTag = '';
+let resumeListCursor = null;
+let resumeListCount = 0;
 
 // Load folders on page load
 window.addEventListener('DOMContentLoaded', loadFolders);
 
+// GET for the read endpoints (/folders, /resumes): always revalidates with the server,
+// which answers 304 via the ETag when nothing changed and the browser reuses its copy
+function fetchRevalidated(url) {
+    return fetch(url, { cache: 'no-cache' });
+}
+
 async function loadFolders() {
     try {
         // Load folders (tags)
-        const foldersResponse = await fetch(`${API_BASE}/folders?user_id=${USER_ID}`);
+        const foldersResponse = await fetchRevalidated(`${API_BASE}/folders?user_id=${USER_ID}`);
         const foldersData = await foldersResponse.json();
         folders = foldersData.folders || [];
 
-        // Load total resume count
-        const resumesResponse = await fetch(`${API_BASE}/resumes?user_id=${USER_ID}`);
-        const resumesData = await resumesResponse.json();
-        const totalCount = resumesData.total || 0;
+        // Load total resume count (no rows are transferred)
+        const countResponse = await fetchRevalidated(`${API_BASE}/resumes/count?user_id=${USER_ID}`);
+        const countData = await countResponse.json();
+        const totalCount = countData.total || 0;
 
         renderFolders(totalCount);
         renderTagFilters();
@@ -75,39 +87,44 @@ function renderFolders(totalCount) {
     });
 }
 
-async function loadResumes(tag = '') {
+async function loadResumes(tag = '', append = false) {
     const resumeListSection = document.getElementById('resumeListSection');
     const resumeListTitle = document.getElementById('resumeListTitle');
     const resumeList = document.getElementById('resumeList');
+    const loadMoreBtn = document.getElementById('loadMoreBtn');
+
+    if (!append) {
+        resumeListTag = tag;
+        resumeListCursor = null;
+        resumeListCount = 0;
+    }
 
     try {
-        const response = await fetch(`${API_BASE}/resumes?user_id=${USER_ID}`);
+        // The tag filter runs in the database; pages are fetched on demand
+        const params = new URLSearchParams({ user_id: USER_ID, limit: RESUME_PAGE_SIZE });
+        if (resumeListTag) params.append('tag', resumeListTag);
+        if (append && resumeListCursor) params.append('cursor', resumeListCursor);
+
+        const response = await fetchRevalidated(`${API_BASE}/resumes?${params}`);
         const data = await response.json();
-        let resumes = data.resumes || [];
-
-        // Filter by tag if specified
-        if (tag) {
-            resumes = resumes.filter(resume => {
-                const resumeTags = resume.tags || [];
-                return resumeTags.includes(tag);
-            });
-            resumeListTitle.textContent = `📁 ${tag}`;
-        } else {
-            resumeListTitle.textContent = '📋 All Resumes';
-        }
+        const resumes = data.resumes || [];
+        resumeListCursor = data.next_cursor || null;
+
+        resumeListTitle.textContent = resumeListTag ? `📁 ${resumeListTag}` : '📋 All Resumes';
 
         // Show section
         resumeListSection.style.display = 'block';
 
         // Render resumes
-        if (resumes.length === 0) {
-            resumeList.innerHTML = '<p style="color: var(--text-muted);">No resumes found' + (tag ? ` with tag "${tag}"` : '') + '.</p>';
+        if (!append && resumes.length === 0) {
+            resumeList.innerHTML = '<p style="color: var(--text-muted);">No resumes found' + (resumeListTag ? ` with tag "${resumeListTag}"` : '') + '.</p>';
         } else {
-            resumeList.innerHTML = resumes.map((resume, index) => `
+            const html = resumes.map((resume, index) => `
                 <div class="resume-item">
                     <div class="resume-item-info">
                         <div class="resume-item-name">
-                            <span class="resume-number">${index + 1}.</span> 📄 ${resume.filename}
+                            <span class="resume-number">${resumeListCount + index + 1}.</span> 📄 ${resume.filename}
+                            ${resume.superseded_by ? '<span class="resume-superseded" title="A newer version of this resume is used in search">older version</span>' : ''}
                         </div>
                         ${resume.tags && resume.tags.length > 0 ? `
                             <div class="resume-item-tags">
@@ -118,12 +135,23 @@ async function loadResumes(tag = '') {
                     <button class="resume-item-delete" onclick="deleteResume('${resume.resume_id}')">Delete</button>
                 </div>
             `).join('');
+
+            if (append) {
+                resumeList.insertAdjacentHTML('beforeend', html);
+            } else {
+                resumeList.innerHTML = html;
+            }
+            resumeListCount += resumes.length;
         }
+
+        loadMoreBtn.style.display = resumeListCursor ? 'block' : 'none';
     } catch (error) {
         console.error('Error loading resumes:', error);
     }
 }
 
+document.getElementById('loadMoreBtn').addEventListener('click', () => loadResumes(resumeListTag, true));
+
 async function deleteResume(resumeId) {
     if (!confirm('Are you sure you want to delete this resume?')) return;
 
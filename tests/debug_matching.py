@@ -2,6 +2,8 @@ import sys
 import os
 import uuid
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+from dotenv import load_dotenv
+load_dotenv()
 
 from db_manager import DbManager
 from embedder import Embedder
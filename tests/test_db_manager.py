@@ -0,0 +1,278 @@
+import sys
+import os
+import uuid
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+import pytest
+import psycopg2.extensions
+from db_manager import DbManager
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc)
+    resume_id = uuid.uuid4()
+    cursor = DbManager.encode_cursor(created_at, resume_id)
+    assert DbManager.decode_cursor(cursor) == (created_at.isoformat(), str(resume_id))
+
+def test_malformed_cursor_is_rejected():
+    db = DbManager()
+    with pytest.raises(ValueError):
+        db.list_resumes_page("user", cursor="not-a-cursor")
+
+class _RecordingCursor:
+    def __init__(self):
+        self.statements = []
+        self.connection = type("Connection", (), {"prepared": set()})()
+
+    def execute(self, query, params=None):
+        self.statements.append((query, params))
+
+    def fetchall(self):
+        return []
+
+def test_prepared_statement_is_prepared_once():
+    db = DbManager()
+    db.use_prepared_statements = True
+    cur = _RecordingCursor()
+    for _ in range(2):
+        db._fetch_prepared(cur, "test_stmt", "SELECT $1 + $2", ["integer", "integer"], (1, 2))
+
+    name = cur.statements[0][0].split()[1]
+    assert name.startswith("test_stmt_")
+    assert cur.statements == [
+        (f"PREPARE {name} (integer, integer) AS SELECT $1 + $2;", None),
+        (f"EXECUTE {name} (%s::integer, %s::integer);", (1, 2)),
+        (f"EXECUTE {name} (%s::integer, %s::integer);", (1, 2)),
+    ]
+
+def test_changed_sql_is_prepared_under_a_new_name():
+    # e.g. the near-duplicate filter appears once _detect_schema sees the column
+    db = DbManager()
+    db.use_prepared_statements = True
+    cur = _RecordingCursor()
+    db._fetch_prepared(cur, "test_stmt", "SELECT $1", ["integer"], (1,))
+    db._fetch_prepared(cur, "test_stmt", "SELECT $1 WHERE true", ["integer"], (1,))
+
+    prepares = [query for query, _ in cur.statements if query.startswith("PREPARE")]
+    assert len(prepares) == 2
+    assert prepares[0].split()[1] != prepares[1].split()[1]
+    assert cur.statements[-1][0].startswith(f"EXECUTE {prepares[1].split()[1]} ")
+
+def test_unprepared_mode_binds_repeated_parameters():
+    db = DbManager()
+    db.use_prepared_statements = False
+    cur = _RecordingCursor()
+    db._fetch_prepared(cur, "test_stmt", "SELECT $1 + $1 + $2", ["integer", "integer"], (1, 2))
+    assert cur.statements == [("SELECT %(p1)s + %(p1)s + %(p2)s", {"p1": 1, "p2": 2})]
+
+def test_mock_db_behaves_like_latest_schema():
+    from migrate import MIGRATIONS, LATEST_VERSION
+    db = DbManager()
+    assert db.schema_version == LATEST_VERSION
+    assert all(db.supports(c) for c in ("tags", "digest", "user_corpus", "tag_counts"))
+    versions = [version for version, _, _ in MIGRATIONS]
+    assert versions == sorted(set(versions))
+
+def test_mock_streaming_yields_nothing():
+    db = DbManager()
+    assert list(db.iter_batches("SELECT id FROM resumes;")) == []
+    assert list(db.iter_rows("SELECT id FROM resumes;")) == []
+
+class _FakeStreamingConnection:
+    """Serves rows through a named cursor, recording how the scan was set up."""
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.session = {}
+        self.cursors = []
+        self.closed = False
+
+    def set_session(self, **kwargs):
+        self.session.update(kwargs)
+
+    def cursor(self, name=None):
+        cursor = _FakeNamedCursor(self, name)
+        self.cursors.append(cursor)
+        return cursor
+
+    def close(self):
+        self.closed = True
+
+class _FakeNamedCursor:
+    def __init__(self, connection, name):
+        self.connection = connection
+        self.name = name
+        self.itersize = 2000
+        self.executed = None
+        self.fetch_sizes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def execute(self, query, params=None):
+        self.executed = (query, params)
+
+    def fetchmany(self, size):
+        self.fetch_sizes.append(size)
+        rows, self.connection.rows = self.connection.rows[:size], self.connection.rows[size:]
+        return rows
+
+def test_streaming_reads_batches_through_a_named_cursor(monkeypatch):
+    import db_manager
+
+    conn = _FakeStreamingConnection([(i,) for i in range(5)])
+    monkeypatch.setattr(db_manager.psycopg2, "connect", lambda dsn: conn)
+    monkeypatch.setattr(db_manager, "register_vector", lambda connection: None)
+
+    batches = list(db_manager.stream_batches("postgresql://db/resudoc", "SELECT id FROM resumes WHERE id > %s;",
+                                             (0,), batch_size=2))
+
+    assert batches == [[(0,), (1,)], [(2,), (3,)], [(4,)]]
+    cursor, = conn.cursors
+    # A server-side cursor, fetched batch_size rows per round trip, on a read-only session
+    assert cursor.name and cursor.name.startswith("resudoc_scan_")
+    assert cursor.itersize == 2
+    assert cursor.executed == ("SELECT id FROM resumes WHERE id > %s;", (0,))
+    assert set(cursor.fetch_sizes) == {2}
+    assert conn.session == {"readonly": True}
+    assert conn.closed
+
+def test_streaming_through_db_manager_uses_its_itersize(monkeypatch):
+    import db_manager
+
+    conn = _FakeStreamingConnection([(i,) for i in range(3)])
+    monkeypatch.setattr(db_manager.psycopg2, "connect", lambda dsn: conn)
+    monkeypatch.setattr(db_manager, "register_vector", lambda connection: None)
+    db = DbManager("postgresql://db/resudoc", connect=False)
+    db.pool = _FakePool()
+    db.itersize = 2
+
+    assert list(db.iter_rows("SELECT id FROM resumes;")) == [(0,), (1,), (2,)]
+    assert conn.cursors[0].itersize == 2
+    # The scan doesn't hold a pooled connection
+    assert db.pool.connections == []
+    assert conn.closed
+
+class _FakeConnection:
+    """Records each transaction's statements and fails if two threads share it."""
+
+    def __init__(self):
+        self.prepared = set()
+        self.closed = 0
+        self.owner = None
+        self.pending = []
+        self.committed = []
+        self.rolled_back = []
+
+    def cursor(self):
+        return _FakeCursor(self)
+
+    def commit(self):
+        self.committed.append(self.pending)
+        self.pending = []
+
+    def rollback(self):
+        self.rolled_back.append(self.pending)
+        self.pending = []
+
+    def get_transaction_status(self):
+        return psycopg2.extensions.TRANSACTION_STATUS_INTRANS if self.pending else psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+class _FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def execute(self, query, params=None):
+        assert self.connection.owner == threading.get_ident(), "connection shared between threads"
+        self.connection.pending.append(query)
+        time.sleep(0.002)
+        if "FAIL" in query:
+            raise RuntimeError("query failed")
+
+    def fetchall(self):
+        return []
+
+    def fetchone(self):
+        return None
+
+class _FakePool:
+    def __init__(self):
+        self.idle = []
+        self.connections = []
+        self.lock = threading.Lock()
+
+    def getconn(self):
+        with self.lock:
+            conn = self.idle.pop() if self.idle else _FakeConnection()
+            if conn not in self.connections:
+                self.connections.append(conn)
+        conn.owner = threading.get_ident()
+        return conn
+
+    def putconn(self, conn, close=False):
+        conn.owner = None
+        with self.lock:
+            self.idle.append(conn)
+
+def test_concurrent_requests_do_not_share_transactions():
+    from embedder import Embedder
+    from matching_engine import MatchingEngine
+    from deadline import Deadline
+
+    db = DbManager(connect=False)
+    db.pool = _FakePool()
+    engine = MatchingEngine(db, Embedder(api_key=""))
+
+    def match(i):
+        return engine.match_best_resume(f"user-{i}", f"Python engineer {i}", k=3, deadline=Deadline(5000))
+
+    with ThreadPoolExecutor(8) as pool:
+        matches = [pool.submit(match, i) for i in range(16)]
+        failing = [pool.submit(db.fetch_all, "SELECT FAIL;") for _ in range(4)]
+        uploads = [pool.submit(db.upsert_resume, f"resume-{i}", "user-0", "Python developer") for i in range(4)]
+        for future in matches + failing + uploads:
+            future.result()
+
+    assert all(future.result() is True for future in uploads)
+    transactions = [t for conn in db.pool.connections for t in conn.committed]
+    inserts = [t for t in transactions if any("INSERT INTO resumes" in q for q in t)]
+    # Every upload committed its row together with its corpus version bump
+    assert len(inserts) == 4
+    assert all(any("INSERT INTO user_corpus" in q for q in t) for t in inserts)
+    # Failed queries rolled back only themselves
+    rolled_back = [t for conn in db.pool.connections for t in conn.rolled_back if t]
+    assert rolled_back and all(t == ["SELECT FAIL;"] for t in rolled_back)
+    # Each search's statement timeout applied to its own statement
+    searches = [t for t in transactions if t[0].startswith("SET LOCAL statement_timeout")]
+    assert searches and all(t[-1].startswith("EXECUTE") for t in searches)
+
+def test_embedding_upsert_follows_a_key_added_after_connect(monkeypatch):
+    import psycopg2.errors
+
+    class _OwnerKeyCursor(_FakeCursor):
+        def execute(self, query, params=None):
+            super().execute(query, params)
+            if "ON CONFLICT (resume_id)" in query:
+                raise psycopg2.errors.InvalidColumnReference("no unique constraint matching ON CONFLICT")
+
+    db = DbManager(connect=False)
+    db.pool = _FakePool()
+    db.capabilities.discard("embedding_owner_key")
+    db._detect_schema = lambda: db.capabilities.add("embedding_owner_key")
+    monkeypatch.setattr(_FakeConnection, "cursor", lambda self: _OwnerKeyCursor(self))
+    assert db.upsert_embeddings("resume-1", "user-1", {"resume_embeddings": [0.0]})
+
+    committed = [q for conn in db.pool.connections for t in conn.committed for q in t]
+    assert any("ON CONFLICT (resume_id, user_id)" in q for q in committed)
@@ -0,0 +1,38 @@
+import sys
+import os
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from db_manager import DbManager
+from embedder import Embedder
+from matching_engine import MatchingEngine
+from deadline import Deadline
+
+def test_stage_shares_roll_forward():
+    deadline = Deadline(1000)
+    # Skipping prescore gives its share to the stages after embed
+    assert deadline.stage_timeout("embed") < deadline.stage_timeout("embed", skip=["prescore"])
+    assert abs(deadline.stage_timeout("rank") - deadline.remaining()) < 0.01
+
+def test_slow_ranking_degrades_to_local_order():
+    engine = MatchingEngine(DbManager(), Embedder())
+
+    def slow_rank(*args, timeout=None, **kwargs):
+        time.sleep(1.0)
+        return []
+
+    engine.llm_ranker.rank_resumes_batch = slow_rank
+    deadline = Deadline(300)
+
+    start = time.monotonic()
+    results = engine.match_best_resume("user", "Python engineer", k=2, deadline=deadline)
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 0.5
+    assert deadline.degraded_stages == ["rank"]
+    # Mock retrieval returns two candidates; the local ranker orders them by similarity
+    assert [r["resume_id"] for r in results] == ["mock-resume-1", "mock-resume-2"]
+
+def test_no_deadline_keeps_behaviour():
+    engine = MatchingEngine(DbManager(), Embedder())
+    assert len(engine.match_best_resume("user", "Python engineer", k=2)) == 2
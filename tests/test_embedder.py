@@ -0,0 +1,28 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from embedder import Embedder
+
+def test_for_model_reuses_matching_embedder():
+    embedder = Embedder(api_key="", model="text-embedding-3-small")
+    assert embedder.for_model("text-embedding-3-small", 1536) is embedder
+    assert embedder.for_model("text-embedding-3-small") is embedder
+
+    large = embedder.for_model("text-embedding-3-large", 1024)
+    assert (large.model, large.dimensions) == ("text-embedding-3-large", 1024)
+    assert embedder.for_model("text-embedding-3-large", 1024) is large
+    # The native size is never sent as an explicit dimensions parameter
+    assert embedder.for_model("text-embedding-3-large", 3072).dimensions is None
+
+def test_embed_for_spaces_uses_each_space_dimension():
+    embedder = Embedder(api_key="")
+    spaces = [
+        {"name": "default", "model": "text-embedding-3-small", "dimensions": 1536, "table": "resume_embeddings"},
+        {"name": "te3_large_256", "model": "text-embedding-3-large", "dimensions": 256,
+         "table": "resume_embeddings__te3_large_256"},
+    ]
+    embeddings = embedder.embed_for_spaces("Python developer", spaces)
+    assert {table: len(vector) for table, vector in embeddings.items()} == {
+        "resume_embeddings": 1536, "resume_embeddings__te3_large_256": 256
+    }
@@ -0,0 +1,29 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi import Response
+from starlette.requests import Request
+from main import corpus_etag, not_modified, db_manager
+
+def _request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "headers": headers})
+
+def test_matching_etag_returns_304():
+    etag = corpus_etag("etag-user", "folders")
+    response = Response()
+    assert not_modified(_request(), response, etag) is None
+    assert response.headers["etag"] == etag
+
+    cached = not_modified(_request(etag), Response(), etag)
+    assert cached is not None and cached.status_code == 304
+
+def test_upload_changes_etag():
+    before = corpus_etag("etag-user", "resumes", 50, None, None)
+    assert corpus_etag("etag-user", "resumes", 50, None, "SWE") != before
+
+    db_manager.upsert_resume("etag-resume", "etag-user", "Python developer")
+    after = corpus_etag("etag-user", "resumes", 50, None, None)
+    assert after != before
+    assert not_modified(_request(before), Response(), after) is None
@@ -0,0 +1,39 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../loadtest')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+import pytest
+from fake_openai import FakeOpenAI
+from embedder import Embedder
+from llm_ranker import LLMRanker
+
+@pytest.fixture
+def fake():
+    server = FakeOpenAI(latency_ms=0).start()
+    yield server
+    server.stop()
+
+def test_app_clients_work_against_the_stand_in(fake, monkeypatch):
+    monkeypatch.setenv("OPENAI_BASE_URL", fake.base_url)
+    embedder = Embedder(api_key="loadtest", dimensions=64)
+    vectors = embedder.get_embeddings_from_list(["Python and AWS engineer", "Go and Redis engineer"])
+    assert [len(v) for v in vectors] == [64, 64]
+
+    ranker = LLMRanker(api_key="loadtest")
+    candidates = [{"resume_id": "r1", "filename": "a.pdf", "content": "Python"},
+                  {"resume_id": "r2", "filename": "b.pdf", "content": "Go"}]
+    rankings = ranker.rank_resumes_batch("Python engineer", candidates, raise_on_error=True)
+    assert {r["resume_id"] for r in rankings} == {"r1", "r2"}
+    assert fake.stats["embeddings"] == 1 and fake.stats["chat"] == 1
+
+def test_error_injection():
+    server = FakeOpenAI(latency_ms=0, error_rate=1.0).start()
+    try:
+        from openai import OpenAI
+        client = OpenAI(api_key="loadtest", base_url=server.base_url, max_retries=0)
+        with pytest.raises(Exception):
+            client.embeddings.create(input="x", model="text-embedding-3-small")
+        assert server.stats["errors"] == 1
+    finally:
+        server.stop()
@@ -0,0 +1,33 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from lexical_scorer import LexicalScorer
+
+def test_lexical_scorer_ranks_overlap_first():
+    scorer = LexicalScorer(similarity_weight=0.0)
+    candidates = [
+        {"resume_id": "java", "content": "Java developer with Spring and backend experience."},
+        {"resume_id": "python", "content": "Python engineer building machine learning pipelines with PyTorch."},
+    ]
+
+    results = scorer.score_candidates("Python engineer for machine learning with PyTorch", candidates)
+
+    assert [r["resume_id"] for r in results] == ["python", "java"]
+    assert results[0]["prescore"] > results[1]["prescore"]
+
+def test_lexical_scorer_blends_similarity():
+    scorer = LexicalScorer(similarity_weight=1.0)
+    candidates = [
+        {"resume_id": "a", "content": "Python", "similarity": 0.2},
+        {"resume_id": "b", "content": "Java", "similarity": 0.9},
+    ]
+
+    results = scorer.score_candidates("Python", candidates)
+
+    assert results[0]["resume_id"] == "b"
+
+def test_tokenize_keeps_tech_terms():
+    tokens = LexicalScorer().tokenize("Experience with C++, C#, Node.js and R.")
+    assert "c++" in tokens and "c#" in tokens and "node.js" in tokens and "r" in tokens
+    assert "experience" not in tokens
@@ -0,0 +1,35 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from local_ranker import LocalRanker
+from llm_ranker import LLMRanker
+
+JD = "Backend engineer: Python, PostgreSQL and Kubernetes. Distributed systems and observability."
+
+CANDIDATES = [
+    {"resume_id": "b", "filename": "java.pdf", "similarity": 0.35,
+     "content": "Experience\nJava developer building Spring services."},
+    {"resume_id": "a", "filename": "python.pdf", "similarity": 0.55,
+     "content": "Experience\nBuilt distributed systems in Python on Kubernetes.\nSkills\nPostgres, Docker"},
+]
+
+def test_local_ranker_contract_and_order():
+    results = LocalRanker().rank_resumes_batch(JD, CANDIDATES)
+
+    assert [r["resume_id"] for r in results] == ["a", "b"]
+    for r in results:
+        assert set(r) == {"resume_id", "filename", "score", "reasoning", "key_matches", "gaps"}
+        assert 0 <= r["score"] <= 100
+    assert {"python", "postgresql", "kubernetes"} <= set(results[0]["key_matches"])
+    assert "python" in results[1]["gaps"]
+
+def test_local_ranker_is_deterministic():
+    ranker = LocalRanker()
+    assert ranker.rank_resumes_batch(JD, CANDIDATES) == ranker.rank_resumes_batch(JD, list(reversed(CANDIDATES)))
+
+def test_llm_ranker_falls_back_without_client():
+    ranker = LLMRanker()
+    ranker.client = None
+    results = ranker.rank_resumes_batch(JD, CANDIDATES)
+    assert results == LocalRanker().rank_resumes_batch(JD, CANDIDATES)
@@ -0,0 +1,93 @@
+import sys
+import os
+import json
+import time
+import logging
+
+# Add scripts to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../scripts'))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from metrics import (REGISTRY, RequestTrace, current_trace, timed_stage,
+                     record_tokens, record_cache)
+from deadline import Deadline
+from db_manager import DbManager
+from embedder import Embedder
+from matching_engine import MatchingEngine
+import metrics
+
+
+def test_timed_stage_accumulates_into_trace():
+    with RequestTrace("test") as trace:
+        with timed_stage("unit_a"):
+            time.sleep(0.01)
+        with timed_stage("unit_a"):
+            time.sleep(0.01)
+        record_tokens("unit", 120, 30)
+
+    assert trace.timings["unit_a"] >= 0.02
+    assert trace.counters["unit_prompt_tokens"] == 120
+    assert trace.counters["unit_completion_tokens"] == 30
+    assert current_trace() is None
+
+
+def test_trace_follows_deadline_stage_threads():
+    with RequestTrace("test") as trace:
+        deadline = Deadline(2000)
+
+        def stage():
+            with timed_stage("unit_threaded"):
+                return current_trace()
+
+        assert deadline.run("embed", stage) is trace
+    assert "unit_threaded" in trace.timings
+
+
+def test_render_exposes_histograms_and_cache_ratio():
+    with timed_stage("unit_render"):
+        pass
+    record_cache("unit_cache", True)
+    record_cache("unit_cache", False)
+
+    text = REGISTRY.render()
+    assert 'resudoc_stage_duration_seconds_count{stage="unit_render"}' in text
+    assert 'resudoc_stage_duration_seconds_bucket{stage="unit_render",le="+Inf"}' in text
+    assert 'resudoc_cache_hit_ratio{cache="unit_cache"} 0.500000' in text
+
+
+def test_explain_attaches_plan_and_stage_timings():
+    engine = MatchingEngine(DbManager(), Embedder())
+    plan = {"Plan": {"Node Type": "Limit", "Plans": [{"Node Type": "Index Scan"}]}}
+    engine.nn.explain_nearest_resumes = lambda *args, **kwargs: plan
+
+    with RequestTrace("test") as trace:
+        results = engine.match_best_resume("user", "Python engineer", k=2, explain=True)
+
+    assert len(results) == 2
+    assert trace.details["query_plan"] == plan
+    for stage in ("embed", "retrieve", "rank", "explain_plan"):
+        assert stage in trace.timings
+
+
+def test_match_request_reports_stages_through_the_app():
+    from fastapi.testclient import TestClient
+    import main
+
+    # The app and the scripts it calls must share one registry and trace
+    assert main.REGISTRY is metrics.REGISTRY
+
+    lines = []
+    handler = logging.Handler()
+    handler.emit = lambda record: lines.append(json.loads(record.getMessage()))
+    metrics.logger.addHandler(handler)
+    try:
+        client = TestClient(main.app)
+        response = client.post("/match", json={"user_id": "user", "jd_text": "Python engineer", "k": 2})
+    finally:
+        metrics.logger.removeHandler(handler)
+
+    assert response.status_code == 200
+    match_logs = [line for line in lines if line["endpoint"] == "/match"]
+    assert match_logs and match_logs[-1]["stages_ms"]
+    assert "embed" in match_logs[-1]["stages_ms"]
+    assert 'stage="embed"' in client.get("/metrics").text
@@ -0,0 +1,31 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from near_duplicates import NearDuplicateDetector
+
+RESUME = (
+    "Jane Doe Software Engineer at Acme Corp from 2019 to 2023. Built payment systems in Python and Go, "
+    "led the migration of forty services to Kubernetes and reduced checkout latency by 40 percent. "
+    "Mentored four junior engineers and ran the on-call rotation. Education: BS Computer Science, "
+    "Stanford University. Skills: Python, Go, Kubernetes, PostgreSQL, AWS, Terraform, React."
+)
+
+def test_edited_copy_shares_a_band_key():
+    detector = NearDuplicateDetector()
+    edited = RESUME.replace("40 percent", "45 percent").replace("React", "Vue")
+    assert detector.estimate_similarity(RESUME, edited) > 0.7
+    assert set(detector.band_keys(RESUME)) & set(detector.band_keys(edited))
+
+def test_unrelated_resume_shares_no_band_key():
+    detector = NearDuplicateDetector()
+    other = ("John Smith data scientist with six years of experience in machine learning, pandas, scikit-learn, "
+             "statistics and experimentation at a large retailer, forecasting demand across two thousand stores.")
+    assert not set(detector.band_keys(RESUME)) & set(detector.band_keys(other))
+
+def test_band_keys_are_stable_and_sized():
+    keys = NearDuplicateDetector().band_keys(RESUME)
+    assert keys == NearDuplicateDetector().band_keys(RESUME)
+    assert len(keys) == 16
+    assert all(-2**63 <= k < 2**63 for k in keys)
+    assert NearDuplicateDetector().band_keys("") == []
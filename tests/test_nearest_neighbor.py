@@ -0,0 +1,23 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from db_manager import DbManager
+from nearest_neighbor import NearestNeighbor
+
+def test_retrieval_query_binds_vector_once():
+    nn = NearestNeighbor(DbManager())
+    name, query, param_types, params = nn._build_retrieval_query(
+        "user", [0.1, 0.2, 0.3], 5, ["SWE"], ["python"], 3000
+    )
+    assert name == "resudoc_retrieve_tags_skills"
+    assert query.count("$1") == 2
+    assert param_types == ["vector", "uuid", "integer", "integer", "text[]", "jsonb"]
+    assert len(params) == len(param_types)
+    assert "r.tags && $5" in query and "r.skills @> $6" in query
+
+def test_mock_retrieval_returns_content_with_candidates():
+    nn = NearestNeighbor(DbManager())
+    rows = nn.retrieve_candidates("user", [0.1, 0.2], k=2, content_chars=10)
+    assert [r["resume_id"] for r in rows] == ["mock-resume-1", "mock-resume-2"]
+    assert all(len(r["content"]) <= 10 for r in rows)
@@ -0,0 +1,22 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+import openai_client
+from openai_client import get_client
+
+def test_components_share_one_client_per_key():
+    first = get_client("test-key-a")
+    assert get_client("test-key-a") is first
+    assert get_client("test-key-b") is not first
+
+def test_no_key_means_mock_mode(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    assert get_client() is None
+    assert openai_client.warm_up() is False
+
+def test_client_is_built_on_first_use():
+    client = get_client("test-key-lazy")
+    assert client._client is None
+    assert client.get() is client.get()
+    assert client.api_key == "test-key-lazy"
@@ -0,0 +1,46 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+import pytest
+import pdf_backends
+from pdf_backends import PypdfBackend, get_backend, inspect_document, looks_multi_column, select_backend
+
+def _column_pdf(path, columns):
+    from reportlab.pdfgen import canvas
+    pdf = canvas.Canvas(str(path), pagesize=(612, 792))
+    # Drawn row by row, as table-based resume templates do
+    for row in range(30):
+        for column in range(columns):
+            pdf.drawString(40 + column * 270, 740 - row * 12, f"column {column} line {row}")
+    pdf.showPage()
+    pdf.save()
+    return str(path)
+
+def test_unknown_backend_falls_back_to_pypdf():
+    assert isinstance(get_backend("no-such-backend"), PypdfBackend)
+
+def test_first_page_layout_is_detected(tmp_path):
+    assert inspect_document(_column_pdf(tmp_path / "one.pdf", 1)) == (1, False)
+    assert inspect_document(_column_pdf(tmp_path / "two.pdf", 2)) == (1, True)
+
+def test_right_aligned_dates_are_not_a_column():
+    starts = [40.0] * 30 + [480.0 + i * 3 for i in range(8)]
+    assert not looks_multi_column(starts, 612)
+    assert looks_multi_column([40.0] * 30 + [310.0] * 30, 612)
+
+def test_auto_uses_the_default_when_nothing_better_is_installed(tmp_path, monkeypatch):
+    path = _column_pdf(tmp_path / "two.pdf", 2)
+    for name in pdf_backends.MULTI_COLUMN_BACKENDS:
+        monkeypatch.setattr(pdf_backends.BACKENDS[name], "available", classmethod(lambda cls: False))
+    backend = select_backend(path, "auto")
+    assert isinstance(backend, PypdfBackend)
+    assert "column 0 line 0" in "".join(backend.iter_pages(path))
+
+def test_incomplete_backend_fails_at_construction():
+    class NoPagesBackend(pdf_backends.PDFBackend):
+        name = "incomplete"
+        requires = "pypdf"
+
+    with pytest.raises(TypeError):
+        NoPagesBackend()
@@ -0,0 +1,63 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+import pytest
+from pypdf import PdfWriter
+from pdf_sandbox import SandboxedPDFExtractor, PDFExtractionError
+
+def _blank_pdf(path, pages):
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=612, height=792)
+    with open(path, "wb") as f:
+        writer.write(f)
+    return str(path)
+
+def test_page_limit_is_enforced_in_the_sandbox(tmp_path):
+    path = _blank_pdf(tmp_path / "three.pdf", 3)
+    assert SandboxedPDFExtractor(max_pages=5).extract(path) == ""
+    with pytest.raises(PDFExtractionError, match="3 pages"):
+        SandboxedPDFExtractor(max_pages=2).extract(path)
+
+def test_unreadable_pdf_fails_cleanly(tmp_path):
+    path = tmp_path / "broken.pdf"
+    path.write_bytes(b"%PDF-1.4 not really a pdf")
+    with pytest.raises(PDFExtractionError, match="Failed to read PDF file"):
+        SandboxedPDFExtractor().extract(str(path))
+
+def test_timeout_fails_cleanly(tmp_path):
+    path = _blank_pdf(tmp_path / "one.pdf", 1)
+    with pytest.raises(PDFExtractionError, match="timed out"):
+        SandboxedPDFExtractor(timeout_seconds=0.001).extract(path)
+
+def _text_pdf(path, pages):
+    from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+    writer = PdfWriter()
+    font = DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    })
+    for i in range(pages):
+        page = writer.add_blank_page(width=612, height=792)
+        stream = DecodedStreamObject()
+        stream.set_data(f"BT /F1 12 Tf 72 720 Td (Page {i + 1}   has   text) Tj ET".encode())
+        page[NameObject("/Contents")] = writer._add_object(stream)
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})
+        })
+    with open(path, "wb") as f:
+        writer.write(f)
+    return str(path)
+
+def test_clean_pages_stop_at_the_budget(tmp_path):
+    from pdf_reader import PDFReader
+    path = _text_pdf(tmp_path / "pages.pdf", 5)
+    reader = PDFReader(api_key="")
+    assert list(reader.iter_clean_pages(path)) == [f"Page {i} has text" for i in range(1, 6)]
+    assert reader.read_clean_pdf(path) == "\n".join(f"Page {i} has text" for i in range(1, 6))
+
+    text = reader.read_clean_pdf(path, max_chars=25)
+    assert text == "Page 1 has text\nPage 2 ha"
+    assert reader.read_clean_pdf(path, max_tokens=4) == "Page 1 has text"
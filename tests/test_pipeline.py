@@ -57,7 +57,7 @@ def test_pipeline():
         
         # 5. Matching Engine
         print("5. Running Matching Engine...")
-        engine = MatchingEngine(db, embedder, reader)
+        engine = MatchingEngine(db, embedder)
         jd_text = "Looking for a Python Engineer."
         
         results = engine.match_best_resume(user_id, jd_text, k=1)
@@ -66,7 +66,7 @@ def test_pipeline():
             print(f"   - Found {len(results)} matches.")
             top_match = results[0]
             print(f"   - Top match ID: {top_match['resume_id']}")
-            print(f"   - Score: {top_match['final_score']:.4f}")
+            print(f"   - Score: {top_match['score']:.1f}")
             print("SUCCESS: Full pipeline completed.")
         else:
             print("WARNING: No matches found (might be expected if using real DB with empty table).")
@@ -0,0 +1,45 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+from fastapi.testclient import TestClient
+import main
+
+def test_ready_after_warm_up(monkeypatch):
+    monkeypatch.setitem(main.warm_state, "warmed", False)
+    with TestClient(main.app) as client:
+        # The lifespan hook finishes warming up in the background
+        for _ in range(100):
+            response = client.get("/ready")
+            if response.status_code == 200:
+                break
+            time.sleep(0.05)
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+        assert client.get("/health").status_code == 200
+
+def test_not_ready_while_warming(monkeypatch):
+    monkeypatch.setitem(main.warm_state, "warmed", False)
+    response = TestClient(main.app).get("/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "warming"
+
+def test_not_ready_without_configured_database(monkeypatch):
+    # Warmed up, but DATABASE_URL is set and the connection failed: serving would
+    # silently fall back to MOCK mode
+    monkeypatch.setitem(main.warm_state, "warmed", True)
+    monkeypatch.setattr(main.db_manager, "connection_string", "postgresql://unreachable/resudoc")
+    monkeypatch.setattr(main.db_manager, "pool", None)
+    response = TestClient(main.app).get("/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "database_unavailable"
+    assert response.json()["database_connected"] is False
+
+def test_failed_warm_up_is_reported(monkeypatch):
+    monkeypatch.setitem(main.warm_state, "warmed", False)
+    monkeypatch.setitem(main.warm_state, "error", "connection reset")
+    response = TestClient(main.app).get("/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "warm_up_failed"
+    assert response.json()["error"] == "connection reset"
@@ -0,0 +1,104 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from db_manager import DbManager
+from embedder import Embedder
+from matching_engine import MatchingEngine
+from result_cache import ResultCache, EmbeddingCache
+from shared_cache import SqliteCache
+
+def _counting_engine():
+    engine = MatchingEngine(DbManager(), Embedder())
+    calls = []
+    rank = engine.llm_ranker.rank_resumes_batch
+
+    def counting_rank(*args, **kwargs):
+        calls.append(1)
+        return rank(*args, **kwargs)
+
+    engine.llm_ranker.rank_resumes_batch = counting_rank
+    return engine, calls
+
+def test_repeated_match_is_served_from_cache():
+    engine, calls = _counting_engine()
+    first = engine.match_best_resume("user", "Python engineer", k=2, tags=["SWE", "ML"])
+    second = engine.match_best_resume("user", "Python engineer", k=2, tags=["ML", "SWE"])
+    assert second == first
+    assert len(calls) == 1
+
+    # A different k is a different request
+    engine.match_best_resume("user", "Python engineer", k=3, tags=["SWE", "ML"])
+    assert len(calls) == 2
+
+def test_upload_and_delete_invalidate_cache():
+    engine, calls = _counting_engine()
+    engine.match_best_resume("user", "Python engineer", k=2)
+
+    engine.db.upsert_resume("resume-3", "user", "Python developer")
+    engine.match_best_resume("user", "Python engineer", k=2)
+    assert len(calls) == 2
+
+    engine.db.delete_resume("resume-3")
+    engine.match_best_resume("user", "Python engineer", k=2)
+    assert len(calls) == 3
+
+    engine.db.set_resume_tags("mock-resume-1", ["SWE"])
+    engine.match_best_resume("user", "Python engineer", k=2)
+    assert len(calls) == 4
+
+    # Another user's upload leaves this user's entry alone
+    engine.db.upsert_resume("resume-4", "other-user", "Java developer")
+    engine.match_best_resume("user", "Python engineer", k=2)
+    assert len(calls) == 4
+
+def test_lru_evicts_oldest_and_returns_copies():
+    cache = ResultCache(max_entries=2)
+    cache.set("a", [{"resume_id": "1"}])
+    cache.set("b", [{"resume_id": "2"}])
+    cache.get("a")[0]["resume_id"] = "changed"
+    cache.set("c", [{"resume_id": "3"}])
+
+    assert cache.get("a") == [{"resume_id": "1"}]
+    assert cache.get("b") is None
+
+def test_workers_share_entries_through_sqlite(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    # Two workers: separate local tiers, one file
+    first, second = EmbeddingCache(), EmbeddingCache()
+    first.shared, second.shared = SqliteCache(path), SqliteCache(path)
+
+    key = first.make_key("text-embedding-3-small", 1536, "Python engineer")
+    first.set(key, [0.25, 0.5])
+    assert second.get(key) == [0.25, 0.5]
+    assert second.get(second.make_key("text-embedding-3-large", 3072, "Python engineer")) is None
+
+def test_sqlite_tier_expires_and_bounds_entries(tmp_path):
+    tier = SqliteCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    tier.setex("gone", -1, "x")
+    assert tier.get("gone") is None
+
+    for i in range(3):
+        tier.setex(f"key-{i}", 60 + i, "x")
+    tier.purge()
+    assert tier.get("key-0") is None
+    assert tier.get("key-2") == b"x"
+
+class _FailingCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        raise TimeoutError("LLM timed out")
+
+def test_local_fallback_ranking_is_not_cached():
+    engine = MatchingEngine(DbManager(), Embedder())
+    completions = _FailingCompletions()
+    engine.llm_ranker.client = type("Client", (), {"chat": type("Chat", (), {"completions": completions})()})()
+
+    first = engine.match_best_resume("fallback-user", "Python engineer", k=2)
+    assert first
+    engine.match_best_resume("fallback-user", "Python engineer", k=2)
+    # The second request asks the LLM again instead of serving the fallback order
+    assert completions.calls == 2
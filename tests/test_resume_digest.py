@@ -0,0 +1,41 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from resume_digest import ResumeDigester
+
+SAMPLE_RESUME = """Jane Smith
+jane@example.com | (555) 123-4567 | github.com/jsmith
+Experience
+Senior Engineer, Acme Corp Jan 2020 - Dec 2022
+• Built a streaming pipeline handling 2M events/day in Python and Kafka
+• Reduced p99 latency by 40% with a caching layer
+• Participated in regular planning meetings with stakeholders
+Engineer, Beta Inc
+06/2017 - 12/2019
+Education
+B.S. Computer Science, State University
+Technical Skills
+Languages: Python, SQL, Go
+Tools: Docker, Kubernetes"""
+
+def test_digest_extracts_roles_skills_and_highlights():
+    digest = ResumeDigester().build_digest(SAMPLE_RESUME)
+
+    assert "Senior Engineer, Acme Corp" in digest
+    assert "Engineer, Beta Inc (06/2017 - 12/2019)" in digest
+    assert "SKILLS: Python, SQL, Go, Docker, Kubernetes" in digest
+    assert "Reduced p99 latency by 40%" in digest
+    # Contact details and filler bullets are not carried over
+    assert "jane@example.com" not in digest
+    assert "planning meetings" not in digest
+
+def test_digest_merges_tenure():
+    digest = ResumeDigester().build_digest(SAMPLE_RESUME)
+    # 06/2017-12/2019 (30 months) + Jan 2020-Dec 2022 (35 months)
+    assert "TOTAL EXPERIENCE: ~5.4 years" in digest
+
+def test_digest_respects_max_chars():
+    digest = ResumeDigester(max_chars=80).build_digest(SAMPLE_RESUME)
+    assert 0 < len(digest) <= 80
+    assert ResumeDigester().build_digest("") == ""
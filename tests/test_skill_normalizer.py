@@ -0,0 +1,36 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from skill_normalizer import SkillNormalizer
+from pdf_reader import PDFReader
+
+def test_normalize_maps_aliases_to_canonical_forms():
+    normalizer = SkillNormalizer()
+    assert normalizer.normalize("JS") == "javascript"
+    assert normalizer.normalize(" Postgres ") == "postgresql"
+    assert normalizer.normalize("k8s") == "kubernetes"
+    assert normalizer.normalize("Python 3") == "python"
+    assert normalizer.normalize("Some Niche  Tool") == "some niche tool"
+
+def test_normalize_all_dedupes():
+    skills = SkillNormalizer().normalize_all(["Python", "python3", "React.js", "", "ReactJS"])
+    assert skills == ["python", "react"]
+
+def test_find_in_text_skips_ambiguous_words():
+    found = SkillNormalizer().find_in_text("Built REST services in Python on AWS; ready to go to k8s.")
+    assert found == ["python", "aws", "kubernetes"]
+
+def test_find_in_text_trusts_ambiguous_aliases_in_skill_lists():
+    text = "Jane Doe\nSkills: Go, C/C++, R and Python\nExperience\nReady to go. Set up CI/CD."
+    assert SkillNormalizer().find_in_text(text) == ["python", "ci/cd", "go", "c", "c++", "r"]
+
+    # Lines under a standalone heading, up to the next section
+    text = "TECHNICAL SKILLS\nGo | Docker\nEducation\nI go running, rest and swim"
+    assert SkillNormalizer().find_in_text(text) == ["docker", "go"]
+
+def test_extract_skills_batch_offline_uses_vocabulary():
+    reader = PDFReader(api_key="")
+    reader.client = None
+    results = reader.extract_skills_batch(["Python and Docker", "", "TensorFlow, PyTorch"])
+    assert results == [["python", "docker"], [], ["tensorflow", "pytorch"]]
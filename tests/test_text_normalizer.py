@@ -0,0 +1,55 @@
+import sys
+import os
+import re
+import random
+import ftfy
+from ftfy.badness import is_bad
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+import text_normalizer
+from text_normalizer import clean_text, embedding_text, fix_text, looks_like_mojibake
+
+SAMPLES = [
+    "Jane Doe\n\n\n\nSoftware   Engineer\t\t|  jane@example.com  \n",
+    "• Built “fast” APIs — cut latency by 35%\n▪ Oﬃce ﬁles, Ｆｕｌｌｗｉｄｔｈ text\r\nJosé Müller",
+    "SeÃ±ior Engineer â€” built the â€œcoreâ€\x9d platform",
+    "R&amp;D lead at AT&T &lt;3\n\n  \n chess &amp; climbing",
+    "Bell\x07 and\x1b[31m red\x00 text​\x0c page two",
+    "",
+]
+
+def legacy_clean_text(text):
+    # PDFReader.clean_text before the fast path
+    text = ftfy.fix_text(text)
+    text = re.sub(r'[ \t]+', ' ', text)
+    text = re.sub(r'\n\s*\n', '\n\n', text)
+    return text.strip()
+
+def test_clean_text_matches_ftfy_baseline():
+    for sample in SAMPLES:
+        assert clean_text(sample) == legacy_clean_text(sample)
+
+def test_clean_text_skips_ftfy_without_mojibake(monkeypatch):
+    def fail(text, *args, **kwargs):
+        raise AssertionError("ftfy.fix_text should not run")
+    monkeypatch.setattr(text_normalizer.ftfy, "fix_text", fail)
+    assert clean_text(SAMPLES[0]) == "Jane Doe\n\nSoftware Engineer | jane@example.com"
+    assert clean_text(SAMPLES[1]).startswith("• Built \"fast\" APIs")
+
+def test_mojibake_check_agrees_with_ftfy():
+    rng = random.Random(3)
+    alphabet = "abc XYZ.,\n\t-'\"" + "ÃÂâ€œ™©®°±²³µ¶·»¼½¾ÀÉéèñöüßØÙà√≈‚Ä¢πВГРСЂβΒΓ×\x81\x9d•–—“”‘’…"
+    for _ in range(3000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 40)))
+        text = "plain ascii filler " * rng.randint(0, 3) + text
+        assert looks_like_mojibake(text) == is_bad(text), repr(text)
+
+def test_fix_text_repeats_like_ftfy_when_a_fix_exposes_mojibake():
+    # Removing the terminal escape joins "Ã©", which ftfy's second pass decodes
+    for text in ["Ã\x1b©>", "Caf\x1b[0mÃ\x1b©\x00 menu"]:
+        assert fix_text(text) == ftfy.fix_text(text), repr(text)
+    assert fix_text("Ã\x1b©>") == "é>"
+
+def test_embedding_text_flattens_lines():
+    assert embedding_text("  Skills\n\nPython  ") == "Skills  Python"
+    assert embedding_text("") == ""
@@ -0,0 +1,54 @@
+import sys
+import os
+import asyncio
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from fastapi import HTTPException
+from main import RequestSizeLimit
+
+def _run(limit, path, chunks, content_length=None):
+    sent = []
+    body = list(chunks)
+
+    async def receive():
+        chunk = body.pop(0) if body else b""
+        return {"type": "http.request", "body": chunk, "more_body": bool(body)}
+
+    async def send(message):
+        sent.append(message)
+
+    async def app(scope, receive, send):
+        # Reads the whole body, as the multipart parser does
+        while (await receive()).get("more_body"):
+            pass
+        sent.append({"type": "app.done"})
+
+    headers = [(b"content-length", str(content_length).encode())] if content_length is not None else []
+    scope = {"type": "http", "path": path, "headers": headers}
+    asyncio.run(RequestSizeLimit(app, max_bytes=limit)(scope, receive, send))
+    return sent
+
+def test_declared_oversized_upload_is_rejected_before_reading():
+    sent = _run(10, "/resumes/upload", [b"x" * 20], content_length=20)
+    assert sent[0]["status"] == 413
+
+def test_streamed_oversized_upload_is_cut_off():
+    with pytest.raises(HTTPException) as e:
+        _run(10, "/resumes/upload-batch", [b"x" * 6, b"x" * 6, b"x" * 6])
+    assert e.value.status_code == 413
+
+def test_small_uploads_and_other_paths_pass():
+    assert _run(10, "/resumes/upload", [b"x" * 4, b"x" * 4])[-1] == {"type": "app.done"}
+    assert _run(10, "/match", [b"x" * 50])[-1] == {"type": "app.done"}
+
+def test_unreadable_pdf_upload_is_rejected_with_422():
+    from fastapi.testclient import TestClient
+    import main
+
+    response = TestClient(main.app).post(
+        "/resumes/upload",
+        files={"file": ("junk.pdf", b"this is not a pdf", "application/pdf")},
+        data={"user_id": "user"}
+    )
+    assert response.status_code == 422
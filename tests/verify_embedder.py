@@ -1,6 +1,8 @@
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+from dotenv import load_dotenv
+load_dotenv()
 
 from embedder import Embedder
 import os